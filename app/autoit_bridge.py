@@ -1,23 +1,49 @@
 from __future__ import annotations
 
 import logging
+import math
 import os
 import queue
 import shutil
 import subprocess
 import threading
+import time
 from pathlib import Path
 
+from .events import EVENT_RESTART, EventLog
+from .logger import LOG_FLAGS
+
 
 class AutoItBridgeError(RuntimeError):
     pass
 
 
+class AutoItBridgeAborted(AutoItBridgeError):
+    pass
+
+
+PRIORITY_COMMANDS = frozenset({"ABORT", "STOP"})
+
+_ABORT_WAKE = "\x00ABORT"
+
+
 class AutoItBridge:
-    def __init__(self, runner_script_path: Path, logger: logging.Logger | None = None):
+    def __init__(
+        self,
+        runner_script_path: Path,
+        logger: logging.Logger | None = None,
+        events: EventLog | None = None,
+    ):
         self.runner_script_path = runner_script_path
         self._logger = logger or logging.getLogger(__name__)
+        self._events = events or EventLog()
         self._lock = threading.RLock()
+        self._write_lock = threading.Lock()
+        self._aborted = threading.Event()
+        # The runner answers every line with exactly one line. Replies still owed to commands that were
+        # cut short by ABORT (and to ABORT itself) are drained before the next command is written.
+        self._reply_lock = threading.Lock()
+        self._owed_replies = 0
         self._proc: subprocess.Popen[str] | None = None
         self._responses: queue.Queue[str] = queue.Queue()
         self._stdout_thread: threading.Thread | None = None
@@ -85,6 +111,8 @@ class AutoItBridge:
             creationflags = subprocess.CREATE_NO_WINDOW
 
         self._responses = queue.Queue()
+        with self._reply_lock:
+            self._owed_replies = 0
         self._proc = subprocess.Popen(
             [str(autoit_exe), str(self.runner_script_path)],
             stdin=subprocess.PIPE,
@@ -114,9 +142,7 @@ class AutoItBridge:
 
         if proc and proc.poll() is None:
             try:
-                if proc.stdin:
-                    proc.stdin.write("EXIT\n")
-                    proc.stdin.flush()
+                self._write_line(proc, "EXIT")
             except Exception:
                 pass
 
@@ -129,37 +155,122 @@ class AutoItBridge:
         self.stop()
         self._start_locked()
 
+    def _write_line(self, proc: subprocess.Popen[str], line: str) -> None:
+        if not proc.stdin:
+            raise AutoItBridgeError("AutoIt process not running")
+        with self._write_lock:
+            proc.stdin.write(line + "\n")
+            proc.stdin.flush()
+
+    @property
+    def aborted(self) -> bool:
+        return self._aborted.is_set()
+
+    def send_priority(self, command: str) -> bool:
+        # Priority lane: skips self._lock (held by any in-flight send) and the response queue.
+        # The runner handles these ahead of queued lines and interrupts slow moves for them.
+        command = command.strip().upper()
+        if command not in PRIORITY_COMMANDS:
+            raise AutoItBridgeError(f"{command} is not a priority command")
+
+        proc = self._proc
+        if not proc or proc.poll() is not None:
+            return False
+
+        with self._reply_lock:
+            self._owed_replies += 1
+        self._responses.put(_ABORT_WAKE)
+        try:
+            self._write_line(proc, command)
+        except Exception:
+            with self._reply_lock:
+                self._owed_replies -= 1
+            return False
+        return True
+
+    def abort(self) -> None:
+        self._aborted.set()
+        self.send_priority("ABORT")
+
+    def reset_abort(self) -> None:
+        self._aborted.clear()
+
+    def _settle_reply(self) -> None:
+        with self._reply_lock:
+            self._owed_replies = max(0, self._owed_replies - 1)
+
+    def _drain_owed_replies_locked(self, timeout: float) -> None:
+        # Consumes the ABORTED ack and any reply to a command interrupted before it was answered (it may
+        # still have run and answered OK if ABORT overtook it), so the next command reads its own reply.
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._reply_lock:
+                if self._owed_replies <= 0:
+                    # Nothing is owed, so anything left is a stale abort wake-up. Cleared under the lock so a
+                    # concurrent ABORT's wake-up (queued after it counts its reply) is never dropped.
+                    while True:
+                        try:
+                            self._responses.get_nowait()
+                        except queue.Empty:
+                            return
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise AutoItBridgeError("AutoIt did not answer the commands cut short by ABORT")
+            try:
+                response = self._responses.get(timeout=remaining)
+            except queue.Empty as e:
+                raise AutoItBridgeError("AutoIt did not answer the commands cut short by ABORT") from e
+            if response != _ABORT_WAKE:
+                self._settle_reply()
+
     def send(self, command: str, *args: object, timeout: float = 2.0) -> str:
         with self._lock:
             last_error: Exception | None = None
 
             for attempt in range(2):
                 try:
+                    if self._aborted.is_set():
+                        raise AutoItBridgeAborted(f"AutoIt command {command} cancelled by abort")
+
                     self._start_locked()
+                    self._drain_owed_replies_locked(timeout)
 
                     proc = self._proc
                     if not proc or proc.poll() is not None or not proc.stdin:
                         raise AutoItBridgeError("AutoIt process not running")
 
                     line = "|".join([command] + [str(a) for a in args])
-                    self._logger.trace("AutoIt -> %s", line)
-                    proc.stdin.write(line + "\n")
-                    proc.stdin.flush()
+                    # MOVE traffic is summarised once per rotation by the macro loop.
+                    trace = LOG_FLAGS.trace and command != "MOVE"
+                    if trace:
+                        self._logger.trace("AutoIt -> %s", line)
+                    with self._reply_lock:
+                        self._owed_replies += 1
+                    self._write_line(proc, line)
 
                     try:
                         response = self._responses.get(timeout=timeout)
                     except queue.Empty as e:
                         raise AutoItBridgeError(f"AutoIt timeout waiting for response to {command}") from e
 
-                    self._logger.trace("AutoIt <- %s", response)
+                    if response == _ABORT_WAKE:
+                        # The command's own reply is still owed; the next send drains it.
+                        raise AutoItBridgeAborted(f"AutoIt command {command} cancelled by abort")
+                    self._settle_reply()
+
+                    if trace:
+                        self._logger.trace("AutoIt <- %s", response)
                     if response.startswith("ERR"):
                         raise AutoItBridgeError(response)
 
                     return response
+                except AutoItBridgeAborted:
+                    raise
                 except Exception as e:
                     last_error = e
                     if attempt == 0:
                         self._logger.warning("AutoIt bridge error, restarting: %s", e)
+                        self._events.emit(EVENT_RESTART, command=command, error=str(e))
                         try:
                             self._restart_locked()
                             continue
@@ -183,3 +294,8 @@ class AutoItBridge:
 
     def send_key(self, send_text: str) -> None:
         self.send("KEY", send_text)
+
+    def activate_window(self, title: str, timeout_s: float = 1.0) -> None:
+        # The runner waits up to whole seconds for the window to become active.
+        wait_s = max(1, int(math.ceil(timeout_s)))
+        self.send("ACTIVATE", title, wait_s, timeout=wait_s + 2.0)
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+
+from .config_manager import ConfigManager
+from .events import EventLog
+from .logger import init_event_log, init_logging, set_logging_level
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+CONFIG_PATH = ROOT_DIR / "config" / "config.ini"
+LOG_PATH = ROOT_DIR / "logs" / "debug.log"
+EVENTS_PATH = ROOT_DIR / "logs" / "events.jsonl"
+RUNNER_PATH = ROOT_DIR / "autoit" / "runner.au3"
+
+
+def init_runtime_logging(
+    config: ConfigManager,
+    log_path: Path = LOG_PATH,
+    events_path: Path = EVENTS_PATH,
+) -> tuple[logging.Logger, EventLog]:
+    logger = init_logging(
+        log_path,
+        config.get("Debug", "Level", fallback="INFO"),
+        queue_size=config.getint("Debug", "LogQueueSize", fallback=10000),
+        queue_policy=config.get("Debug", "LogQueuePolicy", fallback="drop"),
+        max_bytes=config.getint("Debug", "LogMaxBytes", fallback=5 * 1024 * 1024),
+        rotate_daily=config.getboolean("Debug", "LogRotateDaily", fallback=True),
+        backup_count=config.getint("Debug", "LogBackupCount", fallback=7),
+        retention_days=config.getint("Debug", "LogRetentionDays", fallback=14),
+    )
+    set_logging_level(config.get("Debug", "Level", fallback="INFO"))
+
+    events = EventLog()
+    if config.getboolean("Debug", "EventLog", fallback=True):
+        events = EventLog(init_event_log(events_path))
+    return logger, events
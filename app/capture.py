@@ -0,0 +1,314 @@
+from __future__ import annotations
+
+import argparse
+import threading
+import time
+
+from .screen import GeneratedScreenSource, ScreenSource
+
+try:
+    import numpy as np
+except Exception:  # pragma: no cover - optional dependency
+    np = None  # type: ignore[assignment]
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise RuntimeError("The 'numpy' package is required. Install it with: pip install numpy")
+
+
+def parse_region(text: str) -> tuple[int, int, int, int] | None:
+    parts = [p.strip() for p in (text or "").replace(";", ",").split(",") if p.strip()]
+    if len(parts) != 4:
+        return None
+    try:
+        x, y, w, h = (int(float(p)) for p in parts)
+    except ValueError:
+        return None
+    if w <= 0 or h <= 0:
+        return None
+    return x, y, w, h
+
+
+class Frame:
+    __slots__ = ("_ring", "slot", "seq", "t", "x", "y", "pixels")
+
+    def __init__(self, ring: FrameRing, slot: int, seq: int, t: float, x: int, y: int, pixels: np.ndarray):
+        self._ring = ring
+        self.slot = slot
+        self.seq = seq
+        self.t = t
+        self.x = x
+        self.y = y
+        self.pixels = pixels
+
+    @property
+    def width(self) -> int:
+        return int(self.pixels.shape[1])
+
+    @property
+    def height(self) -> int:
+        return int(self.pixels.shape[0])
+
+    @property
+    def valid(self) -> bool:
+        # False once the writer has started reusing this slot.
+        return self._ring.slot_seq(self.slot) == self.seq
+
+    def memoryview(self) -> memoryview:
+        return memoryview(self.pixels)
+
+    def crop(self, x: int, y: int, width: int, height: int) -> np.ndarray | None:
+        lx, ly = x - self.x, y - self.y
+        if lx < 0 or ly < 0 or lx + width > self.width or ly + height > self.height:
+            return None
+        return self.pixels[ly : ly + height, lx : lx + width]
+
+
+class FrameRing:
+    def __init__(self, slots: int, width: int, height: int):
+        _require_numpy()
+        self._slots = max(2, int(slots))
+        self._width = int(width)
+        self._height = int(height)
+        self._buffer = bytearray(self._slots * self._height * self._width * 3)
+        self._frames = np.frombuffer(self._buffer, dtype=np.uint8).reshape(
+            self._slots, self._height, self._width, 3
+        )
+        self._slot_seq = [0] * self._slots
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._latest: Frame | None = None
+
+    @property
+    def slots(self) -> int:
+        return self._slots
+
+    @property
+    def size(self) -> tuple[int, int]:
+        return self._width, self._height
+
+    @property
+    def buffer(self) -> memoryview:
+        return memoryview(self._buffer)
+
+    @property
+    def seq(self) -> int:
+        return self._seq
+
+    def slot_seq(self, slot: int) -> int:
+        return self._slot_seq[slot]
+
+    def begin_write(self) -> tuple[int, np.ndarray]:
+        with self._lock:
+            slot = self._seq % self._slots
+            self._slot_seq[slot] = -1
+            return slot, self._frames[slot]
+
+    def commit(self, slot: int, t: float, x: int, y: int) -> Frame:
+        with self._lock:
+            self._seq += 1
+            self._slot_seq[slot] = self._seq
+            frame = Frame(self, slot, self._seq, t, x, y, self._frames[slot])
+            self._latest = frame
+            return frame
+
+    def latest(self) -> Frame | None:
+        return self._latest
+
+
+class CaptureStream:
+    def __init__(
+        self,
+        source: ScreenSource,
+        region: tuple[int, int, int, int] | None = None,
+        fps: float = 20.0,
+        slots: int = 4,
+        max_age_s: float | None = None,
+    ):
+        _require_numpy()
+        self._source = source
+        self._interval = 1.0 / max(0.1, float(fps))
+        self._slots = max(2, int(slots))
+        self._max_age_s = max_age_s
+
+        self._lock = threading.Lock()
+        self._capture_lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._users = 0
+
+        self._region = region or source.bounds()
+        self._ring = FrameRing(self._slots, self._region[2], self._region[3])
+
+        self.frames = 0
+        self.late_frames = 0
+        self.last_capture_ms = 0.0
+        self.max_capture_ms = 0.0
+
+    @property
+    def source(self) -> ScreenSource:
+        return self._source
+
+    @property
+    def ring(self) -> FrameRing:
+        return self._ring
+
+    @property
+    def region(self) -> tuple[int, int, int, int]:
+        return self._region
+
+    @property
+    def fps(self) -> float:
+        return 1.0 / self._interval
+
+    @property
+    def running(self) -> bool:
+        t = self._thread
+        return t is not None and t.is_alive()
+
+    def set_rate(self, fps: float) -> None:
+        self._interval = 1.0 / max(0.1, float(fps))
+
+    def set_region(self, region: tuple[int, int, int, int] | None) -> None:
+        region = region or self._source.bounds()
+        with self._capture_lock:
+            if region == self._region:
+                return
+            if (region[2], region[3]) != self._ring.size:
+                self._ring = FrameRing(self._slots, region[2], region[3])
+            self._region = region
+
+    def bounds(self) -> tuple[int, int, int, int]:
+        return self._source.bounds()
+
+    def capture_now(self) -> Frame:
+        with self._capture_lock:
+            ring = self._ring
+            x, y, w, h = self._region
+            t0 = time.perf_counter()
+            slot, out = ring.begin_write()
+            np.copyto(out, self._source.grab(x, y, w, h))
+            frame = ring.commit(slot, time.monotonic(), x, y)
+            elapsed = (time.perf_counter() - t0) * 1000.0
+        self.frames += 1
+        self.last_capture_ms = elapsed
+        if elapsed > self.max_capture_ms:
+            self.max_capture_ms = elapsed
+        with self._cond:
+            self._cond.notify_all()
+        return frame
+
+    def latest(self) -> Frame | None:
+        return self._ring.latest()
+
+    def wait_for(self, after_seq: int, timeout: float | None = None) -> Frame | None:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                frame = self._ring.latest()
+                if frame is not None and frame.seq > after_seq:
+                    return frame
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+    def grab(self, x: int, y: int, width: int, height: int) -> np.ndarray:
+        max_age = self._max_age_s if self._max_age_s is not None else self._interval * 1.5
+        frame = self._ring.latest()
+        if frame is None or time.monotonic() - frame.t > max_age:
+            frame = self.capture_now()
+        view = frame.crop(x, y, width, height)
+        if view is None:
+            return self._source.grab(x, y, width, height)
+        return view
+
+    def acquire(self) -> None:
+        with self._lock:
+            self._users += 1
+            if self.running and not self._stop_event.is_set():
+                return
+            self._stop_event = threading.Event()
+            self._thread = threading.Thread(target=self._run, name="screen-capture", daemon=True)
+            self._thread.start()
+
+    def release(self) -> None:
+        with self._lock:
+            self._users = max(0, self._users - 1)
+            if self._users == 0:
+                self._stop_event.set()
+
+    def stop(self) -> None:
+        with self._lock:
+            self._users = 0
+            self._stop_event.set()
+            t = self._thread
+        if t is not None:
+            t.join(timeout=1.0)
+
+    def _run(self) -> None:
+        stop_event = self._stop_event
+        next_tick = time.monotonic()
+        while not stop_event.is_set():
+            try:
+                self.capture_now()
+            except Exception:
+                pass
+            next_tick += self._interval
+            delay = next_tick - time.monotonic()
+            if delay < 0:
+                self.late_frames += 1
+                next_tick = time.monotonic()
+                delay = 0.0
+            stop_event.wait(delay)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.capture",
+        description="Run the capture stream against a generated source and report frame timing.",
+    )
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--region", default="", help="x,y,w,h (default: whole frame)")
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--slots", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args(argv)
+
+    stream = CaptureStream(
+        GeneratedScreenSource(args.width, args.height),
+        region=parse_region(args.region),
+        fps=args.fps,
+        slots=args.slots,
+    )
+    base = stream.ring.buffer
+    seen = 0
+    shared = True
+    stream.acquire()
+    try:
+        deadline = time.monotonic() + max(0.1, args.seconds)
+        last_seq = 0
+        while time.monotonic() < deadline:
+            frame = stream.wait_for(last_seq, timeout=0.5)
+            if frame is None:
+                continue
+            last_seq = frame.seq
+            seen += 1
+            shared = shared and np.shares_memory(frame.pixels, np.frombuffer(base, dtype=np.uint8))
+    finally:
+        stream.stop()
+
+    x, y, w, h = stream.region
+    print(
+        f"region={x},{y},{w}x{h} slots={stream.ring.slots} fps={stream.fps:g} frames={stream.frames} "
+        f"consumed={seen} late={stream.late_frames} capture_last={stream.last_capture_ms:.2f}ms "
+        f"capture_max={stream.max_capture_ms:.2f}ms zero_copy={shared}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .engine import MacroSettings
+
+
+CHECKPOINT_NAME = "checkpoint.json"
+CHECKPOINT_VERSION = 1
+
+# Fields that do not change what a rotation does; a resumed run may differ in these.
+_HASH_EXCLUDE = ("loop_count", "pause_when_unfocused", "pixel_guard_enabled", "watchers_enabled")
+
+
+def settings_hash(settings: MacroSettings) -> str:
+    fields = {k: v for k, v in dataclasses.asdict(settings).items() if k not in _HASH_EXCLUDE}
+    blob = json.dumps(fields, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass(frozen=True)
+class Checkpoint:
+    rotations: int
+    target_loops: int
+    settings_hash: str
+    elapsed_s: float
+    saved_at: float = 0.0
+    session: str = ""
+
+    @property
+    def finished(self) -> bool:
+        return self.target_loops > 0 and self.rotations >= self.target_loops
+
+    def as_dict(self) -> dict[str, object]:
+        return {
+            "version": CHECKPOINT_VERSION,
+            "rotations": self.rotations,
+            "target_loops": self.target_loops,
+            "settings_hash": self.settings_hash,
+            "elapsed_s": round(self.elapsed_s, 3),
+            "saved_at": round(self.saved_at, 3),
+            "session": self.session,
+        }
+
+
+def load_checkpoint(path: Path) -> Checkpoint | None:
+    try:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+    except Exception:
+        return None
+    if not isinstance(data, dict) or data.get("version") != CHECKPOINT_VERSION:
+        return None
+    try:
+        return Checkpoint(
+            rotations=max(0, int(data["rotations"])),
+            target_loops=max(0, int(data.get("target_loops", 0))),
+            settings_hash=str(data.get("settings_hash", "")),
+            elapsed_s=max(0.0, float(data.get("elapsed_s", 0.0))),
+            saved_at=float(data.get("saved_at", 0.0)),
+            session=str(data.get("session", "")),
+        )
+    except Exception:
+        return None
+
+
+def write_atomic(path: Path, text: str) -> None:
+    # Write a sibling temp file, fsync it, then rename over the target so readers never see a torn file.
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=path.name + ".", suffix=".tmp", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except Exception:
+        try:
+            os.unlink(tmp)
+        except Exception:
+            pass
+        raise
+
+
+def clear_checkpoint(path: Path) -> None:
+    try:
+        Path(path).unlink()
+    except FileNotFoundError:
+        pass
+
+
+class CheckpointWriter:
+    def __init__(self, path: Path, interval_s: float = 5.0):
+        self.path = Path(path)
+        self._interval = max(0.1, float(interval_s))
+
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._users = 0
+
+        self._hash = ""
+        self._target = 0
+        self._session = ""
+        # (rotations, elapsed_s), replaced wholesale by the engine thread.
+        self._latest: tuple[int, float] | None = None
+        self._written: tuple[int, float] | None = None
+
+        self.writes = 0
+        self.failures = 0
+        self.last_write_ms = 0.0
+        self.max_write_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        t = self._thread
+        return t is not None and t.is_alive()
+
+    @property
+    def interval_s(self) -> float:
+        return self._interval
+
+    def load(self) -> Checkpoint | None:
+        return load_checkpoint(self.path)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._latest = None
+            self._written = None
+            try:
+                clear_checkpoint(self.path)
+            except Exception:
+                self.failures += 1
+
+    def begin(self, settings_hash: str, target_loops: int, session: str = "") -> None:
+        with self._lock:
+            self._hash = settings_hash
+            self._target = int(target_loops)
+            self._session = session
+            self._latest = None
+            self._written = None
+
+    def update(self, rotations: int, elapsed_s: float) -> None:
+        # Hot path: one tuple store, no I/O and no lock.
+        self._latest = (rotations, elapsed_s)
+
+    def flush(self) -> bool:
+        with self._lock:
+            latest = self._latest
+            if latest is None or latest == self._written:
+                return False
+            checkpoint = Checkpoint(
+                rotations=latest[0],
+                target_loops=self._target,
+                settings_hash=self._hash,
+                elapsed_s=latest[1],
+                saved_at=time.time(),
+                session=self._session,
+            )
+            t0 = time.perf_counter()
+            try:
+                write_atomic(self.path, json.dumps(checkpoint.as_dict(), separators=(",", ":")))
+            except Exception:
+                self.failures += 1
+                return False
+            elapsed = (time.perf_counter() - t0) * 1000.0
+            self._written = latest
+        self.writes += 1
+        self.last_write_ms = elapsed
+        if elapsed > self.max_write_ms:
+            self.max_write_ms = elapsed
+        return True
+
+    def acquire(self) -> None:
+        with self._lock:
+            self._users += 1
+            if self.running and not self._stop_event.is_set():
+                return
+            self._stop_event = threading.Event()
+            self._thread = threading.Thread(target=self._run, name="checkpoint-writer", daemon=True)
+            self._thread.start()
+
+    def release(self) -> None:
+        with self._lock:
+            self._users = max(0, self._users - 1)
+            if self._users == 0:
+                self._stop_event.set()
+
+    def stop(self) -> None:
+        with self._lock:
+            self._users = 0
+            self._stop_event.set()
+            t = self._thread
+        if t is not None:
+            t.join(timeout=1.0)
+
+    def _run(self) -> None:
+        stop_event = self._stop_event
+        while not stop_event.wait(self._interval):
+            self.flush()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.checkpoint",
+        description="Measure the engine-side cost of checkpoint updates and the atomic write time.",
+    )
+    parser.add_argument("--updates", type=int, default=1_000_000)
+    parser.add_argument("--writes", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = CheckpointWriter(Path(tmp) / CHECKPOINT_NAME, interval_s=3600.0)
+        writer.begin("bench", target_loops=args.updates)
+
+        n = max(1, args.updates)
+        t0 = time.perf_counter()
+        for i in range(n):
+            writer.update(i, i * 0.001)
+        update_ns = (time.perf_counter() - t0) * 1e9 / n
+
+        for i in range(max(1, args.writes)):
+            writer.update(n + i, 0.0)
+            writer.flush()
+        loaded = writer.load()
+
+    print(
+        f"update={update_ns:.0f}ns/loop writes={writer.writes} write_last={writer.last_write_ms:.2f}ms "
+        f"write_max={writer.max_write_ms:.2f}ms roundtrip={'ok' if loaded and loaded.rotations == n + args.writes - 1 else 'failed'}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
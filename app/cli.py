@@ -0,0 +1,575 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from .autoit_bridge import AutoItBridge, AutoItBridgeAborted
+from .bootstrap import CONFIG_PATH, RUNNER_PATH, init_runtime_logging
+from .checkpoint import CHECKPOINT_NAME, Checkpoint, CheckpointWriter, settings_hash
+from .config_manager import ConfigManager
+from .engine import MacroEngine, MacroSettings
+from .error_handler import ErrorManager
+from .events import EventLog
+from .logger import shutdown_logging
+from .program import compile_program
+from .targets import validate_targets
+
+if TYPE_CHECKING:
+    from .orchestrator import InputGate, Orchestrator
+
+
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_USAGE = 2
+
+
+def _build_engine(
+    config: ConfigManager,
+    settings: MacroSettings,
+    autoit: AutoItBridge,
+    logger: logging.Logger,
+    events: EventLog,
+    on_finished: Callable[[], None] | None = None,
+    checkpoint_name: str = CHECKPOINT_NAME,
+    input_gate: InputGate | None = None,
+    settings_provider: Callable[[], MacroSettings] | None = None,
+    error_manager: ErrorManager | None = None,
+) -> MacroEngine:
+    kwargs: dict[str, object] = {}
+
+    if settings.target_window:
+        try:
+            from .window import FocusGuard, WindowRectTracker, default_window_provider
+
+            provider = default_window_provider()
+            kwargs["window_tracker"] = WindowRectTracker(
+                provider, refresh_hz=config.getfloat("Location", "WindowRefreshHz", fallback=2.0)
+            )
+            if settings.pause_when_unfocused:
+                kwargs["focus_guard"] = FocusGuard(
+                    provider, poll_hz=config.getfloat("Focus", "PollHz", fallback=10.0)
+                )
+        except Exception as e:
+            logger.warning("Window tracking unavailable: %s", e)
+
+    if settings.pixel_guard_enabled or settings.watchers_enabled:
+        # NumPy and the screen-capture modules are only imported when the config asks for them.
+        try:
+            from .capture import CaptureStream, parse_region
+            from .screen import PixelGuard, default_screen_source
+            from .watchers import StateWatcher, signatures_from_config
+
+            source = default_screen_source()
+            if config.getboolean("Capture", "Enabled", fallback=False):
+                source = kwargs["capture_stream"] = CaptureStream(
+                    source,
+                    region=parse_region(config.get("Capture", "Region", fallback="")),
+                    fps=config.getfloat("Capture", "Fps", fallback=20.0),
+                    slots=config.getint("Capture", "Slots", fallback=4),
+                )
+            if settings.pixel_guard_enabled:
+                guard = PixelGuard(
+                    source,
+                    radius=config.getint("PixelGuard", "Radius", fallback=3),
+                    tolerance=config.getfloat("PixelGuard", "Tolerance", fallback=30.0),
+                    min_match=config.getfloat("PixelGuard", "MinMatch", fallback=0.9),
+                )
+                if guard.load_reference_hex(config.get("PixelGuard", "Reference", fallback="")):
+                    kwargs["pixel_guard"] = guard
+                else:
+                    logger.warning("Pixel guard has no usable reference; clicks are not verified")
+            if settings.watchers_enabled:
+                kwargs["state_watcher"] = StateWatcher(
+                    source,
+                    signatures_from_config(config),
+                    rate_hz=config.getfloat("Watchers", "RateHz", fallback=2.0),
+                )
+        except Exception as e:
+            logger.warning("Screen checks unavailable: %s", e)
+
+    if config.getboolean("Checkpoint", "Enabled", fallback=True):
+        kwargs["checkpoint"] = CheckpointWriter(
+            config.path.parent / checkpoint_name,
+            interval_s=config.getfloat("Checkpoint", "IntervalS", fallback=5.0),
+        )
+
+    return MacroEngine(
+        autoit=autoit,
+        logger=logger,
+        error_manager=error_manager or ErrorManager(logger=logger),
+        settings_provider=settings_provider or (lambda: settings),
+        events=events,
+        on_finished=on_finished,
+        input_gate=input_gate,
+        **kwargs,  # type: ignore[arg-type]
+    )
+
+
+def _install_stop_signals(engine: MacroEngine | Orchestrator, logger: logging.Logger) -> None:
+    def _handler(signum: int, _frame: object) -> None:
+        logger.info("Signal %s received; stopping", signum)
+        engine.emergency_stop()
+
+    for name in ("SIGINT", "SIGTERM", "SIGBREAK"):
+        sig = getattr(signal, name, None)
+        if sig is None:
+            continue
+        try:
+            signal.signal(sig, _handler)
+        except Exception:
+            pass
+
+
+def _register_hotkeys(engine: MacroEngine | Orchestrator, config: ConfigManager, logger: logging.Logger):
+    try:
+        from .hotkeys import HotkeyManager
+
+        hotkeys = HotkeyManager(logger=logger)
+    except Exception as e:
+        logger.warning("Hotkeys unavailable (%s); stop with Ctrl+C", e)
+        return None
+
+    bindings = (
+        ("stop", config.get("Hotkeys", "Stop", fallback="F7"), engine.emergency_stop),
+        ("pause", config.get("Hotkeys", "Pause", fallback="F9"), engine.pause),
+        ("resume", config.get("Hotkeys", "Resume", fallback="F10"), engine.resume),
+    )
+    for name, key, callback in bindings:
+        try:
+            hotkeys.register(name, key, callback)
+        except Exception as e:
+            logger.warning("Failed to register %s hotkey %s: %s", name, key, e)
+    return hotkeys
+
+
+def _resume_point(engine: MacroEngine, settings: MacroSettings, logger: logging.Logger) -> Checkpoint | None:
+    writer = engine.checkpoint
+    checkpoint = writer.load() if writer is not None else None
+    if checkpoint is None:
+        logger.warning("No checkpoint to resume from; starting at loop 0")
+        return None
+    if checkpoint.finished:
+        logger.warning("Checkpoint session already finished; starting at loop 0")
+        return None
+    if checkpoint.settings_hash != settings_hash(settings):
+        logger.warning("Settings changed since the checkpoint was written; resuming anyway")
+    logger.info("Resuming at loop %s (%.0fs already run)", checkpoint.rotations, checkpoint.elapsed_s)
+    return checkpoint
+
+
+def _open_config(path_arg: str | None) -> ConfigManager | None:
+    config_path = Path(path_arg) if path_arg else CONFIG_PATH
+    if not config_path.exists():
+        print(f"Config not found: {config_path}", file=sys.stderr)
+        return None
+
+    config = ConfigManager(config_path)
+    if not config.getboolean("License", "Activated", fallback=False):
+        print("Not activated. Start the GUI once (python -m app.main) to enter your key.", file=sys.stderr)
+        return None
+    return config
+
+
+def _settings_error(settings: MacroSettings) -> str | None:
+    if settings.click_x == 0 and settings.click_y == 0 and not settings.target_window:
+        return "No location selected in the config. Use Pick Location in the GUI first."
+    try:
+        validate_targets(settings.targets, settings.target_order, settings.target_cycle_length)
+    except ValueError as e:
+        return f"Invalid [Targets]: {e}"
+    try:
+        compile_program(settings)
+    except ValueError as e:
+        return f"Invalid [Program] Steps: {e}"
+    return None
+
+
+def cmd_run(args: argparse.Namespace) -> int:
+    config = _open_config(args.config)
+    if config is None:
+        return EXIT_USAGE
+
+    settings = MacroSettings.from_config(config)
+    if args.loops is not None:
+        settings.loop_count = max(0, int(args.loops))
+    error = _settings_error(settings)
+    if error:
+        print(error, file=sys.stderr)
+        return EXIT_USAGE
+
+    logger, events = init_runtime_logging(config)
+    autoit = AutoItBridge(runner_script_path=RUNNER_PATH, logger=logger, events=events)
+    finished = threading.Event()
+    engine = _build_engine(config, settings, autoit, logger, events, on_finished=finished.set)
+
+    hotkeys = None if args.no_hotkeys else _register_hotkeys(engine, config, logger)
+    _install_stop_signals(engine, logger)
+
+    try:
+        logger.info(
+            "Headless run: loops=%s config=%s",
+            settings.loop_count or "infinite",
+            config.path,
+        )
+        resume = _resume_point(engine, settings, logger) if args.resume else None
+        if not engine.start(resume_from=resume):
+            return EXIT_ERROR
+        # Short waits keep the main thread responsive to signals on Windows.
+        while not finished.wait(0.2):
+            pass
+        engine.join(2.0)
+        reason = engine.last_stop_reason
+        logger.info("Headless run finished: %s after %s rotations", reason, engine.rotation_counter)
+        return EXIT_OK if reason in ("completed", "stopped", "aborted") else EXIT_ERROR
+    finally:
+        if hotkeys is not None:
+            hotkeys.shutdown()
+        engine.shutdown()
+        try:
+            autoit.stop()
+        except Exception:
+            pass
+        shutdown_logging()
+
+
+def cmd_orchestrate(args: argparse.Namespace) -> int:
+    from .orchestrator import InputArbiter, Orchestrator, instance_names, instance_settings
+
+    config = _open_config(args.config)
+    if config is None:
+        return EXIT_USAGE
+    names = instance_names(config)
+    if not names:
+        print(
+            "No instances. List them in [Orchestrator] Instances and add an [Instance.NAME] section for each.",
+            file=sys.stderr,
+        )
+        return EXIT_USAGE
+
+    base = MacroSettings.from_config(config)
+    specs: list[tuple[str, MacroSettings]] = []
+    for name in names:
+        settings = instance_settings(config, name, base)
+        if args.loops is not None:
+            settings.loop_count = max(0, int(args.loops))
+        error = _settings_error(settings)
+        if error:
+            print(f"[Instance.{name}] {error}", file=sys.stderr)
+            return EXIT_USAGE
+        specs.append((name, settings))
+
+    logger, events = init_runtime_logging(config)
+    autoit = AutoItBridge(runner_script_path=RUNNER_PATH, logger=logger, events=events)
+    arbiter = InputArbiter(
+        autoit,
+        logger,
+        slice_s=config.getfloat("Orchestrator", "SliceS", fallback=5.0),
+        activate_timeout_s=config.getfloat("Orchestrator", "ActivateTimeoutS", fallback=1.0),
+    )
+    orchestrator = Orchestrator(arbiter, logger)
+    for name, settings in specs:
+        orchestrator.add(
+            name,
+            settings,
+            lambda s, gate, on_finished, name=name: _build_engine(
+                config,
+                s,
+                autoit,
+                logger,
+                events.tagged(instance=name),
+                on_finished=on_finished,
+                checkpoint_name=f"checkpoint.{name}.json",
+                input_gate=gate,
+            ),
+        )
+
+    hotkeys = None if args.no_hotkeys else _register_hotkeys(orchestrator, config, logger)
+    _install_stop_signals(orchestrator, logger)
+
+    report_s = max(0.0, float(args.report_s))
+    try:
+        logger.info("Orchestrating %s instances: %s (slice %.1fs)", len(specs), ", ".join(names), arbiter.slice_s)
+        if not orchestrator.start_all():
+            return EXIT_ERROR
+        next_report = time.monotonic() + report_s
+        # Short waits keep the main thread responsive to signals on Windows.
+        while not orchestrator.wait(0.2):
+            if report_s and time.monotonic() >= next_report:
+                next_report += report_s
+                for row in orchestrator.report():
+                    print(row.as_text(), flush=True)
+        for row in orchestrator.report():
+            print(row.as_text())
+            logger.info("Instance %s", row.as_text())
+        logger.info(
+            "Orchestrator finished: %s switches, window activation mean %.1f ms max %.1f ms, %s failed",
+            arbiter.switches,
+            arbiter.mean_activate_ms,
+            arbiter.max_activate_ms,
+            arbiter.activate_failures,
+        )
+        reasons = {orchestrator.engine(name).last_stop_reason for name in names}
+        return EXIT_OK if reasons <= {"completed", "stopped", "aborted"} else EXIT_ERROR
+    finally:
+        if hotkeys is not None:
+            hotkeys.shutdown()
+        orchestrator.shutdown()
+        try:
+            autoit.stop()
+        except Exception:
+            pass
+        shutdown_logging()
+
+
+def cmd_record(args: argparse.Namespace) -> int:
+    from .cursor import default_cursor_provider
+    from .recording import InputRecorder, RecordingWriter, Win32ButtonProvider
+
+    config = ConfigManager(Path(args.config) if args.config else CONFIG_PATH)
+    stop_key = config.get("Hotkeys", "Stop", fallback="F7")
+    try:
+        cursor = default_cursor_provider()
+        buttons = Win32ButtonProvider()
+    except Exception as e:
+        print(f"Recording unavailable: {e}", file=sys.stderr)
+        return EXIT_ERROR
+
+    done = threading.Event()
+    for name in ("SIGINT", "SIGTERM", "SIGBREAK"):
+        sig = getattr(signal, name, None)
+        if sig is not None:
+            try:
+                signal.signal(sig, lambda *_: done.set())
+            except Exception:
+                pass
+
+    hotkeys = None
+    try:
+        from .hotkeys import HotkeyManager
+
+        hotkeys = HotkeyManager(logger=logging.getLogger(__name__))
+        hotkeys.register("stop", stop_key, done.set)
+    except Exception:
+        hotkeys = None
+
+    writer = RecordingWriter(Path(args.out))
+    recorder = InputRecorder(
+        writer,
+        cursor,
+        buttons,
+        rate_hz=args.rate,
+        record_keys=not args.no_keys,
+        ignore_keys=(stop_key,),
+    )
+    print(f"Recording to {args.out}; press {stop_key} or Ctrl+C to stop", file=sys.stderr)
+    started = time.perf_counter()
+    recorder.start()
+    try:
+        while not done.wait(0.2):
+            if args.seconds and time.perf_counter() - started >= args.seconds:
+                break
+    finally:
+        recorder.stop()
+        writer.close()
+        if hotkeys is not None:
+            hotkeys.shutdown()
+    print(
+        f"events={writer.events} bytes={writer.bytes_written} seconds={time.perf_counter() - started:.1f} "
+        f"late_samples={recorder.late_samples}"
+    )
+    return EXIT_OK
+
+
+def cmd_replay(args: argparse.Namespace) -> int:
+    from .recording import RecordingPlayer
+
+    path = Path(args.recording)
+    if not path.exists():
+        print(f"Recording not found: {path}", file=sys.stderr)
+        return EXIT_USAGE
+
+    config = ConfigManager(Path(args.config) if args.config else CONFIG_PATH)
+    logger, events = init_runtime_logging(config)
+    autoit = AutoItBridge(runner_script_path=RUNNER_PATH, logger=logger, events=events)
+    stop_event = threading.Event()
+
+    def _stop() -> None:
+        stop_event.set()
+        autoit.abort()
+
+    for name in ("SIGINT", "SIGTERM", "SIGBREAK"):
+        sig = getattr(signal, name, None)
+        if sig is not None:
+            try:
+                signal.signal(sig, lambda *_: _stop())
+            except Exception:
+                pass
+    hotkeys = None
+    if not args.no_hotkeys:
+        try:
+            from .hotkeys import HotkeyManager
+
+            hotkeys = HotkeyManager(logger=logger)
+            hotkeys.register("stop", config.get("Hotkeys", "Stop", fallback="F7"), _stop)
+        except Exception as e:
+            logger.warning("Hotkeys unavailable (%s); stop with Ctrl+C", e)
+
+    player = RecordingPlayer(autoit, path, speed=args.speed, max_lag_ms=args.max_lag_ms)
+    try:
+        for i in range(max(1, args.repeat)):
+            stats = player.play(stop_event)
+            logger.info(
+                "Replay %s/%s: %s events in %.1fs, %s late moves dropped, lateness mean %.2f ms max %.2f ms",
+                i + 1,
+                args.repeat,
+                stats.events,
+                stats.duration_s,
+                stats.skipped_moves,
+                stats.mean_late_ms,
+                stats.max_late_ms,
+            )
+            if stats.stopped:
+                break
+        return EXIT_OK
+    except AutoItBridgeAborted:
+        return EXIT_OK
+    except Exception as e:
+        logger.error("Replay failed: %s", e)
+        return EXIT_ERROR
+    finally:
+        if hotkeys is not None:
+            hotkeys.shutdown()
+        try:
+            autoit.stop()
+        except Exception:
+            pass
+        shutdown_logging()
+
+
+_PROBE = r"""
+import json, sys, time
+t0 = time.perf_counter()
+error = ""
+try:
+    import {module}
+except Exception as e:
+    error = f"{{type(e).__name__}}: {{e}}"
+elapsed = (time.perf_counter() - t0) * 1000.0
+rss = 0.0
+try:
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024.0 if sys.platform != "darwin" else 1024.0 * 1024.0)
+except ImportError:
+    import ctypes
+    from ctypes import wintypes
+
+    class PMC(ctypes.Structure):
+        _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+            (n, ctypes.c_size_t)
+            for n in (
+                "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+                "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage",
+            )
+        ]
+
+    pmc = PMC()
+    pmc.cb = ctypes.sizeof(PMC)
+    proc = ctypes.windll.kernel32.GetCurrentProcess()
+    if ctypes.windll.psapi.GetProcessMemoryInfo(proc, ctypes.byref(pmc), pmc.cb):
+        rss = pmc.PeakWorkingSetSize / (1024.0 * 1024.0)
+print(json.dumps({{
+    "import_ms": round(elapsed, 1),
+    "peak_rss_mb": round(rss, 1),
+    "modules": len(sys.modules),
+    "tkinter": "tkinter" in sys.modules,
+    "numpy": "numpy" in sys.modules,
+    "error": error,
+}}))
+"""
+
+
+def cmd_startup(args: argparse.Namespace) -> int:
+    root_dir = Path(__file__).resolve().parents[1]
+    targets = (("headless", "app.cli"), ("gui", "app.main"))
+    for label, module in targets:
+        runs = []
+        for _ in range(max(1, args.repeat)):
+            out = subprocess.run(
+                [sys.executable, "-c", _PROBE.format(module=module)],
+                cwd=str(root_dir),
+                capture_output=True,
+                text=True,
+            )
+            try:
+                runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+            except Exception:
+                runs.append({"error": (out.stderr.strip().splitlines() or ["probe failed"])[-1]})
+        ok = [r for r in runs if not r.get("error")]
+        if not ok:
+            print(f"{label:<8} {module:<8} unavailable: {runs[-1].get('error')}")
+            continue
+        ok.sort(key=lambda r: r["import_ms"])
+        best = ok[len(ok) // 2]
+        print(
+            f"{label:<8} {module:<8} import={best['import_ms']:.1f}ms peak_rss={best['peak_rss_mb']:.1f}MB "
+            f"modules={best['modules']} tkinter={best['tkinter']} numpy={best['numpy']}"
+        )
+    return EXIT_OK
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Run the macro without the GUI.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Run the macro from a config file")
+    run.add_argument("--config", default=None, help=f"Config file (default: {CONFIG_PATH})")
+    run.add_argument("--loops", type=int, default=None, help="Override [Loops] LoopCount (0 = infinite)")
+    run.add_argument("--no-hotkeys", action="store_true", help="Do not register the global stop hotkey")
+    run.add_argument("--resume", action="store_true", help="Continue from the last checkpoint if one exists")
+    run.set_defaults(func=cmd_run)
+
+    orchestrate = sub.add_parser("orchestrate", help="Run every [Orchestrator] instance over one shared input backend")
+    orchestrate.add_argument("--config", default=None, help=f"Config file (default: {CONFIG_PATH})")
+    orchestrate.add_argument("--loops", type=int, default=None, help="Override LoopCount for every instance")
+    orchestrate.add_argument(
+        "--report-s", type=float, default=60.0, help="Print per-instance throughput every N seconds (0 = at the end)"
+    )
+    orchestrate.add_argument("--no-hotkeys", action="store_true", help="Do not register the global stop hotkey")
+    orchestrate.set_defaults(func=cmd_orchestrate)
+
+    record = sub.add_parser("record", help="Record mouse and keyboard input to a compact binary file")
+    record.add_argument("out", help="Output file (e.g. recordings/farm.mrec)")
+    record.add_argument("--config", default=None, help=f"Config file for the Stop hotkey (default: {CONFIG_PATH})")
+    record.add_argument("--rate", type=float, default=120.0, help="Cursor samples per second")
+    record.add_argument("--seconds", type=float, default=0.0, help="Stop after N seconds (0 = until stopped)")
+    record.add_argument("--no-keys", action="store_true", help="Record mouse input only")
+    record.set_defaults(func=cmd_record)
+
+    replay = sub.add_parser("replay", help="Replay a recording through AutoIt")
+    replay.add_argument("recording")
+    replay.add_argument("--config", default=None, help=f"Config file (default: {CONFIG_PATH})")
+    replay.add_argument("--speed", type=float, default=1.0, help="Playback speed multiplier")
+    replay.add_argument("--repeat", type=int, default=1)
+    replay.add_argument("--max-lag-ms", type=float, default=50.0, help="Drop moves that are later than this")
+    replay.add_argument("--no-hotkeys", action="store_true", help="Do not register the global stop hotkey")
+    replay.set_defaults(func=cmd_replay)
+
+    startup = sub.add_parser("startup", help="Compare import time and peak RSS of the headless and GUI paths")
+    startup.add_argument("--repeat", type=int, default=5)
+    startup.set_defaults(func=cmd_startup)
+
+    args = parser.parse_args(argv)
+    return int(args.func(args))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import threading
+import time
+
+
+class Clock:
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def wait(self, event: threading.Event, seconds: float) -> bool:
+        return event.wait(seconds)
+
+
+class VirtualClock(Clock):
+    def __init__(self, start: float = 0.0):
+        self._lock = threading.Lock()
+        self._now = float(start)
+
+    def monotonic(self) -> float:
+        return self._now
+
+    def advance(self, seconds: float) -> float:
+        with self._lock:
+            if seconds > 0:
+                self._now += seconds
+            return self._now
+
+    def wait(self, event: threading.Event, seconds: float) -> bool:
+        if event.is_set():
+            return True
+        self.advance(seconds)
+        return event.is_set()
+
+
+MONOTONIC_CLOCK = Clock()
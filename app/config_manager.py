@@ -73,10 +73,19 @@ class ConfigManager:
 
             _set("Location", "ClickX", 0)
             _set("Location", "ClickY", 0)
+            _set("Location", "RelativeToWindow", 0)
+            _set("Location", "Window", "")
+            _set("Location", "WindowX", 0)
+            _set("Location", "WindowY", 0)
+            _set("Location", "RefWidth", 0)
+            _set("Location", "RefHeight", 0)
+            _set("Location", "WindowRefreshHz", 2)
 
             _set("Hotkeys", "Start", "F6")
             _set("Hotkeys", "Stop", "F7")
             _set("Hotkeys", "ConfirmLocation", "F8")
+            _set("Hotkeys", "Pause", "F9")
+            _set("Hotkeys", "Resume", "F10")
 
             _set("Movement", "Radius", 25)
             _set("Movement", "SpinSpeed", 10)
@@ -93,8 +102,59 @@ class ConfigManager:
             _set("Loops", "PostLoopKeyEnabled", 0)
             _set("Loops", "PostLoopKey", "SPACE")
 
+            _set("Focus", "PauseWhenUnfocused", 0)
+            _set("Focus", "PollHz", 10)
+
+            _set("PixelGuard", "Enabled", 0)
+            _set("PixelGuard", "Radius", 3)
+            _set("PixelGuard", "Tolerance", 30)
+            _set("PixelGuard", "MinMatch", 0.9)
+            _set("PixelGuard", "Reference", "")
+
+            _set("Locator", "LocateOnStart", 0)
+            _set("Locator", "TemplateSize", 48)
+            _set("Locator", "SearchMargin", 300)
+            _set("Locator", "Levels", 3)
+            _set("Locator", "Scales", "1.0")
+            _set("Locator", "MinScore", 0.8)
+            _set("Locator", "Workers", 0)
+
+            _set("Capture", "Enabled", 0)
+            _set("Capture", "Fps", 20)
+            _set("Capture", "Slots", 4)
+            _set("Capture", "Region", "")
+
+            _set("Watchers", "Enabled", 0)
+            _set("Watchers", "RateHz", 2)
+            _set("Watchers", "Names", "")
+
+            _set("Program", "Steps", "")
+
+            _set("Checkpoint", "Enabled", 1)
+            _set("Checkpoint", "IntervalS", 5)
+
+            _set("Targets", "Points", "")
+            _set("Targets", "WindowPoints", "")
+            _set("Targets", "Order", "round_robin")
+            _set("Targets", "Seed", 0)
+            _set("Targets", "CycleLength", 0)
+
+            _set("Orchestrator", "Instances", "")
+            _set("Orchestrator", "SliceS", 5)
+            _set("Orchestrator", "ActivateTimeoutS", 1)
+
+            _set("Engine", "Isolated", 0)
+
             _set("UI", "LastTab", 0)
             _set("UI", "Geometry", "900x692+477+142")
+            _set("UI", "CursorSampleHz", 120)
 
             _set("Debug", "Level", "INFO")
+            _set("Debug", "LogQueueSize", 10000)
+            _set("Debug", "LogQueuePolicy", "drop")
+            _set("Debug", "LogMaxBytes", 5 * 1024 * 1024)
+            _set("Debug", "LogRotateDaily", 1)
+            _set("Debug", "LogBackupCount", 7)
+            _set("Debug", "LogRetentionDays", 14)
+            _set("Debug", "EventLog", 1)
             self.save()
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import ctypes
+import itertools
+import threading
+import time
+from collections import deque
+from collections.abc import Iterable
+from ctypes import wintypes
+from typing import Protocol
+
+
+class _POINT(ctypes.Structure):
+    _fields_ = [("x", wintypes.LONG), ("y", wintypes.LONG)]
+
+
+class CursorProvider(Protocol):
+    def read(self) -> tuple[int, int]: ...
+
+
+class Win32CursorProvider:
+    def __init__(self):
+        try:
+            fn = ctypes.windll.user32.GetCursorPos  # type: ignore[attr-defined]
+        except Exception as e:
+            raise RuntimeError("Win32 cursor provider requires Windows (user32.GetCursorPos)") from e
+        fn.argtypes = [ctypes.POINTER(_POINT)]
+        fn.restype = wintypes.BOOL
+        self._fn = fn
+        self._pt = _POINT()
+        self._pt_ref = ctypes.byref(self._pt)
+        self._lock = threading.Lock()
+
+    def read(self) -> tuple[int, int]:
+        with self._lock:
+            self._fn(self._pt_ref)
+            return int(self._pt.x), int(self._pt.y)
+
+
+class ScriptedCursorProvider:
+    def __init__(self, points: Iterable[tuple[int, int]], loop: bool = True):
+        pts = list(points)
+        if not pts:
+            raise ValueError("ScriptedCursorProvider needs at least one point")
+        self._source = itertools.cycle(pts) if loop else iter(pts)
+        self._last = pts[0]
+        self._lock = threading.Lock()
+
+    def read(self) -> tuple[int, int]:
+        with self._lock:
+            self._last = next(self._source, self._last)
+            return self._last
+
+
+_default_provider: CursorProvider | None = None
+
+
+def default_cursor_provider() -> CursorProvider:
+    global _default_provider
+    if _default_provider is None:
+        _default_provider = Win32CursorProvider()
+    return _default_provider
+
+
+class CursorSampler:
+    def __init__(
+        self,
+        provider: CursorProvider,
+        rate_hz: float = 120.0,
+        history_size: int = 128,
+    ):
+        self._provider = provider
+        self._interval = 1.0 / max(1.0, float(rate_hz))
+        self._lock = threading.Lock()
+        self._history: deque[tuple[float, int, int]] = deque(maxlen=max(1, int(history_size)))
+        self._latest: tuple[float, int, int] | None = None
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._users = 0
+
+    @property
+    def running(self) -> bool:
+        t = self._thread
+        return t is not None and t.is_alive()
+
+    @property
+    def rate_hz(self) -> float:
+        return 1.0 / self._interval
+
+    def set_rate(self, rate_hz: float) -> None:
+        self._interval = 1.0 / max(1.0, float(rate_hz))
+
+    def sample_now(self) -> tuple[int, int]:
+        x, y = self._provider.read()
+        entry = (time.monotonic(), x, y)
+        with self._lock:
+            self._latest = entry
+            self._history.append(entry)
+        return x, y
+
+    def latest(self) -> tuple[int, int] | None:
+        entry = self._latest
+        if entry is None:
+            return None
+        return entry[1], entry[2]
+
+    def history(self) -> list[tuple[float, int, int]]:
+        with self._lock:
+            return list(self._history)
+
+    def acquire(self) -> None:
+        with self._lock:
+            self._users += 1
+            if self.running and not self._stop_event.is_set():
+                return
+            self._stop_event = threading.Event()
+            self._thread = threading.Thread(target=self._run, name="cursor-sampler", daemon=True)
+            self._thread.start()
+
+    def release(self) -> None:
+        with self._lock:
+            self._users = max(0, self._users - 1)
+            if self._users == 0:
+                self._stop_event.set()
+
+    def stop(self) -> None:
+        with self._lock:
+            self._users = 0
+            self._stop_event.set()
+            t = self._thread
+        if t is not None:
+            t.join(timeout=1.0)
+
+    def _run(self) -> None:
+        stop_event = self._stop_event
+        next_tick = time.monotonic()
+        while not stop_event.is_set():
+            try:
+                self.sample_now()
+            except Exception:
+                pass
+            next_tick += self._interval
+            delay = next_tick - time.monotonic()
+            if delay < 0:
+                next_tick = time.monotonic()
+                delay = 0.0
+            stop_event.wait(delay)
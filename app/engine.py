@@ -0,0 +1,773 @@
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from .actions import key_name_to_autoit_send
+from .autoit_bridge import AutoItBridge, AutoItBridgeAborted, AutoItBridgeError
+from .checkpoint import Checkpoint, CheckpointWriter, settings_hash
+from .clock import MONOTONIC_CLOCK, Clock
+from .config_manager import ConfigManager
+from .error_handler import ErrorManager
+from .estimator import ThroughputEstimator
+from .events import (
+    EVENT_BRIDGE_ERROR,
+    EVENT_CLICK,
+    EVENT_CLICK_SKIPPED,
+    EVENT_FOCUS_LOST,
+    EVENT_FOCUS_REGAINED,
+    EVENT_KEY,
+    EVENT_PAUSED,
+    EVENT_RECOVERY_DONE,
+    EVENT_RECOVERY_START,
+    EVENT_RESUMED,
+    EVENT_ROTATION_DONE,
+    EventLog,
+)
+from .logger import LOG_FLAGS, PointsSummary
+from .program import (
+    OP_BRANCH,
+    OP_CLICK,
+    OP_HOLD,
+    OP_JUMP,
+    OP_KEY,
+    OP_NEXT,
+    OP_PATH,
+    OP_REPEAT,
+    OP_WAIT,
+    Plan,
+    compile_program,
+)
+from .targets import ClickTarget, VisitOrder, parse_targets
+from .window import IDENTITY_TRANSFORM, AffineTransform, FocusGuard, WindowRectTracker
+
+if TYPE_CHECKING:
+    # NumPy-backed helpers; kept out of the runtime import graph for headless runs.
+    from .capture import CaptureStream
+    from .orchestrator import InputGate
+    from .screen import PixelGuard
+    from .watchers import StateWatcher, WatchSignature
+
+
+@dataclass
+class MacroSettings:
+    click_x: int = 0
+    click_y: int = 0
+    target_window: str = ""
+    window_x: int = 0
+    window_y: int = 0
+    ref_width: int = 0
+    ref_height: int = 0
+    radius: int = 25
+    spin_speed: int = 10
+    move_speed: int = 10
+    step_delay_ms: int = 20
+    clockwise: bool = True
+    center_click_every: int = 1
+    before_click_delay_ms: int = 0
+    after_click_delay_ms: int = 0
+    loop_count: int = 0
+    per_loop_delay_ms: int = 0
+    post_loop_key_enabled: bool = False
+    post_loop_key: str = "SPACE"
+    pause_when_unfocused: bool = False
+    pixel_guard_enabled: bool = False
+    watchers_enabled: bool = False
+    program: str = ""
+    targets: str = ""
+    target_order: str = "round_robin"
+    target_seed: int = 0
+    target_cycle_length: int = 0
+
+    @classmethod
+    def from_config(cls, config: ConfigManager) -> MacroSettings:
+        relative = config.getboolean("Location", "RelativeToWindow", fallback=False)
+        return cls(
+            click_x=config.getint("Location", "ClickX", fallback=0),
+            click_y=config.getint("Location", "ClickY", fallback=0),
+            target_window=config.get("Location", "Window", fallback="") if relative else "",
+            window_x=config.getint("Location", "WindowX", fallback=0),
+            window_y=config.getint("Location", "WindowY", fallback=0),
+            ref_width=config.getint("Location", "RefWidth", fallback=0),
+            ref_height=config.getint("Location", "RefHeight", fallback=0),
+            radius=config.getint("Movement", "Radius", fallback=25),
+            spin_speed=config.getint("Movement", "SpinSpeed", fallback=10),
+            move_speed=config.getint("Movement", "MoveSpeed", fallback=10),
+            step_delay_ms=config.getint("Movement", "StepDelayMs", fallback=20),
+            clockwise=config.getboolean("Movement", "Clockwise", fallback=True),
+            center_click_every=config.getint("Clicking", "CenterClickEveryRotations", fallback=1),
+            before_click_delay_ms=config.getint("Clicking", "BeforeClickDelayMs", fallback=0),
+            after_click_delay_ms=config.getint("Clicking", "AfterClickDelayMs", fallback=0),
+            loop_count=config.getint("Loops", "LoopCount", fallback=0),
+            per_loop_delay_ms=config.getint("Loops", "PerLoopDelayMs", fallback=0),
+            post_loop_key_enabled=config.getboolean("Loops", "PostLoopKeyEnabled", fallback=False),
+            post_loop_key=config.get("Loops", "PostLoopKey", fallback="SPACE"),
+            pause_when_unfocused=config.getboolean("Focus", "PauseWhenUnfocused", fallback=False),
+            pixel_guard_enabled=config.getboolean("PixelGuard", "Enabled", fallback=False),
+            watchers_enabled=config.getboolean("Watchers", "Enabled", fallback=False),
+            program=config.get("Program", "Steps", fallback=""),
+            targets=config.get("Targets", "WindowPoints" if relative else "Points", fallback=""),
+            target_order=config.get("Targets", "Order", fallback="round_robin"),
+            target_seed=config.getint("Targets", "Seed", fallback=0),
+            target_cycle_length=config.getint("Targets", "CycleLength", fallback=0),
+        )
+
+
+PASS_DONE = 0
+PASS_STOPPED = 1
+PASS_INTERRUPTED = 2
+
+
+class MacroEngine:
+    def __init__(
+        self,
+        autoit: AutoItBridge,
+        logger: logging.Logger,
+        error_manager: ErrorManager,
+        settings_provider: Callable[[], MacroSettings],
+        events: EventLog | None = None,
+        on_finished: Callable[[], None] | None = None,
+        window_tracker: WindowRectTracker | None = None,
+        focus_guard: FocusGuard | None = None,
+        pixel_guard: PixelGuard | None = None,
+        capture_stream: CaptureStream | None = None,
+        state_watcher: StateWatcher | None = None,
+        clock: Clock | None = None,
+        checkpoint: CheckpointWriter | None = None,
+        input_gate: InputGate | None = None,
+    ):
+        self.autoit = autoit
+        self.logger = logger
+        self.error_manager = error_manager
+        self.events = events or EventLog()
+        self._settings_provider = settings_provider
+        self._on_finished = on_finished
+        self.window_tracker = window_tracker
+        self.focus_guard = focus_guard
+        self.pixel_guard = pixel_guard
+        self.capture_stream = capture_stream
+        self.state_watcher = state_watcher
+        self.clock = clock or MONOTONIC_CLOCK
+        self.throughput = ThroughputEstimator()
+        self.checkpoint = checkpoint
+        self.input_gate = input_gate
+        # Every stop check goes through this session's event; an isolated engine also reads a shared flag there.
+        self.stop_event_factory: Callable[[], threading.Event] = threading.Event
+
+        self._lock = threading.RLock()
+        self._thread: threading.Thread | None = None
+        self._stop_event = threading.Event()
+        # The worker outlives sessions and parks here between them and while paused.
+        self._park = threading.Condition()
+        self._session_pending = False
+        self._session_active = False
+        self._session_done = threading.Event()
+        self._session_done.set()
+        self._shutdown = False
+        self._paused = False
+        self._resume_requested_at: float | None = None
+        self.paused_s = 0.0
+        self.last_resume_latency_ms: float | None = None
+        self._elapsed_offset_s = 0.0
+        self._rotation_counter = 0
+        self._focus_paused = False
+        self._active_guard: FocusGuard | None = None
+        self._active_watcher: StateWatcher | None = None
+        self._recovering = False
+        self.focus_paused_s = 0.0
+
+        self._stop_requested_at: float | None = None
+        self._last_input_at: float | None = None
+        self.last_stop_latency_ms: float | None = None
+        self.last_stop_exit_ms: float | None = None
+        self.last_stop_reason = ""
+
+    @property
+    def running(self) -> bool:
+        return self._session_active
+
+    @property
+    def paused(self) -> bool:
+        return self._paused
+
+    @property
+    def rotation_counter(self) -> int:
+        return self._rotation_counter
+
+    @property
+    def focus_paused(self) -> bool:
+        return self._focus_paused
+
+    @property
+    def recovering(self) -> bool:
+        return self._recovering
+
+    @property
+    def stop_requested(self) -> bool:
+        return self._stop_event.is_set()
+
+    def start(self, resume_from: Checkpoint | None = None) -> bool:
+        with self._lock:
+            if self._session_active:
+                return False
+            self._stop_event = self.stop_event_factory()
+            self._rotation_counter = resume_from.rotations if resume_from is not None else 0
+            self._elapsed_offset_s = resume_from.elapsed_s if resume_from is not None else 0.0
+            self.focus_paused_s = 0.0
+            self.paused_s = 0.0
+            self._paused = False
+            self._stop_requested_at = None
+            self._last_input_at = None
+            self.last_stop_reason = ""
+            self.autoit.reset_abort()
+            if self.pixel_guard is not None:
+                self.pixel_guard.reset_stats()
+            self._session_active = True
+            self._session_done.clear()
+            t = self._thread
+            if t is None or not t.is_alive():
+                self._shutdown = False
+                self._thread = threading.Thread(target=self._worker, name="macro-engine", daemon=True)
+                self._thread.start()
+            with self._park:
+                self._session_pending = True
+                self._park.notify_all()
+            return True
+
+    def request_stop(self) -> None:
+        if self._stop_requested_at is None:
+            self._stop_requested_at = time.perf_counter()
+        self._stop_event.set()
+        with self._park:
+            self._park.notify_all()
+        if self.focus_guard is not None:
+            self.focus_guard.wake()
+        if self.input_gate is not None:
+            self.input_gate.wake()
+
+    def pause(self) -> bool:
+        with self._park:
+            if not self._session_active or self._paused or self._stop_event.is_set():
+                return False
+            self._paused = True
+        self.logger.info("Macro paused at rotation %s", self._rotation_counter)
+        self.events.emit(EVENT_PAUSED, n=self._rotation_counter)
+        return True
+
+    def resume(self) -> bool:
+        with self._park:
+            if not self._paused:
+                return False
+            self._paused = False
+            self._resume_requested_at = time.perf_counter()
+            self._park.notify_all()
+        return True
+
+    def toggle_pause(self) -> bool:
+        return self.resume() or self.pause()
+
+    def shutdown(self, timeout: float | None = 2.0) -> None:
+        self.request_stop()
+        with self._park:
+            self._shutdown = True
+            self._park.notify_all()
+        t = self._thread
+        if t is not None and t is not threading.current_thread():
+            t.join(timeout)
+
+    def emergency_stop(self) -> None:
+        # Safe to call from the hotkey-dispatch thread: no Tk, no engine lock.
+        self.request_stop()
+        if self.running:
+            self.autoit.abort()
+
+    def join(self, timeout: float | None = None) -> None:
+        self._session_done.wait(timeout)
+
+    def _sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            self.clock.wait(self._stop_event, seconds)
+
+    def _mark_input(self) -> None:
+        self._last_input_at = time.perf_counter()
+
+    def _await_resume(self) -> None:
+        if not self._paused:
+            return
+
+        # A paused instance must not keep the shared input from the others.
+        gate = self.input_gate
+        if gate is not None:
+            gate.yield_slice(force=True)
+        started = time.monotonic()
+        with self._park:
+            while self._paused and not self._stop_event.is_set():
+                self._park.wait()
+        woke = time.perf_counter()
+        paused = time.monotonic() - started
+        self.paused_s += paused
+        requested = self._resume_requested_at
+        self.last_resume_latency_ms = (woke - requested) * 1000.0 if requested is not None else None
+        self.events.emit(EVENT_RESUMED, paused=round(paused, 3))
+        if not self._stop_event.is_set() and self.last_resume_latency_ms is not None:
+            self.logger.info(
+                "Macro resumed at rotation %s after %.1fs (%.3f ms wake-up)",
+                self._rotation_counter,
+                paused,
+                self.last_resume_latency_ms,
+            )
+        if gate is not None:
+            self._enter_gate()
+
+    def _enter_gate(self) -> bool:
+        gate = self.input_gate
+        if gate is None:
+            return True
+        if not gate.enter(self._stop_event):
+            return False
+        if self._active_guard is not None:
+            # The arbiter has just activated this instance's window; do not wait for the next focus poll.
+            self._active_guard.poll()
+        return True
+
+    def _await_focus(self) -> None:
+        self._await_resume()
+        guard = self._active_guard
+        if guard is None or guard.focused:
+            return
+
+        started = time.monotonic()
+        self._focus_paused = True
+        self.logger.info("Target window lost focus; pausing input")
+        self.events.emit(EVENT_FOCUS_LOST)
+        guard.wait_focused(self._stop_event.is_set)
+        paused = time.monotonic() - started
+        self._focus_paused = False
+        self.focus_paused_s += paused
+        self.events.emit(EVENT_FOCUS_REGAINED, paused=round(paused, 3))
+        if not self._stop_event.is_set():
+            self.logger.info("Target window focused again after %.1fs", paused)
+
+    def _start_focus_guard(self, settings: MacroSettings) -> None:
+        guard = self.focus_guard
+        self._active_guard = None
+        tracker = self.window_tracker
+        if guard is None or not settings.pause_when_unfocused or not settings.target_window or tracker is None:
+            return
+
+        # Only a configured window is guarded: the window under the click point may be this app itself.
+        handle = tracker.handle
+        if handle is None:
+            return
+
+        guard.set_target(handle)
+        guard.acquire()
+        self._active_guard = guard
+
+    def _pixel_guard_allows(self, settings: MacroSettings, x: int, y: int) -> bool:
+        guard = self.pixel_guard
+        if guard is None or not settings.pixel_guard_enabled or not guard.has_reference:
+            return True
+        try:
+            if guard.matches(x, y):
+                return True
+        except Exception as e:
+            self.error_manager.report("Pixel guard sample failed", e)
+            return True
+
+        self.logger.action(
+            "Skipped center click at (%s, %s): pixels match %.0f%% of reference", x, y, guard.last_score * 100
+        )
+        self.events.emit(EVENT_CLICK_SKIPPED, x=x, y=y, score=round(guard.last_score, 3))
+        return False
+
+    def _recovery_pending(self) -> bool:
+        watcher = self._active_watcher
+        return watcher is not None and watcher.pending is not None
+
+    def _run_recovery(self, settings: MacroSettings) -> bool:
+        watcher = self._active_watcher
+        sig: WatchSignature | None = watcher.take_pending() if watcher is not None else None
+        if watcher is None or sig is None:
+            return False
+
+        started = self.clock.monotonic()
+        self._recovering = True
+        self.logger.warning("State watcher matched %s; running recovery (%s steps)", sig.name, len(sig.recovery))
+        self.events.emit(EVENT_RECOVERY_START, name=sig.name, score=round(watcher.last_scores.get(sig.name, 0.0), 3))
+        try:
+            for op, args in sig.recovery:
+                if self._stop_event.is_set():
+                    break
+                if op == "wait":
+                    self._sleep(args[0] / 1000.0)
+                    continue
+                self._await_focus()
+                if self._stop_event.is_set():
+                    break
+                if op == "click":
+                    self.logger.action("Recovery click at (%s, %s)", args[0], args[1])
+                    self.autoit.mouse_click(args[0], args[1])
+                elif op == "move":
+                    self.autoit.mouse_move(args[0], args[1], int(settings.move_speed))
+                elif op == "key":
+                    self.logger.action("Recovery key: %s", args[0])
+                    self.autoit.send_key(key_name_to_autoit_send(args[0]))
+                self._mark_input()
+        finally:
+            watcher.acknowledge(sig)
+            self._recovering = False
+            self.events.emit(EVENT_RECOVERY_DONE, name=sig.name, dur=round(self.clock.monotonic() - started, 3))
+        return True
+
+    def _watcher_matches(self, name: str) -> bool:
+        watcher = self._active_watcher
+        return watcher is not None and watcher.matched(name)
+
+    def _run_plan(self, plan: Plan, settings: MacroSettings, transform: AffineTransform) -> tuple[int, int]:
+        ops = plan.ops
+        n = len(ops)
+        counters = [0] * plan.slots
+        apply = transform.apply
+        stop = self._stop_event
+        autoit = self.autoit
+        pass_no = self._rotation_counter + 1
+        clicks = 0
+        pc = 0
+        while pc < n:
+            if stop.is_set():
+                return PASS_STOPPED, clicks
+            if self._recovery_pending():
+                return PASS_INTERRUPTED, clicks
+            op = ops[pc]
+            code = op[0]
+            pc += 1
+
+            if code == OP_PATH:
+                _, points, move_speed, step_delay, label = op
+                trace_points: list[tuple[int, int]] | None = [] if LOG_FLAGS.trace else None
+                for px, py in points:
+                    if stop.is_set() or self._recovery_pending():
+                        break
+                    x, y = apply(px, py)
+                    self._await_focus()
+                    if stop.is_set():
+                        break
+                    if trace_points is not None:
+                        trace_points.append((x, y))
+                    autoit.mouse_move(x, y, move_speed)
+                    self._mark_input()
+                    self._sleep(step_delay)
+                if trace_points is not None:
+                    self.logger.trace(
+                        "Path rotation=%s %s points=%s path=%s",
+                        pass_no,
+                        label,
+                        len(trace_points),
+                        PointsSummary(trace_points),
+                    )
+
+            elif code == OP_CLICK:
+                _, bx, by, button, every, before, after, guarded = op
+                if pass_no % every:
+                    continue
+                self._sleep(before)
+                if stop.is_set():
+                    return PASS_STOPPED, clicks
+                self._await_focus()
+                if stop.is_set():
+                    return PASS_STOPPED, clicks
+                cx, cy = apply(bx, by)
+                if guarded and not self._pixel_guard_allows(settings, cx, cy):
+                    continue
+                self.logger.action("Click %s at (%s, %s)", "center" if guarded else button, cx, cy)
+                if button == "left":
+                    autoit.mouse_click(cx, cy)
+                else:
+                    autoit.mouse_click(cx, cy, button)
+                self._mark_input()
+                self.events.emit(EVENT_CLICK, x=cx, y=cy)
+                clicks += 1
+                self._sleep(after)
+
+            elif code == OP_KEY:
+                _, send, name = op
+                self._await_focus()
+                if stop.is_set():
+                    return PASS_STOPPED, clicks
+                self.logger.action("Key: %s", name)
+                autoit.send_key(send)
+                self._mark_input()
+                self.events.emit(EVENT_KEY, key=name)
+
+            elif code == OP_HOLD:
+                _, down, up, seconds, name = op
+                self._await_focus()
+                if stop.is_set():
+                    return PASS_STOPPED, clicks
+                self.logger.action("Hold %s for %.0f ms", name, seconds * 1000.0)
+                autoit.send_key(down)
+                self._mark_input()
+                try:
+                    self._sleep(seconds)
+                finally:
+                    try:
+                        autoit.send_key(up)
+                    except Exception:
+                        pass
+                self.events.emit(EVENT_KEY, key=name, hold=seconds)
+
+            elif code == OP_WAIT:
+                self._sleep(op[1])
+
+            elif code == OP_REPEAT:
+                _, slot, count, end_pc = op
+                if count <= 0:
+                    pc = end_pc
+                else:
+                    counters[slot] = count
+
+            elif code == OP_NEXT:
+                _, slot, body_pc = op
+                counters[slot] -= 1
+                if counters[slot] > 0:
+                    pc = body_pc
+
+            elif code == OP_BRANCH:
+                if not self._watcher_matches(op[1]):
+                    pc = op[2]
+
+            elif code == OP_JUMP:
+                pc = op[1]
+
+        if stop.is_set():
+            return PASS_STOPPED, clicks
+        if self._recovery_pending():
+            return PASS_INTERRUPTED, clicks
+        return PASS_DONE, clicks
+
+    def _target_transform(self, settings: MacroSettings) -> AffineTransform | None:
+        if not settings.target_window:
+            return IDENTITY_TRANSFORM
+        tracker = self.window_tracker
+        if tracker is None:
+            return None
+        tracker.set_target(settings.target_window)
+        return tracker.transform(settings.ref_width, settings.ref_height)
+
+    def _worker(self) -> None:
+        while True:
+            with self._park:
+                while not self._session_pending and not self._shutdown:
+                    self._park.wait()
+                if self._shutdown:
+                    if self._session_pending:
+                        self._session_pending = False
+                        self._session_active = False
+                        self._session_done.set()
+                    return
+                self._session_pending = False
+            self._run()
+
+    def _run(self) -> None:
+        stop_reason = "stopped"
+        # Only what was acquired gets released: a failed acquire must still end the session cleanly.
+        tracker: WindowRectTracker | None = None
+        capture: CaptureStream | None = None
+        checkpoint_held = False
+        self._active_watcher = None
+        checkpoint = self.checkpoint
+        gate = self.input_gate
+        window_missing = False
+        try:
+            if self.window_tracker is not None:
+                self.window_tracker.acquire()
+                tracker = self.window_tracker
+            if self.capture_stream is not None:
+                self.capture_stream.acquire()
+                capture = self.capture_stream
+            settings = self._settings_provider()
+            if tracker is not None and settings.target_window:
+                tracker.set_target(settings.target_window)
+                tracker.refresh()
+            self._start_focus_guard(settings)
+            if self.state_watcher is not None and settings.watchers_enabled and self.state_watcher.signatures:
+                self.state_watcher.reset_stats()
+                self.state_watcher.acquire()
+                self._active_watcher = self.state_watcher
+            target_loops = int(settings.loop_count)
+            session = self.events.begin_session(
+                target_loops=target_loops,
+                radius=settings.radius,
+                step=settings.spin_speed,
+                resumed_at=self._rotation_counter,
+            )
+            session_started = self.clock.monotonic()
+            plans: dict[int, Plan] = {}
+            plan_settings: MacroSettings | None = None
+            targets: list[ClickTarget] = []
+            order: VisitOrder | None = None
+            session_seed = 0
+            if checkpoint is not None:
+                checkpoint.begin(settings_hash(settings), target_loops, session)
+                checkpoint.acquire()
+                checkpoint_held = True
+            while not self._stop_event.is_set():
+                if target_loops > 0 and self._rotation_counter >= target_loops:
+                    stop_reason = "completed"
+                    break
+
+                rotation_started = self.clock.monotonic()
+                paused_before = self.focus_paused_s + self.paused_s
+                if self._rotation_counter > 0:
+                    settings = self._settings_provider()
+
+                if not self._enter_gate():
+                    break
+
+                if self._recovery_pending():
+                    self._run_recovery(settings)
+                    continue
+
+                transform = self._target_transform(settings)
+                if transform is None:
+                    if gate is not None:
+                        gate.yield_slice(force=True)
+                    if not window_missing:
+                        self.logger.warning("Target window not found: %s", settings.target_window)
+                        window_missing = True
+                    self._sleep(0.5)
+                    continue
+                window_missing = False
+
+                if settings != plan_settings:
+                    plans.clear()
+                    targets = parse_targets(settings.targets)
+                    order = None
+                    if targets:
+                        if not session_seed:
+                            session_seed = int(settings.target_seed) or random.randrange(1, 2**31)
+                            if not settings.target_seed:
+                                self.logger.info("Target visit seed: %s", session_seed)
+                        order = VisitOrder(targets, settings.target_order, session_seed, settings.target_cycle_length)
+                    plan_settings = settings
+
+                # The visit order is a function of the loop index, so a resumed session continues the same sequence.
+                index = order.visit(self._rotation_counter) if order is not None else -1
+                plan = plans.get(index)
+                if plan is None:
+                    # Only the picked location has a pixel guard reference; other targets click unguarded.
+                    plan = compile_program(
+                        settings,
+                        target=targets[index] if index >= 0 else None,
+                        guard_center=index <= 0,
+                    )
+                    plans[index] = plan
+
+                outcome, clicks = self._run_plan(plan, settings, transform)
+                if outcome == PASS_STOPPED:
+                    break
+                if outcome == PASS_INTERRUPTED:
+                    # Incomplete pass; the next iteration runs the recovery first.
+                    continue
+
+                self._rotation_counter += 1
+                now = self.clock.monotonic()
+                self.events.emit(
+                    EVENT_ROTATION_DONE,
+                    n=self._rotation_counter,
+                    dur=round(now - rotation_started, 4),
+                    target=index,
+                )
+                if checkpoint is not None:
+                    checkpoint.update(self._rotation_counter, self._elapsed_offset_s + now - session_started)
+                idle = self.focus_paused_s + self.paused_s - paused_before
+                self.throughput.add(now - rotation_started - idle, clicks)
+                if gate is not None:
+                    gate.yield_slice()
+
+        except AutoItBridgeAborted:
+            stop_reason = "aborted"
+        except AutoItBridgeError as e:
+            stop_reason = "bridge_error"
+            self.events.emit(EVENT_BRIDGE_ERROR, error=str(e))
+            self.error_manager.report("AutoIt error", e, critical=True)
+        except Exception as e:
+            stop_reason = "error"
+            self.error_manager.report("Macro error", e, critical=True)
+        finally:
+            self._stop_event.set()
+            if gate is not None:
+                gate.leave()
+            if tracker is not None:
+                tracker.release()
+            if capture is not None:
+                capture.release()
+            watcher = self._active_watcher
+            if watcher is not None:
+                watcher.release()
+                self._active_watcher = None
+                if watcher.checks:
+                    self.logger.debug(
+                        "State watcher: %s checks, mean %.3f ms, max %.3f ms (off the input thread)",
+                        watcher.checks,
+                        watcher.mean_check_ms,
+                        watcher.max_check_ms,
+                    )
+            if self._active_guard is not None:
+                self._active_guard.release()
+                self._active_guard = None
+            if checkpoint is not None:
+                if checkpoint_held:
+                    checkpoint.release()
+                if stop_reason == "completed":
+                    checkpoint.clear()
+                else:
+                    checkpoint.flush()
+            self.last_stop_reason = stop_reason
+            self._record_stop_latency()
+            guard = self.pixel_guard
+            if guard is not None and guard.checks:
+                self.logger.debug(
+                    "Pixel guard: %s checks, max %.3f ms, %s over budget",
+                    guard.checks,
+                    guard.max_sample_ms,
+                    guard.slow_checks,
+                )
+            self.events.end_session(
+                reason=stop_reason,
+                rotations=self._rotation_counter,
+                focus_paused_s=round(self.focus_paused_s, 3),
+                paused_s=round(self.paused_s, 3),
+            )
+            self._paused = False
+            self._session_active = False
+            self._session_done.set()
+            if self._on_finished:
+                try:
+                    self._on_finished()
+                except Exception:
+                    pass
+
+    def _record_stop_latency(self) -> None:
+        requested = self._stop_requested_at
+        if requested is None:
+            self.last_stop_latency_ms = None
+            self.last_stop_exit_ms = None
+            return
+
+        finished = time.perf_counter()
+        last_input = self._last_input_at
+        input_ms = max(0.0, (last_input - requested) * 1000.0) if last_input is not None else 0.0
+        self.last_stop_latency_ms = input_ms
+        self.last_stop_exit_ms = (finished - requested) * 1000.0
+        self.logger.info(
+            "Stop latency: %.1f ms to last input, %.1f ms to worker exit",
+            input_ms,
+            self.last_stop_exit_ms,
+        )
@@ -1,34 +1,104 @@
 from __future__ import annotations
 
 import logging
+import time
 import traceback
 from collections.abc import Callable
 from threading import RLock
 
 
+class _DeferredTraceback:
+    __slots__ = ("_exc",)
+
+    def __init__(self, exc: BaseException):
+        self._exc = exc
+
+    def __str__(self) -> str:
+        exc = self._exc
+        return "".join(traceback.format_exception(type(exc), exc, exc.__traceback__)).rstrip()
+
+
+class _TokenBucket:
+    def __init__(self, capacity: float, refill_per_second: float, clock: Callable[[], float]):
+        self._capacity = max(1.0, float(capacity))
+        self._rate = max(0.0, float(refill_per_second))
+        self._clock = clock
+        self._tokens = self._capacity
+        self._updated = clock()
+
+    def take(self) -> bool:
+        now = self._clock()
+        elapsed = max(0.0, now - self._updated)
+        self._updated = now
+        self._tokens = min(self._capacity, self._tokens + elapsed * self._rate)
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return True
+        return False
+
+
+class _Suppressed:
+    __slots__ = ("last_emitted", "count", "critical")
+
+    def __init__(self, last_emitted: float):
+        self.last_emitted = last_emitted
+        self.count = 0
+        self.critical = False
+
+
 class ErrorManager:
     def __init__(
         self,
         logger: logging.Logger,
         on_status: Callable[[str], None] | None = None,
+        dedupe_window: float = 30.0,
+        burst: int = 5,
+        refill_per_second: float = 0.2,
+        clock: Callable[[], float] = time.monotonic,
     ):
         self._logger = logger
         self._on_status = on_status
         self._lock = RLock()
         self._last_error = ""
+        self._clock = clock
+        self._dedupe_window = max(0.0, float(dedupe_window))
+        self._bucket = _TokenBucket(burst, refill_per_second, clock)
+        self._seen: dict[tuple[str, str], _Suppressed] = {}
 
     @property
     def last_error(self) -> str:
         with self._lock:
             return self._last_error
 
+    @property
+    def suppressed_count(self) -> int:
+        with self._lock:
+            return sum(entry.count for entry in self._seen.values())
+
     def clear(self) -> None:
         with self._lock:
             self._last_error = ""
 
+        self.flush_suppressed()
+
         if self._on_status:
             self._on_status("")
 
+    def flush_suppressed(self) -> None:
+        with self._lock:
+            pending = [(key, entry) for key, entry in self._seen.items() if entry.count]
+            self._seen.clear()
+
+        for (type_name, text), entry in pending:
+            level = logging.ERROR if entry.critical else logging.WARNING
+            self._logger.log(
+                level,
+                "Suppressed %s repeats of %s: %s",
+                entry.count,
+                type_name or "error",
+                text,
+            )
+
     def report(self, message: str, exc: BaseException | None = None, critical: bool = False) -> None:
         with self._lock:
             details = message
@@ -36,19 +106,32 @@ class ErrorManager:
                 details = f"{message}: {exc}"
             self._last_error = details
 
-        if exc is not None:
-            tb = "".join(traceback.format_exception(type(exc), exc, exc.__traceback__))
-            if critical:
-                self._logger.error(details)
-                self._logger.error(tb)
+            key = (type(exc).__name__ if exc is not None else "", details)
+            now = self._clock()
+            entry = self._seen.get(key)
+            duplicate = entry is not None and (now - entry.last_emitted) < self._dedupe_window
+
+            if duplicate or not self._bucket.take():
+                if entry is None:
+                    # Rate-limited before it was ever logged; let the next report retry.
+                    entry = self._seen[key] = _Suppressed(float("-inf"))
+                entry.count += 1
+                entry.critical = entry.critical or critical
+                emit = False
+                suppressed = 0
             else:
-                self._logger.warning(details)
-                self._logger.warning(tb)
-        else:
-            if critical:
-                self._logger.error(details)
+                suppressed = entry.count if entry is not None else 0
+                self._seen[key] = _Suppressed(now)
+                emit = True
+
+        if emit:
+            log = self._logger.error if critical else self._logger.warning
+            if suppressed:
+                log("%s (suppressed %s repeats)", details, suppressed)
             else:
-                self._logger.warning(details)
+                log(details)
+            if exc is not None:
+                log("%s", _DeferredTraceback(exc))
 
         if self._on_status:
             self._on_status(details)
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import threading
+from collections import deque
+
+
+class ThroughputEstimator:
+    def __init__(self, alpha: float = 0.2, window: int = 32, prior_weight: float = 4.0):
+        self._alpha = min(1.0, max(0.01, float(alpha)))
+        self._prior_weight = max(0.0, float(prior_weight))
+        self._lock = threading.Lock()
+        self._window: deque[tuple[float, int]] = deque(maxlen=max(1, int(window)))
+        self._window_s = 0.0
+        self._window_clicks = 0
+        self._prior_s: float | None = None
+        self._ewma_s: float | None = None
+        self._samples = 0
+
+    def reset(self, prior_loop_s: float | None = None) -> None:
+        with self._lock:
+            self._window.clear()
+            self._window_s = 0.0
+            self._window_clicks = 0
+            self._prior_s = prior_loop_s if prior_loop_s and prior_loop_s > 0 else None
+            self._ewma_s = None
+            self._samples = 0
+
+    def add(self, loop_s: float, clicks: int = 0) -> None:
+        if loop_s <= 0:
+            return
+        with self._lock:
+            if len(self._window) == self._window.maxlen:
+                old_s, old_clicks = self._window[0]
+                self._window_s -= old_s
+                self._window_clicks -= old_clicks
+            self._window.append((loop_s, clicks))
+            self._window_s += loop_s
+            self._window_clicks += clicks
+
+            if self._ewma_s is None:
+                self._ewma_s = loop_s
+            else:
+                self._ewma_s += self._alpha * (loop_s - self._ewma_s)
+            self._samples += 1
+
+    @property
+    def samples(self) -> int:
+        return self._samples
+
+    @property
+    def loop_s(self) -> float | None:
+        with self._lock:
+            prior, ewma = self._prior_s, self._ewma_s
+            if ewma is None:
+                return prior
+            if prior is None:
+                return ewma
+            # The analytic prior fades out as measured loops accumulate.
+            n = self._samples
+            return (prior * self._prior_weight + ewma * n) / (self._prior_weight + n)
+
+    @property
+    def rotations_per_min(self) -> float:
+        with self._lock:
+            if self._window_s > 0:
+                return 60.0 * len(self._window) / self._window_s
+        loop_s = self.loop_s
+        return 60.0 / loop_s if loop_s else 0.0
+
+    @property
+    def clicks_per_hour(self) -> float:
+        with self._lock:
+            if self._window_s <= 0:
+                return 0.0
+            return 3600.0 * self._window_clicks / self._window_s
+
+    def eta_s(self, remaining_loops: int) -> float | None:
+        loop_s = self.loop_s
+        if loop_s is None or remaining_loops < 0:
+            return None
+        return loop_s * remaining_loops
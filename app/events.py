@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+import time
+import uuid
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+EVENT_SESSION_START = "session_start"
+EVENT_SESSION_STOP = "session_stop"
+EVENT_ROTATION_DONE = "rotation_done"
+EVENT_CLICK = "click"
+EVENT_CLICK_SKIPPED = "click_skipped"
+EVENT_KEY = "key"
+EVENT_BRIDGE_ERROR = "bridge_error"
+EVENT_RESTART = "restart"
+EVENT_FOCUS_LOST = "focus_lost"
+EVENT_FOCUS_REGAINED = "focus_regained"
+EVENT_RECOVERY_START = "recovery_start"
+EVENT_RECOVERY_DONE = "recovery_done"
+EVENT_PAUSED = "paused"
+EVENT_RESUMED = "resumed"
+
+
+class _JsonPayload:
+    __slots__ = ("_data",)
+
+    def __init__(self, data: dict[str, object]):
+        self._data = data
+
+    def __str__(self) -> str:
+        return json.dumps(self._data, separators=(",", ":"), default=str)
+
+
+class EventLog:
+    def __init__(self, logger: logging.Logger | None = None, tags: dict[str, object] | None = None):
+        self._logger = logger
+        self._session = ""
+        self._tags = dict(tags) if tags else {}
+
+    def tagged(self, **tags: object) -> EventLog:
+        # Same sink, own session; the tags are added to every event (e.g. the orchestrator instance name).
+        return EventLog(self._logger, {**self._tags, **tags})
+
+    @property
+    def enabled(self) -> bool:
+        return self._logger is not None
+
+    @property
+    def session(self) -> str:
+        return self._session
+
+    def begin_session(self, **fields: object) -> str:
+        self._session = uuid.uuid4().hex[:12]
+        self.emit(EVENT_SESSION_START, **fields)
+        return self._session
+
+    def end_session(self, **fields: object) -> None:
+        self.emit(EVENT_SESSION_STOP, **fields)
+
+    def emit(self, event: str, **fields: object) -> None:
+        logger = self._logger
+        if logger is None:
+            return
+
+        data: dict[str, object] = {
+            "t": round(time.monotonic(), 6),
+            "wall": round(time.time(), 3),
+            "session": self._session,
+            "event": event,
+        }
+        if self._tags:
+            data.update(self._tags)
+        if fields:
+            data.update(fields)
+
+        try:
+            # Serialised on the listener thread when the record is written.
+            logger.info("%s", _JsonPayload(data))
+        except Exception:
+            pass
+
+
+class SessionStats:
+    __slots__ = (
+        "session",
+        "start_t",
+        "end_t",
+        "start_wall",
+        "rotations",
+        "clicks",
+        "clicks_skipped",
+        "keys",
+        "errors",
+        "restarts",
+        "focus_paused_s",
+        "paused_s",
+        "recoveries",
+        "stop_reason",
+    )
+
+    def __init__(self, session: str):
+        self.session = session
+        self.start_t: float | None = None
+        self.end_t: float | None = None
+        self.start_wall: float | None = None
+        self.rotations = 0
+        self.clicks = 0
+        self.clicks_skipped = 0
+        self.keys = 0
+        self.errors = 0
+        self.restarts = 0
+        self.focus_paused_s = 0.0
+        self.paused_s = 0.0
+        self.recoveries = 0
+        self.stop_reason = ""
+
+    def add(self, event: dict[str, object]) -> None:
+        name = event.get("event")
+        t = event.get("t")
+        if isinstance(t, (int, float)):
+            if self.start_t is None or t < self.start_t:
+                self.start_t = float(t)
+            if self.end_t is None or t > self.end_t:
+                self.end_t = float(t)
+
+        if name == EVENT_ROTATION_DONE:
+            self.rotations += 1
+        elif name == EVENT_CLICK:
+            self.clicks += 1
+        elif name == EVENT_CLICK_SKIPPED:
+            self.clicks_skipped += 1
+        elif name == EVENT_KEY:
+            self.keys += 1
+        elif name == EVENT_BRIDGE_ERROR:
+            self.errors += 1
+        elif name == EVENT_RESTART:
+            self.restarts += 1
+        elif name == EVENT_FOCUS_REGAINED:
+            paused = event.get("paused")
+            if isinstance(paused, (int, float)):
+                self.focus_paused_s += float(paused)
+        elif name == EVENT_RESUMED:
+            paused = event.get("paused")
+            if isinstance(paused, (int, float)):
+                self.paused_s += float(paused)
+        elif name == EVENT_RECOVERY_DONE:
+            self.recoveries += 1
+        elif name == EVENT_SESSION_START:
+            wall = event.get("wall")
+            if isinstance(wall, (int, float)):
+                self.start_wall = float(wall)
+        elif name == EVENT_SESSION_STOP:
+            self.stop_reason = str(event.get("reason", ""))
+
+    @property
+    def duration_s(self) -> float:
+        if self.start_t is None or self.end_t is None:
+            return 0.0
+        return max(0.0, self.end_t - self.start_t)
+
+    def as_dict(self) -> dict[str, object]:
+        hours = self.duration_s / 3600.0
+        per_hour = (lambda n: round(n / hours, 2)) if hours > 0 else (lambda _n: 0.0)
+        return {
+            "session": self.session,
+            "started": (
+                time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.start_wall))
+                if self.start_wall is not None
+                else ""
+            ),
+            "duration_s": round(self.duration_s, 3),
+            "rotations": self.rotations,
+            "loops_per_hour": per_hour(self.rotations),
+            "clicks": self.clicks,
+            "clicks_per_hour": per_hour(self.clicks),
+            "clicks_skipped": self.clicks_skipped,
+            "keys": self.keys,
+            "errors": self.errors,
+            "errors_per_hour": per_hour(self.errors),
+            "error_rate": round(self.errors / self.rotations, 4) if self.rotations else 0.0,
+            "restarts": self.restarts,
+            "focus_paused_s": round(self.focus_paused_s, 3),
+            "paused_s": round(self.paused_s, 3),
+            "recoveries": self.recoveries,
+            "stop_reason": self.stop_reason,
+        }
+
+
+def iter_events(lines: Iterable[str], session: str | None = None) -> Iterator[dict[str, object]]:
+    needle = f'"session":"{session}"' if session else None
+    for line in lines:
+        if needle is not None and needle not in line:
+            continue
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            event = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(event, dict):
+            yield event
+
+
+def summarize(lines: Iterable[str], session: str | None = None) -> list[SessionStats]:
+    stats: dict[str, SessionStats] = {}
+    for event in iter_events(lines, session):
+        sid = str(event.get("session", ""))
+        entry = stats.get(sid)
+        if entry is None:
+            entry = stats[sid] = SessionStats(sid)
+        entry.add(event)
+    return list(stats.values())
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.events",
+        description="Per-session aggregates from the JSONL event log.",
+    )
+    parser.add_argument(
+        "path",
+        nargs="?",
+        default=str(Path(__file__).resolve().parents[1] / "logs" / "events.jsonl"),
+    )
+    parser.add_argument("--session", default=None, help="Only aggregate this session id")
+    parser.add_argument("--last", type=int, default=0, help="Only print the last N sessions")
+    parser.add_argument("--json", action="store_true", help="Print one JSON object per session")
+    args = parser.parse_args(argv)
+
+    path = Path(args.path)
+    if not path.exists():
+        print(f"Event log not found: {path}", file=sys.stderr)
+        return 1
+
+    with path.open("r", encoding="utf-8", errors="replace") as f:
+        sessions = summarize(f, args.session)
+
+    if args.last > 0:
+        sessions = sessions[-args.last :]
+
+    for entry in sessions:
+        row = entry.as_dict()
+        if args.json:
+            print(json.dumps(row, separators=(",", ":")))
+            continue
+        print(
+            f"{row['session'] or '-':<12}  {row['started'] or '-':<19}  "
+            f"{row['duration_s']:>10.1f}s  loops={row['rotations']:<6} "
+            f"loops/h={row['loops_per_hour']:<8} clicks={row['clicks']:<6} "
+            f"skipped={row['clicks_skipped']:<4} "
+            f"errors={row['errors']:<4} err/loop={row['error_rate']:<6} "
+            f"restarts={row['restarts']} paused={row['focus_paused_s']}s "
+            f"held={row['paused_s']}s "
+            f"recoveries={row['recoveries']}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
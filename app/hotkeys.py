@@ -1,15 +1,13 @@
 from __future__ import annotations
 
+import argparse
 import logging
+import queue
 import threading
+import time
+from collections import deque
 from collections.abc import Callable
-
-try:
-    import keyboard
-except Exception as e:
-    raise RuntimeError(
-        "The 'keyboard' package is required. Install it with: pip install keyboard"
-    ) from e
+from typing import Protocol
 
 
 def normalize_hotkey(hotkey: str) -> str:
@@ -24,26 +22,135 @@ HOTKEY_CHOICES: list[str] = (
 )
 
 
+class HotkeyBackend(Protocol):
+    # Backends call on_event(perf_counter_timestamp) from whatever thread sees the key.
+    def add_hotkey(self, hotkey: str, on_event: Callable[[float], None]) -> object: ...
+
+    def remove_hotkey(self, handle: object) -> None: ...
+
+    def shutdown(self) -> None: ...
+
+
+class KeyboardHotkeyBackend:
+    def __init__(self):
+        try:
+            import keyboard
+        except Exception as e:
+            raise RuntimeError(
+                "The 'keyboard' package is required. Install it with: pip install keyboard"
+            ) from e
+        self._keyboard = keyboard
+
+    def add_hotkey(self, hotkey: str, on_event: Callable[[float], None]) -> object:
+        return self._keyboard.add_hotkey(hotkey, lambda: on_event(time.perf_counter()))
+
+    def remove_hotkey(self, handle: object) -> None:
+        self._keyboard.remove_hotkey(handle)
+
+    def shutdown(self) -> None:
+        pass
+
+
+class SyntheticHotkeyBackend:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next_handle = 1
+        self._bindings: dict[int, tuple[str, Callable[[float], None]]] = {}
+
+    def add_hotkey(self, hotkey: str, on_event: Callable[[float], None]) -> object:
+        with self._lock:
+            handle = self._next_handle
+            self._next_handle += 1
+            self._bindings[handle] = (normalize_hotkey(hotkey), on_event)
+            return handle
+
+    def remove_hotkey(self, handle: object) -> None:
+        with self._lock:
+            self._bindings.pop(handle, None)  # type: ignore[arg-type]
+
+    def shutdown(self) -> None:
+        pass
+
+    def press(self, hotkey: str) -> int:
+        hk = normalize_hotkey(hotkey)
+        t = time.perf_counter()
+        with self._lock:
+            targets = [cb for bound, cb in self._bindings.values() if bound == hk]
+        for cb in targets:
+            cb(t)
+        return len(targets)
+
+
 class HotkeyManager:
-    def __init__(self, logger: logging.Logger):
+    def __init__(
+        self,
+        logger: logging.Logger,
+        backend: HotkeyBackend | None = None,
+        latency_samples: int = 256,
+    ):
         self._logger = logger
+        self._backend = backend or KeyboardHotkeyBackend()
         self._lock = threading.RLock()
-        self._handles: dict[str, int] = {}
+        self._handles: dict[str, object] = {}
+        self._callbacks: dict[str, Callable[[], None]] = {}
+
+        self._dispatch_queue: queue.SimpleQueue[tuple[str, float] | None] = queue.SimpleQueue()
+        self._latencies: deque[float] = deque(maxlen=max(1, int(latency_samples)))
+        self._dispatch_thread = threading.Thread(
+            target=self._dispatch_loop, name="hotkey-dispatch", daemon=True
+        )
+        self._dispatch_thread.start()
+
+    @property
+    def backend(self) -> HotkeyBackend:
+        return self._backend
+
+    def _dispatch_loop(self) -> None:
+        while True:
+            item = self._dispatch_queue.get()
+            if item is None:
+                return
+            name, t_event = item
+            callback = self._callbacks.get(name)
+            if callback is None:
+                continue
+            self._latencies.append(time.perf_counter() - t_event)
+            try:
+                callback()
+            except Exception as e:
+                self._logger.warning("Hotkey %s callback failed: %s", name, e)
+
+    def latency_stats(self) -> dict[str, float]:
+        samples = sorted(self._latencies)
+        if not samples:
+            return {"count": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+        n = len(samples)
+        return {
+            "count": n,
+            "mean_ms": sum(samples) / n * 1000.0,
+            "p50_ms": samples[n // 2] * 1000.0,
+            "p99_ms": samples[min(n - 1, int(n * 0.99))] * 1000.0,
+            "max_ms": samples[-1] * 1000.0,
+        }
 
     def register(self, name: str, hotkey: str, callback: Callable[[], None]) -> None:
         with self._lock:
             self.unregister(name)
             hk = normalize_hotkey(hotkey)
-            handle = keyboard.add_hotkey(hk, callback)
+            self._callbacks[name] = callback
+            handle = self._backend.add_hotkey(
+                hk, lambda t_event: self._dispatch_queue.put((name, t_event))
+            )
             self._handles[name] = handle
             self._logger.info("Hotkey %s registered: %s", name, hotkey)
 
     def unregister(self, name: str) -> None:
         with self._lock:
             handle = self._handles.pop(name, None)
+            self._callbacks.pop(name, None)
             if handle is not None:
                 try:
-                    keyboard.remove_hotkey(handle)
+                    self._backend.remove_hotkey(handle)
                 except Exception:
                     pass
 
@@ -51,7 +158,137 @@ class HotkeyManager:
         with self._lock:
             for handle in list(self._handles.values()):
                 try:
-                    keyboard.remove_hotkey(handle)
+                    self._backend.remove_hotkey(handle)
                 except Exception:
                     pass
             self._handles.clear()
+            self._callbacks.clear()
+            try:
+                self._backend.shutdown()
+            except Exception:
+                pass
+        self._dispatch_queue.put(None)
+
+
+class _GlidingBridge:
+    # Stands in for the AutoIt runner: each move blocks for its modelled glide time, and ABORT cuts it short.
+    def __init__(self, glide_step_ms: float = 10.0):
+        from .autoit_bridge import AutoItBridgeAborted
+        from .simulation import glide_steps
+
+        self._aborted_error = AutoItBridgeAborted
+        self._glide_steps = glide_steps
+        self._glide_step_s = glide_step_ms / 1000.0
+        self._abort = threading.Event()
+        self._position = (0, 0)
+
+    def _glide(self, x: int, y: int, speed: int) -> None:
+        steps = self._glide_steps(self._position, (x, y), int(speed))
+        if self._abort.wait(max(0, steps - 1) * self._glide_step_s) or self._abort.is_set():
+            raise self._aborted_error("glide cancelled by abort")
+        self._position = (x, y)
+
+    def reset_abort(self) -> None:
+        self._abort.clear()
+
+    def abort(self) -> None:
+        self._abort.set()
+
+    def send_priority(self, command: str) -> None:
+        self._abort.set()
+
+    def stop(self) -> None:
+        pass
+
+    def mouse_move(self, x: int, y: int, speed: int) -> None:
+        self._glide(x, y, speed)
+
+    def mouse_click(self, x: int, y: int, button: str = "left", clicks: int = 1, speed: int = 0) -> None:
+        self._glide(x, y, speed)
+
+    def send_key(self, send_text: str) -> None:
+        if self._abort.is_set():
+            raise self._aborted_error("key cancelled by abort")
+
+    def activate_window(self, title: str, timeout_s: float = 1.0) -> None:
+        pass
+
+
+def _measure_stop(trials: int, logger: logging.Logger) -> list[tuple[float, float]]:
+    # Stop hotkey -> dispatch thread -> emergency_stop while the engine is inside a glide or step delay.
+    import random
+
+    from .engine import MacroEngine, MacroSettings
+    from .error_handler import ErrorManager
+
+    settings = MacroSettings(click_x=500, click_y=500, radius=60, spin_speed=20, move_speed=10, step_delay_ms=5)
+    bridge = _GlidingBridge()
+    engine = MacroEngine(bridge, logger, ErrorManager(logger), lambda: settings)  # type: ignore[arg-type]
+    backend = SyntheticHotkeyBackend()
+    manager = HotkeyManager(logger, backend=backend)
+    manager.register("stop", "F7", engine.emergency_stop)
+    rng = random.Random(1)
+    results: list[tuple[float, float]] = []
+    try:
+        for _ in range(trials):
+            engine.start()
+            time.sleep(rng.uniform(0.05, 0.25))
+            backend.press("F7")
+            engine.join(5.0)
+            if engine.last_stop_latency_ms is None or engine.last_stop_exit_ms is None:
+                raise RuntimeError(f"stop did not end the session (reason {engine.last_stop_reason!r})")
+            results.append((engine.last_stop_latency_ms, engine.last_stop_exit_ms))
+    finally:
+        manager.shutdown()
+        engine.shutdown()
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.hotkeys",
+        description="Measure hotkey dispatch latency and stop-hotkey latency with the synthetic backend.",
+    )
+    parser.add_argument("--presses", type=int, default=1000)
+    parser.add_argument("--interval-ms", type=float, default=1.0)
+    parser.add_argument("--stop-trials", type=int, default=20)
+    parser.add_argument("--max-stop-ms", type=float, default=50.0, help="Fail if any stop exceeds this")
+    args = parser.parse_args(argv)
+
+    backend = SyntheticHotkeyBackend()
+    manager = HotkeyManager(logging.getLogger(__name__), backend=backend, latency_samples=args.presses)
+    done = threading.Semaphore(0)
+    manager.register("bench", "F7", done.release)
+
+    for _ in range(args.presses):
+        backend.press("F7")
+        done.acquire()
+        if args.interval_ms > 0:
+            time.sleep(args.interval_ms / 1000.0)
+
+    stats = manager.latency_stats()
+    manager.shutdown()
+    print(
+        f"presses={stats['count']} mean={stats['mean_ms']:.3f}ms p50={stats['p50_ms']:.3f}ms "
+        f"p99={stats['p99_ms']:.3f}ms max={stats['max_ms']:.3f}ms"
+    )
+
+    if args.stop_trials <= 0:
+        return 0
+    logger = logging.getLogger(__name__ + ".stop")
+    logger.propagate = False
+    logger.addHandler(logging.NullHandler())
+    results = _measure_stop(args.stop_trials, logger)
+    worst_input = max(r[0] for r in results)
+    worst_exit = max(r[1] for r in results)
+    ok = worst_exit <= args.max_stop_ms
+    print(
+        f"stops={len(results)} to_last_input max={worst_input:.1f}ms "
+        f"to_worker_exit mean={sum(r[1] for r in results) / len(results):.1f}ms max={worst_exit:.1f}ms "
+        f"limit={args.max_stop_ms:.0f}ms {'ok' if ok else 'FAIL'}"
+    )
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,745 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import multiprocessing
+import queue
+import statistics
+import struct
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from logging.handlers import QueueHandler
+from multiprocessing import shared_memory
+from pathlib import Path
+
+from .checkpoint import Checkpoint
+from .clock import Clock
+from .engine import MacroSettings
+from .error_handler import ErrorManager
+from .estimator import ThroughputEstimator
+
+STATE_IDLE = 0
+STATE_RUNNING = 1
+STATE_PAUSED = 2
+
+FLAG_FOCUS_PAUSED = 1
+FLAG_RECOVERING = 2
+
+_MAGIC = b"MCB1"
+# magic, state, stop, flags, rotations, target_loops, loop_samples, loop_total_s, clicks_total
+_LAYOUT = struct.Struct("<4siiiqqqdq")
+_I32 = struct.Struct("<i")
+_I64 = struct.Struct("<q")
+_F64 = struct.Struct("<d")
+_OFF_STATE = 4
+_OFF_STOP = 8
+_OFF_FLAGS = 12
+_OFF_ROTATIONS = 16
+_OFF_TARGET = 24
+_OFF_SAMPLES = 32
+_OFF_LOOP_TOTAL = 40
+_OFF_CLICKS = 48
+
+_LOOP_SAMPLES = 1024
+
+
+class ControlBlock:
+    # Fixed-layout shared memory: the UI process reads state and counters without a round trip,
+    # and sets the stop flag without waiting on the command queue.
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self._shm = shm
+        self._owner = owner
+        self._buf = shm.buf
+
+    @classmethod
+    def create(cls) -> ControlBlock:
+        shm = shared_memory.SharedMemory(create=True, size=_LAYOUT.size)
+        _LAYOUT.pack_into(shm.buf, 0, _MAGIC, STATE_IDLE, 0, 0, 0, 0, 0, 0.0, 0)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> ControlBlock:
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)  # type: ignore[call-arg]
+        except TypeError:
+            shm = shared_memory.SharedMemory(name=name)
+        if bytes(shm.buf[:4]) != _MAGIC:
+            shm.close()
+            raise RuntimeError(f"Shared memory {name} is not an engine control block")
+        return cls(shm, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def state(self) -> int:
+        return _I32.unpack_from(self._buf, _OFF_STATE)[0]
+
+    @state.setter
+    def state(self, value: int) -> None:
+        _I32.pack_into(self._buf, _OFF_STATE, int(value))
+
+    @property
+    def stop(self) -> bool:
+        return bool(_I32.unpack_from(self._buf, _OFF_STOP)[0])
+
+    @stop.setter
+    def stop(self, value: bool) -> None:
+        _I32.pack_into(self._buf, _OFF_STOP, 1 if value else 0)
+
+    @property
+    def flags(self) -> int:
+        return _I32.unpack_from(self._buf, _OFF_FLAGS)[0]
+
+    @flags.setter
+    def flags(self, value: int) -> None:
+        _I32.pack_into(self._buf, _OFF_FLAGS, int(value))
+
+    @property
+    def rotations(self) -> int:
+        return _I64.unpack_from(self._buf, _OFF_ROTATIONS)[0]
+
+    @property
+    def target_loops(self) -> int:
+        return _I64.unpack_from(self._buf, _OFF_TARGET)[0]
+
+    def begin(self, rotations: int, target_loops: int) -> None:
+        _I64.pack_into(self._buf, _OFF_ROTATIONS, int(rotations))
+        _I64.pack_into(self._buf, _OFF_TARGET, int(target_loops))
+        self.flags = 0
+        self.state = STATE_RUNNING
+
+    def publish_loop(self, rotations: int, loop_s: float, clicks: int) -> None:
+        # Single writer (the engine thread); the sample count goes last so readers never see it ahead.
+        buf = self._buf
+        _I64.pack_into(buf, _OFF_ROTATIONS, int(rotations))
+        _F64.pack_into(buf, _OFF_LOOP_TOTAL, _F64.unpack_from(buf, _OFF_LOOP_TOTAL)[0] + loop_s)
+        _I64.pack_into(buf, _OFF_CLICKS, _I64.unpack_from(buf, _OFF_CLICKS)[0] + int(clicks))
+        _I64.pack_into(buf, _OFF_SAMPLES, _I64.unpack_from(buf, _OFF_SAMPLES)[0] + 1)
+
+    def loop_totals(self) -> tuple[int, float, int]:
+        buf = self._buf
+        samples = _I64.unpack_from(buf, _OFF_SAMPLES)[0]
+        return samples, _F64.unpack_from(buf, _OFF_LOOP_TOTAL)[0], _I64.unpack_from(buf, _OFF_CLICKS)[0]
+
+    def close(self) -> None:
+        self._buf = None  # type: ignore[assignment]
+        try:
+            self._shm.close()
+        except Exception:
+            pass
+        if self._owner:
+            try:
+                self._shm.unlink()
+            except Exception:
+                pass
+
+
+class _PublishingEstimator(ThroughputEstimator):
+    def __init__(self, block: ControlBlock | None, rotations: Callable[[], int]):
+        super().__init__()
+        self._block = block
+        self._rotations = rotations
+        self.loop_samples: deque[float] = deque(maxlen=_LOOP_SAMPLES)
+
+    def add(self, loop_s: float, clicks: int = 0) -> None:
+        super().add(loop_s, clicks)
+        self.loop_samples.append(loop_s)
+        if self._block is not None:
+            self._block.publish_loop(self._rotations(), loop_s, clicks)
+
+
+class _ForwardingErrorManager(ErrorManager):
+    # Errors are logged, deduplicated and shown by the UI process's ErrorManager.
+    def __init__(self, messages: multiprocessing.Queue, logger: logging.Logger):
+        super().__init__(logger)
+        self._messages = messages
+
+    def report(self, message: str, exc: BaseException | None = None, critical: bool = False) -> None:
+        self._messages.put(("error", message, str(exc) if exc is not None else None, critical))
+
+
+class _ControlBlockStopEvent(threading.Event):
+    # The engine's stop checks also see the UI's shared-memory stop flag, without waiting for the command queue.
+    def __init__(self, block: ControlBlock):
+        super().__init__()
+        self._block = block
+
+    def is_set(self) -> bool:
+        if super().is_set():
+            return True
+        if self._block.stop:
+            self.set()
+            return True
+        return False
+
+
+class RemoteEngineError(Exception):
+    pass
+
+
+class _SleepingClock(Clock):
+    # Lets the simulated bridge stand in for AutoIt in real time.
+    def advance(self, seconds: float) -> float:
+        if seconds > 0:
+            time.sleep(seconds)
+        return time.monotonic()
+
+
+def _simulated_bridge():
+    from .simulation import SimulatedBridge
+
+    return SimulatedBridge(_SleepingClock(), record_timeline=False)  # type: ignore[arg-type]
+
+
+def _install_child_logging(messages: multiprocessing.Queue, level_name: str) -> None:
+    from .logger import EVENT_LOGGER_NAME, LOG_FLAGS, parse_level
+
+    level_value = parse_level(level_name)
+    LOG_FLAGS.update(level_value)
+    root = logging.getLogger()
+    for old in list(root.handlers):
+        root.removeHandler(old)
+    handler = QueueHandler(messages)  # type: ignore[arg-type]
+    handler.setLevel(level_value)
+    root.addHandler(handler)
+    root.setLevel(level_value)
+
+    event_logger = logging.getLogger(EVENT_LOGGER_NAME)
+    event_logger.propagate = False
+    event_logger.setLevel(logging.INFO)
+    event_logger.addHandler(QueueHandler(messages))  # type: ignore[arg-type]
+
+
+def _child_main(
+    config_path: str,
+    block_name: str,
+    commands: multiprocessing.Queue,
+    messages: multiprocessing.Queue,
+    level_name: str,
+    events_enabled: bool,
+    simulated: bool,
+) -> None:
+    from .autoit_bridge import AutoItBridge
+    from .bootstrap import RUNNER_PATH
+    from .cli import _build_engine
+    from .config_manager import ConfigManager
+    from .engine import MacroEngine
+    from .events import EventLog
+    from .logger import EVENT_LOGGER_NAME
+
+    _install_child_logging(messages, level_name)
+    logger = logging.getLogger()
+    block = ControlBlock.attach(block_name)
+    config = ConfigManager(Path(config_path))
+    events = EventLog(logging.getLogger(EVENT_LOGGER_NAME)) if events_enabled else EventLog()
+    autoit = _simulated_bridge() if simulated else AutoItBridge(runner_script_path=RUNNER_PATH, logger=logger, events=events)
+    error_manager = _ForwardingErrorManager(messages, logger)
+    current: dict[str, MacroSettings] = {"settings": MacroSettings()}
+    engine: MacroEngine | None = None
+
+    def _finished() -> None:
+        e = engine
+        if e is None:
+            return
+        block.state = STATE_IDLE
+        block.flags = 0
+        messages.put(
+            (
+                "finished",
+                {
+                    "reason": e.last_stop_reason,
+                    "rotations": e.rotation_counter,
+                    "stop_latency_ms": e.last_stop_latency_ms,
+                    "paused_s": e.paused_s,
+                    "focus_paused_s": e.focus_paused_s,
+                    "loop_samples": list(getattr(e.throughput, "loop_samples", ())),
+                },
+            )
+        )
+
+    try:
+        while True:
+            try:
+                command = commands.get(timeout=0.05)
+            except queue.Empty:
+                command = None
+
+            if command is not None:
+                name = command[0]
+                if name == "shutdown":
+                    break
+                if name == "start":
+                    settings, resume = command[1], command[2]
+                    current["settings"] = settings
+                    if engine is not None:
+                        engine.shutdown()
+                    # Rebuilt per session so config changes (pixel reference, watchers) are picked up.
+                    config.load()
+                    engine = _build_engine(
+                        config,
+                        settings,
+                        autoit,
+                        logger,
+                        events,
+                        on_finished=_finished,
+                        settings_provider=lambda: current["settings"],
+                        error_manager=error_manager,
+                    )
+                    new_engine = engine
+                    engine.throughput = _PublishingEstimator(block, lambda: new_engine.rotation_counter)
+                    engine.stop_event_factory = lambda: _ControlBlockStopEvent(block)
+                    block.stop = False
+                    block.begin(resume.rotations if resume is not None else 0, settings.loop_count)
+                    if not engine.start(resume_from=resume):
+                        block.state = STATE_IDLE
+                        messages.put(("finished", {"reason": "not_started", "rotations": 0}))
+                elif name == "settings":
+                    current["settings"] = command[1]
+                elif engine is not None:
+                    if name == "pause":
+                        engine.pause()
+                    elif name == "resume":
+                        engine.resume()
+                    elif name == "stop":
+                        engine.request_stop()
+                    elif name == "abort":
+                        engine.emergency_stop()
+
+            if engine is not None and engine.running:
+                block.state = STATE_PAUSED if engine.paused else STATE_RUNNING
+                block.flags = (FLAG_FOCUS_PAUSED if engine.focus_paused else 0) | (
+                    FLAG_RECOVERING if engine.recovering else 0
+                )
+    finally:
+        if engine is not None:
+            engine.shutdown()
+        try:
+            autoit.stop()
+        except Exception:
+            pass
+        block.close()
+
+
+class IsolatedEngine:
+    # Drop-in for MacroEngine in the UI: the engine, AutoIt bridge and screen checks run in a child
+    # process, so Tk redraws and the keyboard hook do not compete with rotations for the GIL.
+    def __init__(
+        self,
+        config_path: Path,
+        logger: logging.Logger,
+        error_manager: ErrorManager,
+        settings_provider: Callable[[], MacroSettings],
+        on_finished: Callable[[], None] | None = None,
+        level_name: str = "INFO",
+        events_enabled: bool = True,
+        simulated: bool = False,
+        settings_poll_s: float = 0.5,
+    ):
+        self.config_path = Path(config_path)
+        self.logger = logger
+        self.error_manager = error_manager
+        self._settings_provider = settings_provider
+        self._on_finished = on_finished
+        self._level_name = level_name
+        self._events_enabled = events_enabled
+        self._simulated = simulated
+        self._settings_poll_s = max(0.05, float(settings_poll_s))
+        self.throughput = ThroughputEstimator()
+
+        self._lock = threading.RLock()
+        # Guards _block: Tk status ticks read it while shutdown closes it. Separate from _lock so a stop
+        # hotkey never waits behind a process spawn.
+        self._block_lock = threading.Lock()
+        self._ctx = multiprocessing.get_context("spawn")
+        self._process: multiprocessing.process.BaseProcess | None = None
+        self._commands: multiprocessing.Queue | None = None
+        self._messages: multiprocessing.Queue | None = None
+        self._block: ControlBlock | None = None
+        self._monitor: threading.Thread | None = None
+        self._monitor_stop = threading.Event()
+
+        self._session_active = False
+        self._session_done = threading.Event()
+        self._session_done.set()
+        self._paused = False
+        self._stop_requested = False
+        self._stop_requested_at: float | None = None
+        self._sent_settings: MacroSettings | None = None
+        self._seen_samples = (0, 0.0, 0)
+        self._rotation_base = 0
+
+        self.last_stop_reason = ""
+        self.last_stop_latency_ms: float | None = None
+        self.last_signal_latency_ms: float | None = None
+        self.last_loop_samples: list[float] = []
+        self.paused_s = 0.0
+        self.focus_paused_s = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._session_active
+
+    @property
+    def paused(self) -> bool:
+        return self._paused
+
+    @property
+    def rotation_counter(self) -> int:
+        with self._block_lock:
+            block = self._block
+            return block.rotations if block is not None else self._rotation_base
+
+    @property
+    def focus_paused(self) -> bool:
+        with self._block_lock:
+            block = self._block
+            return block is not None and self._session_active and bool(block.flags & FLAG_FOCUS_PAUSED)
+
+    @property
+    def recovering(self) -> bool:
+        with self._block_lock:
+            block = self._block
+            return block is not None and self._session_active and bool(block.flags & FLAG_RECOVERING)
+
+    @property
+    def stop_requested(self) -> bool:
+        return self._stop_requested
+
+    @property
+    def pid(self) -> int | None:
+        p = self._process
+        return p.pid if p is not None and p.is_alive() else None
+
+    def _ensure_process(self) -> bool:
+        p = self._process
+        if p is not None and p.is_alive():
+            return True
+        self._close_process()
+        try:
+            block = ControlBlock.create()
+            with self._block_lock:
+                self._block = block
+            self._commands = self._ctx.Queue()
+            self._messages = self._ctx.Queue()
+            self._process = self._ctx.Process(
+                target=_child_main,
+                args=(
+                    str(self.config_path),
+                    block.name,
+                    self._commands,
+                    self._messages,
+                    self._level_name,
+                    self._events_enabled,
+                    self._simulated,
+                ),
+                name="macro-engine-process",
+                daemon=True,
+            )
+            self._process.start()
+        except Exception as e:
+            self.error_manager.report("Failed to start the engine process", e, critical=True)
+            self._close_process()
+            return False
+        self._monitor_stop = threading.Event()
+        self._monitor = threading.Thread(target=self._monitor_run, name="engine-process-monitor", daemon=True)
+        self._monitor.start()
+        self.logger.info("Engine process started (pid %s)", self._process.pid)
+        return True
+
+    def _send(self, *command: object) -> None:
+        q = self._commands
+        if q is None:
+            return
+        try:
+            q.put(command)
+        except Exception as e:
+            self.logger.warning("Engine command %s not delivered: %s", command[0], e)
+
+    def start(self, resume_from: Checkpoint | None = None) -> bool:
+        with self._lock:
+            if self._session_active:
+                return False
+            if not self._ensure_process():
+                return False
+            settings = self._settings_provider()
+            self._paused = False
+            self._stop_requested = False
+            self._stop_requested_at = None
+            self.last_stop_reason = ""
+            self.last_stop_latency_ms = None
+            self.last_signal_latency_ms = None
+            self._rotation_base = resume_from.rotations if resume_from is not None else 0
+            with self._block_lock:
+                block = self._block
+                assert block is not None
+                block.stop = False
+                block.begin(self._rotation_base, settings.loop_count)
+                self._seen_samples = block.loop_totals()
+            self._sent_settings = settings
+            self._session_active = True
+            self._session_done.clear()
+            self._send("start", settings, resume_from)
+            return True
+
+    def request_stop(self) -> None:
+        if self._stop_requested_at is None:
+            self._stop_requested_at = time.perf_counter()
+        self._stop_requested = True
+        with self._block_lock:
+            if self._block is not None:
+                self._block.stop = True
+        self._send("stop")
+
+    def emergency_stop(self) -> None:
+        # Safe from the hotkey-dispatch thread: one shared-memory store and one queue put.
+        self.request_stop()
+        if self.running:
+            self._send("abort")
+
+    def pause(self) -> bool:
+        if not self._session_active or self._paused or self._stop_requested:
+            return False
+        self._paused = True
+        self._send("pause")
+        return True
+
+    def resume(self) -> bool:
+        if not self._paused:
+            return False
+        self._paused = False
+        self._send("resume")
+        return True
+
+    def toggle_pause(self) -> bool:
+        return self.resume() or self.pause()
+
+    def join(self, timeout: float | None = None) -> None:
+        self._session_done.wait(timeout)
+
+    def shutdown(self, timeout: float | None = 2.0) -> None:
+        if self._session_active:
+            self.request_stop()
+        self._send("shutdown")
+        p = self._process
+        if p is not None:
+            p.join(timeout)
+            if p.is_alive():
+                self.logger.warning("Engine process did not exit; terminating")
+                p.terminate()
+                p.join(1.0)
+        self._monitor_stop.set()
+        t = self._monitor
+        if t is not None and t is not threading.current_thread():
+            t.join(1.0)
+        self._close_process()
+        if self._session_active:
+            self._session_ended({"reason": "shutdown"})
+
+    def _close_process(self) -> None:
+        for q in (self._commands, self._messages):
+            if q is not None:
+                try:
+                    q.close()
+                    q.cancel_join_thread()
+                except Exception:
+                    pass
+        self._commands = None
+        self._messages = None
+        self._process = None
+        with self._block_lock:
+            block = self._block
+            self._block = None
+            if block is not None:
+                self._rotation_base = block.rotations
+                block.close()
+
+    def _monitor_run(self) -> None:
+        messages = self._messages
+        process = self._process
+        stop = self._monitor_stop
+        next_settings = time.monotonic() + self._settings_poll_s
+        while not stop.is_set() and messages is not None:
+            try:
+                message = messages.get(timeout=0.05)
+            except queue.Empty:
+                message = None
+            except Exception:
+                break
+            if message is not None:
+                self._handle_message(message)
+
+            if self._session_active:
+                self._poll_loops()
+                now = time.monotonic()
+                if now >= next_settings:
+                    next_settings = now + self._settings_poll_s
+                    self._push_settings()
+                if process is not None and not process.is_alive():
+                    self.error_manager.report(f"Engine process exited (code {process.exitcode})", critical=True)
+                    self._session_ended({"reason": "error"})
+
+    def _handle_message(self, message: object) -> None:
+        if isinstance(message, logging.LogRecord):
+            # Child log and event records go through this process's handlers, so there is one debug.log.
+            logger = logging.getLogger() if message.name == "root" else logging.getLogger(message.name)
+            logger.handle(message)
+            return
+        kind = message[0]  # type: ignore[index]
+        if kind == "error":
+            _, text, detail, critical = message  # type: ignore[misc]
+            self.error_manager.report(text, RemoteEngineError(detail) if detail else None, critical=critical)
+        elif kind == "finished":
+            self._poll_loops()
+            self._session_ended(message[1])  # type: ignore[index]
+
+    def _poll_loops(self) -> None:
+        with self._block_lock:
+            if self._block is None:
+                return
+            samples, total_s, clicks = self._block.loop_totals()
+        seen_samples, seen_s, seen_clicks = self._seen_samples
+        n = samples - seen_samples
+        if n <= 0:
+            return
+        self._seen_samples = (samples, total_s, clicks)
+        loop_s = (total_s - seen_s) / n
+        per_loop_clicks = (clicks - seen_clicks) / n
+        for i in range(n):
+            # Spread fractional clicks so the window total matches the child's count.
+            self.throughput.add(loop_s, int(per_loop_clicks * (i + 1)) - int(per_loop_clicks * i))
+
+    def _push_settings(self) -> None:
+        try:
+            settings = self._settings_provider()
+        except Exception:
+            return
+        if settings != self._sent_settings:
+            self._sent_settings = settings
+            self._send("settings", settings)
+
+    def _session_ended(self, info: dict[str, object]) -> None:
+        with self._lock:
+            if not self._session_active:
+                return
+            self.last_stop_reason = str(info.get("reason", ""))
+            latency = info.get("stop_latency_ms")
+            self.last_stop_latency_ms = float(latency) if isinstance(latency, (int, float)) else None
+            requested = self._stop_requested_at
+            if requested is not None:
+                self.last_signal_latency_ms = (time.perf_counter() - requested) * 1000.0
+            self.paused_s = float(info.get("paused_s", 0.0) or 0.0)
+            self.focus_paused_s = float(info.get("focus_paused_s", 0.0) or 0.0)
+            self.last_loop_samples = list(info.get("loop_samples", ()) or ())  # type: ignore[call-overload]
+            rotations = info.get("rotations")
+            if isinstance(rotations, int):
+                self._rotation_base = rotations
+            self._paused = False
+            self._session_active = False
+            self._session_done.set()
+        if self._on_finished:
+            try:
+                self._on_finished()
+            except Exception:
+                pass
+
+
+def _gil_load(stop: threading.Event) -> None:
+    # Pure-Python work standing in for Tk redraws and keyboard hook callbacks.
+    while not stop.is_set():
+        sum(i * i for i in range(2000))
+
+
+def _timing_row(label: str, samples: list[float]) -> str:
+    if len(samples) < 2:
+        return f"{label:<8} not enough loops"
+    ms = sorted(s * 1000.0 for s in samples)
+    p99 = ms[min(len(ms) - 1, int(len(ms) * 0.99))]
+    return (
+        f"{label:<8} loops={len(ms)} mean={statistics.fmean(ms):.1f}ms stdev={statistics.stdev(ms):.2f}ms "
+        f"p50={statistics.median(ms):.1f}ms p99={p99:.1f}ms max={ms[-1]:.1f}ms"
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    import tempfile
+
+    from .engine import MacroEngine
+
+    parser = argparse.ArgumentParser(
+        prog="python -m app.isolated",
+        description="Compare rotation timing of the in-process engine thread and the isolated engine process "
+        "while other threads in this process keep the GIL busy.",
+    )
+    parser.add_argument("--loops", type=int, default=10)
+    parser.add_argument("--load-threads", type=int, default=2, help="Busy Python threads standing in for the UI")
+    parser.add_argument("--radius", type=int, default=25)
+    parser.add_argument("--step", type=int, default=30)
+    parser.add_argument("--step-delay-ms", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    logger = logging.getLogger("app.isolated.bench")
+    logger.propagate = False
+    logger.addHandler(logging.NullHandler())
+    settings = MacroSettings(
+        click_x=500,
+        click_y=500,
+        radius=args.radius,
+        spin_speed=args.step,
+        step_delay_ms=args.step_delay_ms,
+        loop_count=max(2, args.loops),
+        pause_when_unfocused=False,
+    )
+
+    stop_load = threading.Event()
+    loaders = [
+        threading.Thread(target=_gil_load, args=(stop_load,), name=f"gil-load-{i}", daemon=True)
+        for i in range(max(0, args.load_threads))
+    ]
+    for t in loaders:
+        t.start()
+    try:
+        engine = MacroEngine(
+            autoit=_simulated_bridge(),
+            logger=logger,
+            error_manager=ErrorManager(logger),
+            settings_provider=lambda: settings,
+        )
+        estimator = engine.throughput = _PublishingEstimator(None, lambda: 0)
+        engine.start()
+        engine.join()
+        engine.shutdown()
+        thread_samples = list(estimator.loop_samples)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            config_path = Path(tmp) / "config.ini"
+            config_path.write_text("[Checkpoint]\nEnabled = 0\n", encoding="utf-8")
+            isolated = IsolatedEngine(
+                config_path,
+                logger,
+                ErrorManager(logger),
+                lambda: settings,
+                level_name="WARNING",
+                events_enabled=False,
+                simulated=True,
+            )
+            t0 = time.perf_counter()
+            isolated.start()
+            isolated.join()
+            elapsed = time.perf_counter() - t0
+            isolated.shutdown()
+            process_samples = isolated.last_loop_samples
+    finally:
+        stop_load.set()
+
+    print(f"load_threads={len(loaders)} loops={settings.loop_count} (process session incl. spawn: {elapsed:.2f}s)")
+    print(_timing_row("thread", thread_samples))
+    print(_timing_row("process", process_samples))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,364 @@
+from __future__ import annotations
+
+import argparse
+import math
+import time
+from collections.abc import Sequence
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from .screen import ScreenSource
+
+try:
+    import numpy as np
+    from numpy.lib.stride_tricks import sliding_window_view
+except Exception:  # pragma: no cover - optional dependency
+    np = None  # type: ignore[assignment]
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise RuntimeError("The 'numpy' package is required. Install it with: pip install numpy")
+
+
+@dataclass(frozen=True)
+class LocateResult:
+    x: int
+    y: int
+    score: float
+    scale: float
+    elapsed_ms: float
+
+
+def to_gray(image: np.ndarray) -> np.ndarray:
+    if image.ndim == 2:
+        return image.astype(np.float32, copy=False)
+    rgb = image[..., :3].astype(np.float32)
+    return rgb @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+def _downsample(image: np.ndarray) -> np.ndarray:
+    h, w = image.shape[0] // 2 * 2, image.shape[1] // 2 * 2
+    v = image[:h, :w]
+    return (v[0::2, 0::2] + v[1::2, 0::2] + v[0::2, 1::2] + v[1::2, 1::2]) * 0.25
+
+
+def _resize(image: np.ndarray, scale: float) -> np.ndarray:
+    if abs(scale - 1.0) < 1e-6:
+        return image
+    h, w = image.shape
+    nh, nw = max(1, int(round(h * scale))), max(1, int(round(w * scale)))
+    ys = np.clip((np.arange(nh) + 0.5) / scale - 0.5, 0, h - 1)
+    xs = np.clip((np.arange(nw) + 0.5) / scale - 0.5, 0, w - 1)
+    y0 = np.floor(ys).astype(np.intp)
+    x0 = np.floor(xs).astype(np.intp)
+    y1 = np.minimum(y0 + 1, h - 1)
+    x1 = np.minimum(x0 + 1, w - 1)
+    fy = (ys - y0).astype(np.float32)[:, None]
+    fx = (xs - x0).astype(np.float32)[None, :]
+    top = image[y0][:, x0] * (1 - fx) + image[y0][:, x1] * fx
+    bottom = image[y1][:, x0] * (1 - fx) + image[y1][:, x1] * fx
+    return (top * (1 - fy) + bottom * fy).astype(np.float32)
+
+
+def build_pyramid(image: np.ndarray, levels: int) -> list[np.ndarray]:
+    pyramid = [image]
+    for _ in range(max(0, levels - 1)):
+        if min(pyramid[-1].shape) < 4:
+            break
+        pyramid.append(_downsample(pyramid[-1]))
+    return pyramid
+
+
+def _box_sums(image: np.ndarray, th: int, tw: int) -> tuple[np.ndarray, np.ndarray]:
+    h, w = image.shape
+    ii = np.zeros((h + 1, w + 1), dtype=np.float64)
+    ii2 = np.zeros((h + 1, w + 1), dtype=np.float64)
+    np.cumsum(np.cumsum(image, axis=0, dtype=np.float64), axis=1, out=ii[1:, 1:])
+    np.cumsum(np.cumsum(np.square(image, dtype=np.float64), axis=0), axis=1, out=ii2[1:, 1:])
+
+    def box(t: np.ndarray) -> np.ndarray:
+        return t[th:, tw:] - t[:-th, tw:] - t[th:, :-tw] + t[:-th, :-tw]
+
+    return box(ii), box(ii2)
+
+
+def ncc_map(image: np.ndarray, template: np.ndarray) -> np.ndarray:
+    th, tw = template.shape
+    h, w = image.shape
+    if h < th or w < tw:
+        return np.zeros((0, 0), dtype=np.float32)
+
+    t = template.astype(np.float64) - float(template.mean())
+    t_norm = math.sqrt(float((t * t).sum()))
+    if t_norm < 1e-6:
+        return np.zeros((h - th + 1, w - tw + 1), dtype=np.float32)
+
+    # Zero-mean template: sum(I * t) already equals sum((I - mean_I) * t).
+    if (h - th + 1) * (w - tw + 1) * th * tw <= 4_000_000:
+        num = np.einsum("ijkl,kl->ij", sliding_window_view(image, (th, tw)), t, optimize=True)
+    else:
+        spectrum = np.fft.rfft2(image, s=(h, w)) * np.conj(np.fft.rfft2(t, s=(h, w)))
+        num = np.fft.irfft2(spectrum, s=(h, w))[: h - th + 1, : w - tw + 1]
+
+    s1, s2 = _box_sums(image, th, tw)
+    var = np.maximum(s2 - s1 * s1 / (th * tw), 0.0)
+    den = np.sqrt(var) * t_norm
+    out = np.zeros_like(num, dtype=np.float32)
+    np.divide(num, den, out=out, where=den > 1e-6, casting="unsafe")
+    return out
+
+
+def _coarse_candidates(image: np.ndarray, template: np.ndarray, count: int) -> list[tuple[float, int, int]]:
+    scores = ncc_map(image, template)
+    if scores.size == 0:
+        return []
+    th, tw = template.shape
+    work = scores.copy()
+    found: list[tuple[float, int, int]] = []
+    for _ in range(max(1, count)):
+        idx = int(np.argmax(work))
+        y, x = divmod(idx, work.shape[1])
+        score = float(work[y, x])
+        if score <= -1.0:
+            break
+        found.append((score, y, x))
+        work[max(0, y - th // 2) : y + th // 2 + 1, max(0, x - tw // 2) : x + tw // 2 + 1] = -1.0
+    return found
+
+
+def _refine(
+    image: np.ndarray, template: np.ndarray, y: int, x: int, radius: int
+) -> tuple[float, int, int]:
+    th, tw = template.shape
+    h, w = image.shape
+    y0 = min(max(0, y - radius), max(0, h - th))
+    x0 = min(max(0, x - radius), max(0, w - tw))
+    y1 = min(h, y + radius + th)
+    x1 = min(w, x + radius + tw)
+    scores = ncc_map(image[y0:y1, x0:x1], template)
+    if scores.size == 0:
+        return -1.0, y, x
+    idx = int(np.argmax(scores))
+    dy, dx = divmod(idx, scores.shape[1])
+    return float(scores[dy, dx]), y0 + dy, x0 + dx
+
+
+class TemplateLocator:
+    def __init__(
+        self,
+        template: np.ndarray,
+        levels: int = 3,
+        scales: Sequence[float] = (1.0,),
+        min_score: float = 0.8,
+        workers: int = 0,
+        candidates: int = 3,
+        min_template_px: int = 6,
+    ):
+        _require_numpy()
+        gray = to_gray(np.asarray(template))
+        if gray.ndim != 2 or min(gray.shape) < 2:
+            raise ValueError(f"Template too small: {gray.shape}")
+
+        self._levels = max(1, int(levels))
+        self._min_score = float(min_score)
+        self._workers = max(0, int(workers))
+        self._candidates = max(1, int(candidates))
+        self._min_template_px = max(2, int(min_template_px))
+        self._scales: list[tuple[float, list[np.ndarray]]] = []
+        for scale in scales or (1.0,):
+            scaled = _resize(gray, float(scale))
+            self._scales.append((float(scale), build_pyramid(scaled, self._levels)))
+        self._executor: Executor | None = None
+
+        self.last_score = 0.0
+        self.last_elapsed_ms = 0.0
+
+    @property
+    def template_size(self) -> tuple[int, int]:
+        h, w = self._scales[0][1][0].shape
+        return w, h
+
+    def _coarse_level(self, pyramid: list[np.ndarray], frame_levels: int) -> int:
+        level = 0
+        for k in range(1, min(len(pyramid), frame_levels)):
+            if min(pyramid[k].shape) < self._min_template_px:
+                break
+            level = k
+        return level
+
+    def _pool(self) -> Executor | None:
+        if self._workers <= 0 or len(self._scales) < 2:
+            return None
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self._workers)
+        return self._executor
+
+    def locate(self, frame: np.ndarray, origin: tuple[int, int] = (0, 0)) -> LocateResult | None:
+        t0 = time.perf_counter()
+        frames = build_pyramid(to_gray(frame), self._levels)
+
+        jobs = []
+        for scale, pyramid in self._scales:
+            level = self._coarse_level(pyramid, len(frames))
+            jobs.append((scale, pyramid, level))
+
+        pool = self._pool()
+        if pool is not None:
+            futures = [
+                pool.submit(_coarse_candidates, frames[level], pyramid[level], self._candidates)
+                for _scale, pyramid, level in jobs
+            ]
+            coarse = [f.result() for f in futures]
+        else:
+            coarse = [
+                _coarse_candidates(frames[level], pyramid[level], self._candidates)
+                for _scale, pyramid, level in jobs
+            ]
+
+        best: tuple[float, int, int, float, tuple[int, int]] | None = None
+        for (scale, pyramid, level), found in zip(jobs, coarse):
+            for score, y, x in found:
+                for k in range(level - 1, -1, -1):
+                    score, y, x = _refine(frames[k], pyramid[k], y * 2, x * 2, 2)
+                if best is None or score > best[0]:
+                    best = (score, y, x, scale, pyramid[0].shape)
+
+        elapsed = (time.perf_counter() - t0) * 1000.0
+        self.last_elapsed_ms = elapsed
+        if best is None:
+            self.last_score = 0.0
+            return None
+
+        score, y, x, scale, (th, tw) = best
+        self.last_score = score
+        if score < self._min_score:
+            return None
+        return LocateResult(
+            x=int(origin[0] + x + tw // 2),
+            y=int(origin[1] + y + th // 2),
+            score=round(score, 4),
+            scale=scale,
+            elapsed_ms=elapsed,
+        )
+
+    def locate_on_screen(
+        self, source: ScreenSource, roi: tuple[int, int, int, int] | None = None
+    ) -> LocateResult | None:
+        bx, by, bw, bh = source.bounds()
+        if roi is None:
+            x0, y0, x1, y1 = bx, by, bx + bw, by + bh
+        else:
+            rx, ry, rw, rh = roi
+            x0, y0 = max(bx, rx), max(by, ry)
+            x1, y1 = min(bx + bw, rx + rw), min(by + bh, ry + rh)
+        if x1 <= x0 or y1 <= y0:
+            return None
+        frame = source.grab(x0, y0, x1 - x0, y1 - y0)
+        return self.locate(frame, origin=(x0, y0))
+
+    def close(self) -> None:
+        ex = self._executor
+        self._executor = None
+        if ex is not None:
+            ex.shutdown(wait=False, cancel_futures=True)
+
+
+def save_template(path: Path, pixels: np.ndarray) -> None:
+    _require_numpy()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("wb") as f:
+        np.save(f, np.ascontiguousarray(pixels, dtype=np.uint8), allow_pickle=False)
+
+
+def load_template(path: Path) -> np.ndarray | None:
+    _require_numpy()
+    if not path.exists():
+        return None
+    return np.load(path, allow_pickle=False)
+
+
+def parse_scales(text: str) -> list[float]:
+    scales: list[float] = []
+    for part in (text or "").replace(";", ",").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            value = float(part)
+        except ValueError:
+            continue
+        if value > 0:
+            scales.append(value)
+    return scales or [1.0]
+
+
+def _synthetic_scene(width: int, height: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    coarse = rng.integers(0, 256, size=(height // 8 + 1, width // 8 + 1, 3), dtype=np.uint8)
+    scene = np.repeat(np.repeat(coarse, 8, axis=0), 8, axis=1)[:height, :width]
+    return np.ascontiguousarray(scene)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.locator",
+        description="Benchmark template locate time on synthetic 1080p and 1440p frames.",
+    )
+    parser.add_argument("--template", type=int, default=48, help="Template size in 1080p pixels")
+    parser.add_argument("--levels", type=int, default=3)
+    parser.add_argument("--scales", default="1.0,1.3333")
+    parser.add_argument("--workers", type=int, default=0)
+    parser.add_argument("--roi", type=int, default=300, help="ROI margin around the expected point (0 = full frame)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    _require_numpy()
+    scales = parse_scales(args.scales)
+    rng = np.random.default_rng(7)
+    size = int(args.template)
+    template = rng.integers(0, 256, size=(size // 4, size // 4, 3), dtype=np.uint8)
+    template = np.repeat(np.repeat(template, 4, axis=0), 4, axis=1)
+
+    locator = TemplateLocator(template, levels=args.levels, scales=scales, workers=args.workers)
+    try:
+        for label, width, height in (("1080p", 1920, 1080), ("1440p", 2560, 1440)):
+            factor = height / 1080.0
+            scene = _synthetic_scene(width, height, seed=height)
+            placed = np.clip(_resize(template[..., 0].astype(np.float32), factor), 0, 255).astype(np.uint8)
+            th, tw = placed.shape
+            tx, ty = int(width * 0.61), int(height * 0.37)
+            for c in range(3):
+                scene[ty : ty + th, tx : tx + tw, c] = np.clip(
+                    _resize(template[..., c].astype(np.float32), factor), 0, 255
+                ).astype(np.uint8)
+            expected = (tx + tw // 2, ty + th // 2)
+
+            for mode, margin in (("full", 0), ("roi", int(args.roi * factor))):
+                if mode == "roi" and margin <= 0:
+                    continue
+                if margin > 0:
+                    x0, y0 = max(0, expected[0] - margin), max(0, expected[1] - margin)
+                    frame = scene[y0 : expected[1] + margin, x0 : expected[0] + margin]
+                else:
+                    x0, y0, frame = 0, 0, scene
+                timings: list[float] = []
+                result = None
+                for _ in range(max(1, args.repeat)):
+                    result = locator.locate(frame, origin=(x0, y0))
+                    timings.append(locator.last_elapsed_ms)
+                timings.sort()
+                where = f"({result.x}, {result.y}) scale={result.scale} score={result.score}" if result else "not found"
+                print(
+                    f"{label} {mode:<4} {frame.shape[1]}x{frame.shape[0]}  "
+                    f"median={timings[len(timings) // 2]:.1f}ms min={timings[0]:.1f}ms  "
+                    f"found={where} expected={expected}"
+                )
+    finally:
+        locator.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,6 +1,15 @@
 from __future__ import annotations
 
+import atexit
+import gzip
 import logging
+import os
+import queue
+import shutil
+import threading
+import time
+from datetime import date, datetime
+from logging.handlers import BaseRotatingHandler, QueueHandler, QueueListener
 from pathlib import Path
 
 ACTION_LEVEL = 25
@@ -37,15 +46,316 @@ _LEVEL_NAME_TO_VALUE: dict[str, int] = {
 }
 
 
+class LogFlags:
+    __slots__ = ("trace", "debug", "action")
+
+    def __init__(self):
+        self.trace = False
+        self.debug = False
+        self.action = True
+
+    def update(self, level_value: int) -> None:
+        self.trace = level_value <= TRACE_LEVEL
+        self.debug = level_value <= logging.DEBUG
+        self.action = level_value <= ACTION_LEVEL
+
+
+LOG_FLAGS = LogFlags()
+
+
+class PointsSummary:
+    __slots__ = ("_points",)
+
+    def __init__(self, points: list[tuple[int, int]]):
+        self._points = points
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def __str__(self) -> str:
+        return ";".join(f"{x},{y}" for x, y in self._points)
+
+
 def parse_level(level_name: str) -> int:
     return _LEVEL_NAME_TO_VALUE.get(level_name.strip().upper(), logging.INFO)
 
 
-def init_logging(log_file_path: Path, level_name: str) -> logging.Logger:
+QUEUE_POLICY_DROP = "drop"
+QUEUE_POLICY_BLOCK = "block"
+
+
+class _BoundedQueueHandler(QueueHandler):
+    def __init__(self, log_queue: queue.Queue, policy: str, block_timeout: float):
+        super().__init__(log_queue)
+        self._policy = policy
+        self._block_timeout = block_timeout
+        self._dropped_lock = threading.Lock()
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting happens on the listener thread; the record is handed over as-is.
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            if self._policy == QUEUE_POLICY_BLOCK:
+                self.queue.put(record, block=True, timeout=self._block_timeout)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+
+class _DrainingQueueListener(QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # The queue may be full under the drop policy; wait for room so stop() always drains.
+        self.queue.put(self._sentinel)
+
+
+class _ArchiveCompressor:
+    def __init__(self):
+        self._jobs: queue.Queue[tuple[Path, Path, int, int] | None] = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, rotated: Path, base_path: Path, backup_count: int, retention_days: int) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="log-compress", daemon=True)
+                self._thread.start()
+        self._jobs.put((rotated, base_path, backup_count, retention_days))
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is None:
+            return
+        self._jobs.put(None)
+        thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            rotated, base_path, backup_count, retention_days = job
+            try:
+                self._compress(rotated)
+            except Exception:
+                pass
+            try:
+                prune_log_archives(base_path, backup_count, retention_days)
+            except Exception:
+                pass
+
+    @staticmethod
+    def _compress(rotated: Path) -> None:
+        if not rotated.exists():
+            return
+        archive = rotated.with_name(rotated.name + ".gz")
+        tmp = archive.with_name(archive.name + ".tmp")
+        with rotated.open("rb") as src, gzip.open(tmp, "wb", compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        os.replace(tmp, archive)
+        rotated.unlink()
+
+
+_compressor = _ArchiveCompressor()
+
+
+def prune_log_archives(base_path: Path, backup_count: int, retention_days: int) -> None:
+    archives = sorted(
+        base_path.parent.glob(base_path.name + ".*.gz"),
+        key=lambda p: p.stat().st_mtime,
+        reverse=True,
+    )
+    cutoff = time.time() - (retention_days * 86400) if retention_days > 0 else None
+    for idx, archive in enumerate(archives):
+        expired = cutoff is not None and archive.stat().st_mtime < cutoff
+        if (backup_count > 0 and idx >= backup_count) or expired:
+            try:
+                archive.unlink()
+            except Exception:
+                pass
+
+
+class CompressingRotatingFileHandler(BaseRotatingHandler):
+    def __init__(
+        self,
+        filename: Path,
+        max_bytes: int = 5 * 1024 * 1024,
+        rotate_daily: bool = True,
+        backup_count: int = 7,
+        retention_days: int = 14,
+        encoding: str = "utf-8",
+    ):
+        super().__init__(str(filename), "a", encoding=encoding, delay=False)
+        self._path = Path(filename)
+        self.max_bytes = max(0, int(max_bytes))
+        self.rotate_daily = bool(rotate_daily)
+        self.backup_count = max(0, int(backup_count))
+        self.retention_days = max(0, int(retention_days))
+        self._opened_on = self._file_date()
+
+    def _file_date(self) -> date:
+        try:
+            if self._path.exists() and self._path.stat().st_size > 0:
+                return date.fromtimestamp(self._path.stat().st_mtime)
+        except Exception:
+            pass
+        return date.today()
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self.rotate_daily and date.fromtimestamp(record.created) != self._opened_on:
+            return True
+        if self.max_bytes > 0 and self.stream is not None:
+            try:
+                if self.stream.tell() >= self.max_bytes:
+                    return True
+            except Exception:
+                pass
+        return False
+
+    def doRollover(self) -> None:
+        if self.stream:
+            self.stream.close()
+            self.stream = None  # type: ignore[assignment]
+
+        rotated: Path | None = None
+        if self._path.exists() and self._path.stat().st_size > 0:
+            ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+            rotated = self._path.with_name(f"{self._path.name}.{ts}")
+            n = 1
+            while rotated.exists() or rotated.with_name(rotated.name + ".gz").exists():
+                rotated = self._path.with_name(f"{self._path.name}.{ts}_{n}")
+                n += 1
+            try:
+                os.replace(self._path, rotated)
+            except Exception:
+                rotated = None
+
+        self.stream = self._open()
+        self._opened_on = date.today()
+
+        if rotated is not None:
+            _compressor.submit(rotated, self._path, self.backup_count, self.retention_days)
+
+
+_listener: _DrainingQueueListener | None = None
+_queue_handler: _BoundedQueueHandler | None = None
+_output_handlers: list[logging.Handler] = []
+_event_listener: _DrainingQueueListener | None = None
+_event_queue_handler: _BoundedQueueHandler | None = None
+_state_lock = threading.RLock()
+
+EVENT_LOGGER_NAME = "app.events"
+
+
+def dropped_log_records() -> int:
+    handler = _queue_handler
+    if handler is None:
+        return 0
+    return handler.dropped
+
+
+def _shutdown_event_log() -> None:
+    global _event_listener, _event_queue_handler
+
+    with _state_lock:
+        listener = _event_listener
+        handler = _event_queue_handler
+        _event_listener = None
+        _event_queue_handler = None
+
+    if listener is None:
+        return
+
+    if handler is not None:
+        logging.getLogger(EVENT_LOGGER_NAME).removeHandler(handler)
+    try:
+        listener.stop()
+    except Exception:
+        pass
+    for out in listener.handlers:
+        try:
+            out.close()
+        except Exception:
+            pass
+
+
+def shutdown_logging() -> None:
+    global _listener, _queue_handler
+
+    _shutdown_event_log()
+
+    with _state_lock:
+        listener = _listener
+        handler = _queue_handler
+        _listener = None
+        _queue_handler = None
+
+    if listener is None:
+        return
+
+    root = logging.getLogger()
+    if handler is not None:
+        root.removeHandler(handler)
+
+    try:
+        listener.stop()
+    except Exception:
+        pass
+
+    _compressor.stop()
+
+    dropped = handler.dropped if handler is not None else 0
+    for out in _output_handlers:
+        if dropped:
+            try:
+                out.handle(
+                    root.makeRecord(
+                        root.name,
+                        logging.WARNING,
+                        __file__,
+                        0,
+                        "Log queue dropped %s records",
+                        (dropped,),
+                        None,
+                    )
+                )
+            except Exception:
+                pass
+        try:
+            out.flush()
+        except Exception:
+            pass
+
+
+def init_logging(
+    log_file_path: Path,
+    level_name: str,
+    queue_size: int = 10000,
+    queue_policy: str = QUEUE_POLICY_DROP,
+    block_timeout: float = 0.05,
+    max_bytes: int = 5 * 1024 * 1024,
+    rotate_daily: bool = True,
+    backup_count: int = 7,
+    retention_days: int = 14,
+) -> logging.Logger:
+    global _listener, _queue_handler, _output_handlers
+
+    shutdown_logging()
     log_file_path.parent.mkdir(parents=True, exist_ok=True)
 
     logger = logging.getLogger()
-    logger.handlers.clear()
+    for old in list(logger.handlers):
+        logger.removeHandler(old)
+        try:
+            old.close()
+        except Exception:
+            pass
     logger.setLevel(TRACE_LEVEL)
 
     formatter = logging.Formatter(
@@ -54,23 +364,82 @@ def init_logging(log_file_path: Path, level_name: str) -> logging.Logger:
     )
 
     level_value = parse_level(level_name)
+    LOG_FLAGS.update(level_value)
 
-    file_handler = logging.FileHandler(log_file_path, encoding="utf-8")
+    file_handler = CompressingRotatingFileHandler(
+        log_file_path,
+        max_bytes=max_bytes,
+        rotate_daily=rotate_daily,
+        backup_count=backup_count,
+        retention_days=retention_days,
+    )
     file_handler.setLevel(level_value)
     file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
 
     stream_handler = logging.StreamHandler()
     stream_handler.setLevel(level_value)
     stream_handler.setFormatter(formatter)
-    logger.addHandler(stream_handler)
+
+    policy = queue_policy.strip().lower()
+    if policy not in (QUEUE_POLICY_DROP, QUEUE_POLICY_BLOCK):
+        policy = QUEUE_POLICY_DROP
+
+    log_queue: queue.Queue[logging.LogRecord] = queue.Queue(maxsize=max(1, int(queue_size)))
+    queue_handler = _BoundedQueueHandler(log_queue, policy, max(0.0, float(block_timeout)))
+    queue_handler.setLevel(level_value)
+
+    listener = _DrainingQueueListener(
+        log_queue,
+        file_handler,
+        stream_handler,
+        respect_handler_level=True,
+    )
+
+    with _state_lock:
+        _output_handlers = [file_handler, stream_handler]
+        _queue_handler = queue_handler
+        _listener = listener
+        listener.start()
+        logger.addHandler(queue_handler)
 
     logger.info("Log session start")
     return logger
 
 
+def init_event_log(event_file_path: Path, queue_size: int = 10000) -> logging.Logger:
+    global _event_listener, _event_queue_handler
+
+    _shutdown_event_log()
+    event_file_path.parent.mkdir(parents=True, exist_ok=True)
+
+    event_logger = logging.getLogger(EVENT_LOGGER_NAME)
+    event_logger.propagate = False
+    event_logger.setLevel(logging.INFO)
+
+    file_handler = logging.FileHandler(event_file_path, mode="a", encoding="utf-8")
+    file_handler.setFormatter(logging.Formatter("%(message)s"))
+
+    event_queue: queue.Queue[logging.LogRecord] = queue.Queue(maxsize=max(1, int(queue_size)))
+    queue_handler = _BoundedQueueHandler(event_queue, QUEUE_POLICY_DROP, 0.0)
+    listener = _DrainingQueueListener(event_queue, file_handler)
+
+    with _state_lock:
+        _event_queue_handler = queue_handler
+        _event_listener = listener
+        listener.start()
+        event_logger.addHandler(queue_handler)
+
+    return event_logger
+
+
 def set_logging_level(level_name: str) -> None:
     level_value = parse_level(level_name)
+    LOG_FLAGS.update(level_value)
     root = logging.getLogger()
     for handler in root.handlers:
         handler.setLevel(level_value)
+    for handler in _output_handlers:
+        handler.setLevel(level_value)
+
+
+atexit.register(shutdown_logging)
@@ -9,33 +9,28 @@ import webbrowser
 
 try:
     from .autoit_bridge import AutoItBridge
+    from .bootstrap import CONFIG_PATH, RUNNER_PATH, init_runtime_logging
     from .config_manager import ConfigManager
     from .error_handler import ErrorManager
     from .hotkeys import HotkeyManager
-    from .logger import init_logging, parse_level, set_logging_level
+    from .logger import shutdown_logging
     from .ui import AppUI
 except ImportError:
     root_dir = Path(__file__).resolve().parents[1]
     if str(root_dir) not in sys.path:
         sys.path.insert(0, str(root_dir))
     from app.autoit_bridge import AutoItBridge
+    from app.bootstrap import CONFIG_PATH, RUNNER_PATH, init_runtime_logging
     from app.config_manager import ConfigManager
     from app.error_handler import ErrorManager
     from app.hotkeys import HotkeyManager
-    from app.logger import init_logging, parse_level, set_logging_level
+    from app.logger import shutdown_logging
     from app.ui import AppUI
 
 
 def main() -> None:
-    root_dir = Path(__file__).resolve().parents[1]
-    config_path = root_dir / "config" / "config.ini"
-    log_path = root_dir / "logs" / "debug.log"
-    runner_path = root_dir / "autoit" / "runner.au3"
-
-    config = ConfigManager(config_path)
-
-    logger = init_logging(log_path, config.get("Debug", "Level", fallback="INFO"))
-    set_logging_level(config.get("Debug", "Level", fallback="INFO"))
+    config = ConfigManager(CONFIG_PATH)
+    logger, events = init_runtime_logging(config)
 
     ctk_mod = None
     try:
@@ -236,7 +231,7 @@ def main() -> None:
         return bool(ok["value"])
 
     error_manager = ErrorManager(logger=logger)
-    autoit = AutoItBridge(runner_script_path=runner_path, logger=logger)
+    autoit = AutoItBridge(runner_script_path=RUNNER_PATH, logger=logger, events=events)
     hotkeys = HotkeyManager(logger=logger)
 
     if not _is_activated():
@@ -278,6 +273,7 @@ def main() -> None:
             hotkeys=hotkeys,
             error_manager=error_manager,
             logger=logger,
+            events=events,
         )
     except Exception as e:
         try:
@@ -316,7 +312,10 @@ def main() -> None:
     except Exception:
         pass
 
-    root.mainloop()
+    try:
+        root.mainloop()
+    finally:
+        shutdown_logging()
 
 
 if __name__ == "__main__":
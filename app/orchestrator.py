@@ -0,0 +1,360 @@
+from __future__ import annotations
+
+import dataclasses
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from .autoit_bridge import AutoItBridgeAborted, AutoItBridgeError
+from .clock import MONOTONIC_CLOCK, Clock
+from .config_manager import ConfigManager
+from .engine import MacroSettings
+
+if TYPE_CHECKING:
+    from .autoit_bridge import AutoItBridge
+    from .engine import MacroEngine
+
+
+# [Instance.NAME] keys that override the main config for one instance.
+INSTANCE_KEYS = {
+    "Window": "target_window",
+    "ClickX": "click_x",
+    "ClickY": "click_y",
+    "WindowX": "window_x",
+    "WindowY": "window_y",
+    "RefWidth": "ref_width",
+    "RefHeight": "ref_height",
+    "Radius": "radius",
+    "SpinSpeed": "spin_speed",
+    "MoveSpeed": "move_speed",
+    "StepDelayMs": "step_delay_ms",
+    "Clockwise": "clockwise",
+    "CenterClickEveryRotations": "center_click_every",
+    "BeforeClickDelayMs": "before_click_delay_ms",
+    "AfterClickDelayMs": "after_click_delay_ms",
+    "LoopCount": "loop_count",
+    "PerLoopDelayMs": "per_loop_delay_ms",
+    "PostLoopKeyEnabled": "post_loop_key_enabled",
+    "PostLoopKey": "post_loop_key",
+    "PauseWhenUnfocused": "pause_when_unfocused",
+    "PixelGuard": "pixel_guard_enabled",
+    "Watchers": "watchers_enabled",
+    "Steps": "program",
+    "Targets": "targets",
+    "Order": "target_order",
+    "Seed": "target_seed",
+    "CycleLength": "target_cycle_length",
+}
+
+
+def instance_names(config: ConfigManager) -> list[str]:
+    return [n.strip() for n in config.get("Orchestrator", "Instances", fallback="").split(",") if n.strip()]
+
+
+def instance_settings(config: ConfigManager, name: str, base: MacroSettings | None = None) -> MacroSettings:
+    settings = base if base is not None else MacroSettings.from_config(config)
+    section = f"Instance.{name}"
+    overrides: dict[str, object] = {}
+    for key, field_name in INSTANCE_KEYS.items():
+        if not config.has_option(section, key):
+            continue
+        current = getattr(settings, field_name)
+        if isinstance(current, bool):
+            overrides[field_name] = config.getboolean(section, key, fallback=current)
+        elif isinstance(current, int):
+            overrides[field_name] = config.getint(section, key, fallback=current)
+        else:
+            overrides[field_name] = config.get(section, key, fallback=current)
+    return dataclasses.replace(settings, **overrides)
+
+
+class InputArbiter:
+    # One physical mouse and keyboard: a single instance holds the input at a time, for at least one
+    # pass and until its slice runs out while another instance is waiting. Waiters are served FIFO.
+    def __init__(
+        self,
+        autoit: AutoItBridge,
+        logger: logging.Logger,
+        slice_s: float = 5.0,
+        activate_timeout_s: float = 1.0,
+        clock: Clock | None = None,
+    ):
+        self.autoit = autoit
+        self.logger = logger
+        self.slice_s = max(0.0, float(slice_s))
+        self.activate_timeout_s = max(0.1, float(activate_timeout_s))
+        self.clock = clock or MONOTONIC_CLOCK
+
+        self._cond = threading.Condition()
+        self._holder: InputGate | None = None
+        self._waiting: deque[InputGate] = deque()
+        self._slice_started = 0.0
+        self._active_window = ""
+
+        self.switches = 0
+        self.activations = 0
+        self.activate_failures = 0
+        self.max_activate_ms = 0.0
+        self._activate_ms_total = 0.0
+
+    @property
+    def holder(self) -> str:
+        gate = self._holder
+        return gate.name if gate is not None else ""
+
+    @property
+    def mean_activate_ms(self) -> float:
+        return self._activate_ms_total / self.activations if self.activations else 0.0
+
+    def gate(self, name: str, window: str = "") -> InputGate:
+        return InputGate(self, name, window)
+
+    def wake(self) -> None:
+        with self._cond:
+            self._cond.notify_all()
+
+    def _reserve(self, gate: InputGate) -> None:
+        with self._cond:
+            if self._holder is not gate and gate not in self._waiting:
+                gate._queued_at = self.clock.monotonic()
+                self._waiting.append(gate)
+
+    def _enter(self, gate: InputGate, stop_event: threading.Event) -> bool:
+        with self._cond:
+            if self._holder is gate:
+                return True
+            if gate not in self._waiting:
+                gate._queued_at = self.clock.monotonic()
+                self._waiting.append(gate)
+            while self._holder is not None or self._waiting[0] is not gate:
+                if stop_event.is_set():
+                    self._waiting.remove(gate)
+                    self._cond.notify_all()
+                    return False
+                self._cond.wait()
+            self._waiting.popleft()
+            self._holder = gate
+            now = self.clock.monotonic()
+            self._slice_started = now
+            gate.waited_s += now - gate._queued_at
+            gate.slices += 1
+            self.switches += 1
+            switch_window = bool(gate.window) and gate.window != self._active_window
+        if switch_window:
+            self._activate(gate)
+        return True
+
+    def _activate(self, gate: InputGate) -> None:
+        t0 = time.perf_counter()
+        try:
+            self.autoit.activate_window(gate.window, self.activate_timeout_s)
+        except AutoItBridgeAborted:
+            raise
+        except AutoItBridgeError as e:
+            self.activate_failures += 1
+            self.logger.warning("Could not activate %s for %s: %s", gate.window, gate.name, e)
+            return
+        elapsed = (time.perf_counter() - t0) * 1000.0
+        self._active_window = gate.window
+        self.activations += 1
+        self._activate_ms_total += elapsed
+        if elapsed > self.max_activate_ms:
+            self.max_activate_ms = elapsed
+
+    def _yield(self, gate: InputGate, force: bool) -> None:
+        with self._cond:
+            if self._holder is not gate:
+                if force and gate in self._waiting:
+                    self._waiting.remove(gate)
+                    self._cond.notify_all()
+                return
+            now = self.clock.monotonic()
+            if not force and (not self._waiting or now - self._slice_started < self.slice_s):
+                return
+            gate.held_s += now - self._slice_started
+            self._holder = None
+            self._cond.notify_all()
+
+    def _held_so_far(self, gate: InputGate) -> float:
+        with self._cond:
+            if self._holder is gate:
+                return gate.held_s + self.clock.monotonic() - self._slice_started
+            return gate.held_s
+
+
+class InputGate:
+    def __init__(self, arbiter: InputArbiter, name: str, window: str = ""):
+        self.arbiter = arbiter
+        self.name = name
+        self.window = window
+        self.held_s = 0.0
+        self.waited_s = 0.0
+        self.slices = 0
+        self._queued_at = 0.0
+
+    def reserve(self) -> None:
+        self.arbiter._reserve(self)
+
+    def enter(self, stop_event: threading.Event) -> bool:
+        return self.arbiter._enter(self, stop_event)
+
+    def yield_slice(self, force: bool = False) -> None:
+        self.arbiter._yield(self, force)
+
+    def leave(self) -> None:
+        self.arbiter._yield(self, True)
+
+    def wake(self) -> None:
+        self.arbiter.wake()
+
+    def reset_stats(self) -> None:
+        self.held_s = 0.0
+        self.waited_s = 0.0
+        self.slices = 0
+
+    @property
+    def total_held_s(self) -> float:
+        return self.arbiter._held_so_far(self)
+
+
+@dataclass(frozen=True)
+class InstanceReport:
+    name: str
+    running: bool
+    rotations: int
+    target_loops: int
+    loops_per_min: float
+    clicks_per_hour: float
+    held_s: float
+    waited_s: float
+    slices: int
+
+    @property
+    def input_share(self) -> float:
+        total = self.held_s + self.waited_s
+        return self.held_s / total if total > 0 else 0.0
+
+    def as_text(self) -> str:
+        target = f"/{self.target_loops}" if self.target_loops > 0 else ""
+        return (
+            f"{self.name}: {'running' if self.running else 'idle'} loops={self.rotations}{target} "
+            f"{self.loops_per_min:.1f} loops/min {self.clicks_per_hour:.0f} clicks/h "
+            f"held={self.held_s:.1f}s waited={self.waited_s:.1f}s share={self.input_share:.0%} slices={self.slices}"
+        )
+
+
+@dataclass
+class _Instance:
+    name: str
+    settings: MacroSettings
+    engine: MacroEngine
+    gate: InputGate
+
+
+class Orchestrator:
+    def __init__(self, arbiter: InputArbiter, logger: logging.Logger):
+        self.arbiter = arbiter
+        self.logger = logger
+        self._instances: list[_Instance] = []
+        self._lock = threading.Lock()
+        self._finished = threading.Event()
+
+    @property
+    def names(self) -> list[str]:
+        return [inst.name for inst in self._instances]
+
+    @property
+    def running(self) -> bool:
+        return any(inst.engine.running for inst in self._instances)
+
+    def add(
+        self,
+        name: str,
+        settings: MacroSettings,
+        build_engine: Callable[[MacroSettings, InputGate, Callable[[], None]], MacroEngine],
+        window: str | None = None,
+    ) -> MacroEngine:
+        gate = self.arbiter.gate(name, settings.target_window if window is None else window)
+        engine = build_engine(settings, gate, self._instance_finished)
+        with self._lock:
+            self._instances.append(_Instance(name, settings, engine, gate))
+        return engine
+
+    def engine(self, name: str) -> MacroEngine | None:
+        for inst in self._instances:
+            if inst.name == name:
+                return inst.engine
+        return None
+
+    def _instance_finished(self) -> None:
+        if not self.running:
+            self._finished.set()
+
+    def start_all(self) -> int:
+        self._finished.clear()
+        pending = [inst for inst in self._instances if not inst.engine.running]
+        # Queue every instance up front so the first slices go out in configuration order.
+        for inst in pending:
+            inst.gate.reset_stats()
+            inst.gate.reserve()
+        started = 0
+        for inst in pending:
+            if not inst.engine.start():
+                inst.gate.leave()
+                continue
+            started += 1
+            self.logger.info("Instance %s started (window=%s)", inst.name, inst.gate.window or "-")
+        if not self.running:
+            self._finished.set()
+        return started
+
+    def request_stop(self) -> None:
+        for inst in self._instances:
+            inst.engine.request_stop()
+
+    def emergency_stop(self) -> None:
+        running = self.running
+        self.request_stop()
+        # One abort on the shared bridge cancels whichever instance holds the input.
+        if running:
+            self.arbiter.autoit.abort()
+
+    def pause(self) -> None:
+        for inst in self._instances:
+            inst.engine.pause()
+
+    def resume(self) -> None:
+        for inst in self._instances:
+            inst.engine.resume()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._finished.wait(timeout)
+
+    def shutdown(self, timeout: float | None = 2.0) -> None:
+        for inst in self._instances:
+            inst.engine.shutdown(timeout)
+
+    def report(self) -> list[InstanceReport]:
+        out: list[InstanceReport] = []
+        for inst in self._instances:
+            engine = inst.engine
+            throughput = engine.throughput
+            out.append(
+                InstanceReport(
+                    name=inst.name,
+                    running=engine.running,
+                    rotations=engine.rotation_counter,
+                    target_loops=int(inst.settings.loop_count),
+                    loops_per_min=throughput.rotations_per_min,
+                    clicks_per_hour=throughput.clicks_per_hour,
+                    held_s=inst.gate.total_held_s,
+                    waited_s=inst.gate.waited_s,
+                    slices=inst.gate.slices,
+                )
+            )
+        return out
+
@@ -1,19 +1,13 @@
 from __future__ import annotations
 
-import ctypes
 import logging
-from ctypes import wintypes
 from collections.abc import Callable
 
-
-class _POINT(ctypes.Structure):
-    _fields_ = [("x", wintypes.LONG), ("y", wintypes.LONG)]
+from .cursor import CursorSampler, default_cursor_provider
 
 
 def get_cursor_pos() -> tuple[int, int]:
-    pt = _POINT()
-    ctypes.windll.user32.GetCursorPos(ctypes.byref(pt))
-    return int(pt.x), int(pt.y)
+    return default_cursor_provider().read()
 
 
 class LocationPicker:
@@ -22,22 +16,46 @@ class LocationPicker:
         logger: logging.Logger,
         on_confirm: Callable[[int, int], None],
         on_cancel: Callable[[], None],
+        sampler: CursorSampler | None = None,
+        on_finish: Callable[[list[tuple[int, int]]], None] | None = None,
     ):
         self._logger = logger
         self._on_confirm = on_confirm
         self._on_cancel = on_cancel
+        self._on_finish = on_finish
+        self._sampler = sampler
         self.active = False
+        self.multi = False
+        self.points: list[tuple[int, int]] = []
+
+    @property
+    def sampler(self) -> CursorSampler | None:
+        return self._sampler
 
-    def enter(self) -> None:
+    def enter(self, multi: bool = False) -> None:
+        # Multi mode: each confirm adds a point and picking continues until cancel finishes the list.
         self.active = True
+        self.multi = multi
+        self.points = []
+        if self._sampler is not None:
+            self._sampler.acquire()
         self._logger.trace("PickMode ACTIVE")
 
+    def _leave(self) -> None:
+        self.active = False
+        if self._sampler is not None:
+            self._sampler.release()
+
     def confirm(self) -> None:
         if not self.active:
             return
 
-        x, y = get_cursor_pos()
-        self.active = False
+        x, y = self._sampler.sample_now() if self._sampler is not None else get_cursor_pos()
+        if self.multi:
+            self.points.append((x, y))
+            self._logger.info("Target %s added at (%s, %s)", len(self.points), x, y)
+            return
+        self._leave()
         self._logger.info("Location confirmed at (%s, %s)", x, y)
         self._on_confirm(x, y)
 
@@ -45,6 +63,11 @@ class LocationPicker:
         if not self.active:
             return
 
-        self.active = False
+        self._leave()
+        points = self.points if self.multi else []
+        if points and self._on_finish is not None:
+            self._logger.info("PickMode finished with %s targets", len(points))
+            self._on_finish(list(points))
+            return
         self._logger.info("PickMode CANCELLED")
         self._on_cancel()
@@ -0,0 +1,384 @@
+from __future__ import annotations
+
+import argparse
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from .actions import key_name_to_autoit_send
+from .movement import iter_circle_points
+
+if TYPE_CHECKING:
+    from .engine import MacroSettings
+    from .targets import ClickTarget
+
+
+# Compiled op codes. Each op is a flat tuple whose first element is the code.
+OP_PATH = 0  # (OP_PATH, points, move_speed, step_delay_s, label)
+OP_CLICK = 1  # (OP_CLICK, x, y, button, every, before_s, after_s, guarded)
+OP_KEY = 2  # (OP_KEY, send_text, key_name)
+OP_HOLD = 3  # (OP_HOLD, down_text, up_text, seconds, key_name)
+OP_WAIT = 4  # (OP_WAIT, seconds)
+OP_REPEAT = 5  # (OP_REPEAT, slot, count, end_pc)
+OP_NEXT = 6  # (OP_NEXT, slot, body_pc)
+OP_BRANCH = 7  # (OP_BRANCH, watcher_name, else_pc)
+OP_JUMP = 8  # (OP_JUMP, target_pc)
+
+OP_NAMES = ("path", "click", "key", "hold", "wait", "repeat", "next", "branch", "jump")
+
+STEP_KINDS = ("circle", "path", "click", "key", "hold", "wait", "repeat", "if")
+STEP_OPTIONS = {
+    "circle": ("radius", "step", "speed", "delay", "direction"),
+    "path": ("speed", "delay"),
+    "click": ("button", "every", "before", "after"),
+}
+BUTTONS = ("left", "right", "middle")
+
+
+@dataclass(frozen=True)
+class Step:
+    kind: str
+    args: tuple[str, ...] = ()
+    options: tuple[tuple[str, str], ...] = ()
+    body: tuple[Step, ...] = ()
+    orelse: tuple[Step, ...] = ()
+    line: int = 0
+
+    def option(self, name: str, default: str | None = None) -> str | None:
+        for key, value in self.options:
+            if key == name:
+                return value
+        return default
+
+
+@dataclass(frozen=True)
+class Plan:
+    ops: tuple[tuple, ...]
+    slots: int = 0
+    watchers: tuple[str, ...] = ()
+    source: str = field(default="", compare=False)
+
+    def describe(self) -> list[str]:
+        out: list[str] = []
+        for pc, op in enumerate(self.ops):
+            args = list(op[1:])
+            if op[0] == OP_PATH:
+                args[0] = f"<{len(op[1])} points>"
+            out.append(f"{pc:4d}  {OP_NAMES[op[0]]:<7} {' '.join(str(a) for a in args)}")
+        return out
+
+
+def _tokenize(text: str) -> list[tuple[str, int]]:
+    tokens: list[tuple[str, int]] = []
+    buf: list[str] = []
+    line = 1
+    comment = False
+
+    def _emit() -> None:
+        stmt = "".join(buf).strip()
+        buf.clear()
+        if stmt:
+            tokens.append((stmt, line))
+
+    for ch in text or "":
+        if comment:
+            if ch == "\n":
+                comment = False
+            else:
+                continue
+        if ch == "#":
+            comment = True
+            continue
+        if ch in ";\n":
+            _emit()
+            if ch == "\n":
+                line += 1
+        elif ch in "{}":
+            _emit()
+            tokens.append((ch, line))
+        else:
+            buf.append(ch)
+    _emit()
+    return tokens
+
+
+def _parse_statement(stmt: str, line: int) -> Step:
+    words = stmt.split()
+    kind = words[0].lower()
+    if kind not in STEP_KINDS:
+        raise ValueError(f"Line {line}: unknown step {words[0]!r}")
+    args: list[str] = []
+    options: list[tuple[str, str]] = []
+    for word in words[1:]:
+        key, sep, value = word.partition("=")
+        if sep:
+            options.append((key.lower(), value))
+        else:
+            args.append(word)
+    return Step(kind, tuple(args), tuple(options), line=line)
+
+
+def _parse_block(tokens: list[tuple[str, int]], i: int, nested: bool) -> tuple[list[Step], int]:
+    steps: list[Step] = []
+    while i < len(tokens):
+        tok, line = tokens[i]
+        if tok == "}":
+            if not nested:
+                raise ValueError(f"Line {line}: unexpected '}}'")
+            return steps, i + 1
+        if tok == "{":
+            raise ValueError(f"Line {line}: '{{' must follow 'repeat N' or 'if watcher NAME'")
+
+        step = _parse_statement(tok, line)
+        i += 1
+        if step.kind in ("repeat", "if"):
+            if i >= len(tokens) or tokens[i][0] != "{":
+                raise ValueError(f"Line {line}: expected '{{' after {tok!r}")
+            body, i = _parse_block(tokens, i + 1, nested=True)
+            orelse: list[Step] = []
+            if step.kind == "if" and i < len(tokens) and tokens[i][0].lower() == "else":
+                if i + 1 >= len(tokens) or tokens[i + 1][0] != "{":
+                    raise ValueError(f"Line {tokens[i][1]}: expected '{{' after 'else'")
+                orelse, i = _parse_block(tokens, i + 2, nested=True)
+            step = Step(step.kind, step.args, step.options, tuple(body), tuple(orelse), line)
+        _validate(step)
+        steps.append(step)
+    if nested:
+        raise ValueError("Missing '}' at end of program")
+    return steps, i
+
+
+def _int(value: str, line: int, what: str) -> int:
+    try:
+        return int(float(value))
+    except ValueError:
+        raise ValueError(f"Line {line}: {what} must be a number, got {value!r}") from None
+
+
+def _point(value: str, line: int) -> tuple[int, int]:
+    parts = [p.strip() for p in value.split(",")]
+    if len(parts) != 2:
+        raise ValueError(f"Line {line}: expected x,y, got {value!r}")
+    return _int(parts[0], line, "x"), _int(parts[1], line, "y")
+
+
+def _validate(step: Step) -> None:
+    line = step.line
+    kind = step.kind
+    allowed = STEP_OPTIONS.get(kind, ())
+    for key, _value in step.options:
+        if key not in allowed:
+            raise ValueError(f"Line {line}: unknown option '{key}' for '{kind}'")
+    if kind == "path" and not step.args:
+        raise ValueError(f"Line {line}: 'path' needs at least one x,y point")
+    if kind in ("key", "hold") and not step.args:
+        raise ValueError(f"Line {line}: '{kind}' needs a key name")
+    if kind == "hold" and len(step.args) < 2:
+        raise ValueError(f"Line {line}: expected 'hold NAME ms'")
+    if kind == "wait" and len(step.args) != 1:
+        raise ValueError(f"Line {line}: expected 'wait ms'")
+    if kind == "repeat" and len(step.args) != 1:
+        raise ValueError(f"Line {line}: expected 'repeat N {{ ... }}'")
+    if kind == "if" and (len(step.args) != 2 or step.args[0].lower() != "watcher"):
+        raise ValueError(f"Line {line}: expected 'if watcher NAME {{ ... }}'")
+    if kind == "click":
+        if len(step.args) > 1:
+            raise ValueError(f"Line {line}: expected 'click [x,y] [button=..] [every=N]'")
+        if step.option("button", "left") not in BUTTONS:
+            raise ValueError(f"Line {line}: button must be one of {', '.join(BUTTONS)}")
+    for arg in step.args if kind in ("path", "click") else ():
+        _point(arg, line)
+    if (step.option("direction") or "cw").lower() not in ("cw", "ccw"):
+        raise ValueError(f"Line {line}: direction must be cw or ccw")
+    for key, value in step.options:
+        if key != "button" and key != "direction":
+            _int(value, line, key)
+
+
+def parse_program(text: str) -> list[Step]:
+    steps, _ = _parse_block(_tokenize(text), 0, nested=False)
+    return steps
+
+
+def default_program(settings: MacroSettings) -> list[Step]:
+    # The fixed loop from before programs existed: circle, every-N center click, optional key, delay.
+    click = Step(
+        "click",
+        options=(
+            ("every", str(max(1, int(settings.center_click_every)))),
+            ("before", str(int(settings.before_click_delay_ms))),
+            ("after", str(int(settings.after_click_delay_ms))),
+        ),
+    )
+    steps = [Step("circle"), click]
+    if settings.post_loop_key_enabled:
+        steps.append(Step("key", (settings.post_loop_key,)))
+    steps.append(Step("wait", (str(int(settings.per_loop_delay_ms)),)))
+    return steps
+
+
+class _Compiler:
+    def __init__(self, settings: MacroSettings, target: ClickTarget | None = None, guard_center: bool = True):
+        self.settings = settings
+        self.guard_center = guard_center
+        self.target = target
+        if target is not None:
+            self.base = (int(target.x), int(target.y))
+        elif settings.target_window:
+            self.base = (int(settings.window_x), int(settings.window_y))
+        else:
+            self.base = (int(settings.click_x), int(settings.click_y))
+        self.ops: list[tuple] = []
+        self.slots = 0
+        self.watchers: list[str] = []
+
+    def _opt(self, step: Step, name: str, default: int) -> int:
+        value = step.option(name)
+        return _int(value, step.line, name) if value is not None else int(default)
+
+    def _ms(self, step: Step, name: str, default: int) -> float:
+        return max(0, self._opt(step, name, default)) / 1000.0
+
+    def click(self, step: Step) -> None:
+        # A bare `click` hits the center; the current target's delay_ms adds to its after-click delay.
+        center = not step.args
+        x, y = self.base if center else _point(step.args[0], step.line)
+        extra_ms = self.target.delay_ms if center and self.target is not None else 0
+        self.ops.append(
+            (
+                OP_CLICK,
+                x,
+                y,
+                step.option("button", "left"),
+                max(1, self._opt(step, "every", 1)),
+                self._ms(step, "before", 0),
+                self._ms(step, "after", 0) + extra_ms / 1000.0,
+                center and self.guard_center,
+            )
+        )
+
+    def repeat(self, count: int, body: Callable[[], None]) -> None:
+        slot = self.slots
+        self.slots += 1
+        start = len(self.ops)
+        self.ops.append((OP_REPEAT, slot, count, -1))
+        body()
+        self.ops.append((OP_NEXT, slot, start + 1))
+        self.ops[start] = (OP_REPEAT, slot, count, len(self.ops))
+
+    def emit(self, steps: list[Step] | tuple[Step, ...]) -> None:
+        s = self.settings
+        for step in steps:
+            kind = step.kind
+            if kind == "circle":
+                radius = self._opt(step, "radius", s.radius)
+                spin = self._opt(step, "step", s.spin_speed)
+                direction = (step.option("direction") or ("cw" if s.clockwise else "ccw")).lower()
+                bx, by = self.base
+                points = tuple((x, y) for _a, x, y in iter_circle_points(bx, by, radius, spin, direction != "ccw"))
+                self.ops.append(
+                    (
+                        OP_PATH,
+                        points,
+                        self._opt(step, "speed", s.move_speed),
+                        self._ms(step, "delay", s.step_delay_ms),
+                        f"circle r={radius} step={spin}",
+                    )
+                )
+            elif kind == "path":
+                points = tuple(_point(a, step.line) for a in step.args)
+                self.ops.append(
+                    (
+                        OP_PATH,
+                        points,
+                        self._opt(step, "speed", s.move_speed),
+                        self._ms(step, "delay", s.step_delay_ms),
+                        f"path n={len(points)}",
+                    )
+                )
+            elif kind == "click":
+                target = self.target if not step.args else None
+                if target is not None and target.clicks > 1:
+                    self.repeat(target.clicks, lambda step=step: self.click(step))
+                else:
+                    self.click(step)
+            elif kind == "key":
+                name = step.args[0]
+                self.ops.append((OP_KEY, key_name_to_autoit_send(name), name))
+            elif kind == "hold":
+                name = step.args[0]
+                # AutoIt hold syntax: {a down} / {SPACE down}.
+                send = name.lower() if len(name) == 1 else name.upper()
+                seconds = max(0, _int(step.args[1], step.line, "hold time")) / 1000.0
+                self.ops.append((OP_HOLD, "{" + send + " down}", "{" + send + " up}", seconds, name))
+            elif kind == "wait":
+                seconds = max(0, _int(step.args[0], step.line, "wait time")) / 1000.0
+                if seconds > 0:
+                    self.ops.append((OP_WAIT, seconds))
+            elif kind == "repeat":
+                self.repeat(_int(step.args[0], step.line, "repeat count"), lambda step=step: self.emit(step.body))
+            elif kind == "if":
+                name = step.args[1]
+                if name not in self.watchers:
+                    self.watchers.append(name)
+                branch = len(self.ops)
+                self.ops.append((OP_BRANCH, name, -1))
+                self.emit(step.body)
+                if step.orelse:
+                    jump = len(self.ops)
+                    self.ops.append((OP_JUMP, -1))
+                    self.ops[branch] = (OP_BRANCH, name, len(self.ops))
+                    self.emit(step.orelse)
+                    self.ops[jump] = (OP_JUMP, len(self.ops))
+                else:
+                    self.ops[branch] = (OP_BRANCH, name, len(self.ops))
+
+
+def compile_program(
+    settings: MacroSettings,
+    text: str | None = None,
+    target: ClickTarget | None = None,
+    guard_center: bool = True,
+) -> Plan:
+    # With a target, the program's center (circle and bare `click`) is that target instead of the click location,
+    # and every bare `click` takes the target's click count and delay.
+    source = settings.program if text is None else text
+    steps = parse_program(source) if (source or "").strip() else default_program(settings)
+    compiler = _Compiler(settings, target, guard_center)
+    compiler.emit(steps)
+    return Plan(tuple(compiler.ops), compiler.slots, tuple(compiler.watchers), source or "")
+
+
+def main(argv: list[str] | None = None) -> int:
+    from .bootstrap import CONFIG_PATH
+    from .config_manager import ConfigManager
+    from .engine import MacroSettings
+
+    parser = argparse.ArgumentParser(
+        prog="python -m app.program",
+        description="Validate the [Program] Steps in a config and print the compiled plan.",
+    )
+    parser.add_argument("--config", default=str(CONFIG_PATH))
+    parser.add_argument("--program", default=None, help="Program text to compile instead of [Program] Steps")
+    args = parser.parse_args(argv)
+
+    settings = MacroSettings.from_config(ConfigManager(Path(args.config)))
+    t0 = time.perf_counter()
+    try:
+        plan = compile_program(settings, args.program)
+    except ValueError as e:
+        print(f"Invalid program: {e}")
+        return 1
+    elapsed = (time.perf_counter() - t0) * 1000.0
+
+    for row in plan.describe():
+        print(row)
+    label = "default" if not plan.source.strip() else "custom"
+    print(f"program={label} ops={len(plan.ops)} loops={plan.slots} watchers={','.join(plan.watchers) or '-'} compile={elapsed:.3f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,488 @@
+from __future__ import annotations
+
+import argparse
+import ctypes
+import math
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import deque
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Protocol
+
+from .actions import key_name_to_autoit_send
+from .clock import MONOTONIC_CLOCK, Clock, VirtualClock
+from .cursor import CursorProvider
+
+# File layout: MAGIC, VERSION, then one record per event. Each record starts with a varint
+# holding (delta_us << 2) | op; positions are zigzag varint deltas from the previous event.
+MAGIC = b"MREC"
+VERSION = 1
+
+OP_MOVE = 0
+OP_CLICK = 1
+OP_KEY = 2
+
+BUTTONS = ("left", "right", "middle")
+
+
+@dataclass(frozen=True, slots=True)
+class InputEvent:
+    t: float
+    op: str
+    x: int = 0
+    y: int = 0
+    value: str = ""
+
+
+def _zigzag(n: int) -> int:
+    return (n << 1) ^ (n >> 63)
+
+
+def _unzigzag(n: int) -> int:
+    return (n >> 1) ^ -(n & 1)
+
+
+def _put_varint(buf: bytearray, n: int) -> None:
+    while n >= 0x80:
+        buf.append((n & 0x7F) | 0x80)
+        n >>= 7
+    buf.append(n)
+
+
+class RecordingWriter:
+    def __init__(self, path: Path, flush_bytes: int = 64 * 1024):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._f: BinaryIO | None = self.path.open("wb")
+        self._flush_bytes = max(256, int(flush_bytes))
+        self._buf = bytearray(MAGIC)
+        self._buf.append(VERSION)
+        self._last_us = 0
+        self._x = 0
+        self._y = 0
+        self.events = 0
+        self.bytes_written = 0
+
+    def __enter__(self) -> RecordingWriter:
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.close()
+
+    def _head(self, t: float, op: int) -> None:
+        t_us = max(self._last_us, int(round(t * 1_000_000)))
+        _put_varint(self._buf, ((t_us - self._last_us) << 2) | op)
+        self._last_us = t_us
+
+    def _position(self, x: int, y: int) -> None:
+        _put_varint(self._buf, _zigzag(x - self._x))
+        _put_varint(self._buf, _zigzag(y - self._y))
+        self._x = x
+        self._y = y
+
+    def _written(self) -> None:
+        self.events += 1
+        if len(self._buf) >= self._flush_bytes:
+            self.flush()
+
+    def move(self, t: float, x: int, y: int) -> None:
+        self._head(t, OP_MOVE)
+        self._position(int(x), int(y))
+        self._written()
+
+    def click(self, t: float, x: int, y: int, button: str = "left") -> None:
+        self._head(t, OP_CLICK)
+        self._buf.append(BUTTONS.index(button) if button in BUTTONS else 0)
+        self._position(int(x), int(y))
+        self._written()
+
+    def key(self, t: float, name: str) -> None:
+        data = name.encode("utf-8")
+        self._head(t, OP_KEY)
+        _put_varint(self._buf, len(data))
+        self._buf += data
+        self._written()
+
+    def flush(self) -> None:
+        f = self._f
+        if f is None or not self._buf:
+            return
+        f.write(self._buf)
+        self.bytes_written += len(self._buf)
+        self._buf.clear()
+
+    def close(self) -> None:
+        if self._f is None:
+            return
+        self.flush()
+        self._f.close()
+        self._f = None
+
+
+class _ChunkReader:
+    def __init__(self, f: BinaryIO, chunk_size: int):
+        self._f = f
+        self._chunk = max(64, int(chunk_size))
+        self._buf = b""
+        self._pos = 0
+
+    def _fill(self, n: int) -> bool:
+        if len(self._buf) - self._pos >= n:
+            return True
+        data = self._f.read(max(self._chunk, n))
+        self._buf = self._buf[self._pos :] + data
+        self._pos = 0
+        return len(self._buf) >= n
+
+    def at_eof(self) -> bool:
+        return not self._fill(1)
+
+    def varint(self) -> int:
+        buf, pos = self._buf, self._pos
+        result = 0
+        shift = 0
+        while True:
+            if pos >= len(buf):
+                self._pos = pos
+                if not self._fill(1):
+                    raise EOFError("Truncated recording")
+                buf, pos = self._buf, self._pos
+            b = buf[pos]
+            pos += 1
+            result |= (b & 0x7F) << shift
+            if b < 0x80:
+                self._pos = pos
+                return result
+            shift += 7
+
+    def read(self, n: int) -> bytes:
+        if not self._fill(n):
+            raise EOFError("Truncated recording")
+        out = self._buf[self._pos : self._pos + n]
+        self._pos += n
+        return out
+
+
+def iter_recording(path: Path, chunk_size: int = 64 * 1024) -> Iterator[InputEvent]:
+    # Streams from disk in fixed-size chunks; memory use does not grow with recording length.
+    with Path(path).open("rb") as f:
+        header = f.read(len(MAGIC) + 1)
+        if header[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"Not an input recording: {path}")
+        if header[len(MAGIC)] != VERSION:
+            raise ValueError(f"Unsupported recording version {header[len(MAGIC)]}: {path}")
+
+        reader = _ChunkReader(f, chunk_size)
+        t_us = 0
+        x = 0
+        y = 0
+        while not reader.at_eof():
+            head = reader.varint()
+            op = head & 0x3
+            t_us += head >> 2
+            if op == OP_KEY:
+                name = reader.read(reader.varint()).decode("utf-8", "replace")
+                yield InputEvent(t_us / 1_000_000, "key", x, y, name)
+                continue
+            button = reader.read(1)[0] if op == OP_CLICK else 0
+            x += _unzigzag(reader.varint())
+            y += _unzigzag(reader.varint())
+            if op == OP_MOVE:
+                yield InputEvent(t_us / 1_000_000, "move", x, y)
+            elif op == OP_CLICK:
+                yield InputEvent(t_us / 1_000_000, "click", x, y, BUTTONS[button] if button < len(BUTTONS) else "left")
+            else:
+                raise ValueError(f"Unknown record type {op} in {path}")
+
+
+class InputBackend(Protocol):
+    def mouse_move(self, x: int, y: int, speed: int) -> None: ...
+
+    def mouse_click(self, x: int, y: int, button: str = "left", clicks: int = 1, speed: int = 0) -> None: ...
+
+    def send_key(self, send_text: str) -> None: ...
+
+
+@dataclass
+class PlaybackStats:
+    events: int = 0
+    skipped_moves: int = 0
+    duration_s: float = 0.0
+    total_late_ms: float = 0.0
+    max_late_ms: float = 0.0
+    stopped: bool = False
+
+    @property
+    def mean_late_ms(self) -> float:
+        played = self.events - self.skipped_moves
+        return self.total_late_ms / played if played > 0 else 0.0
+
+
+class RecordingPlayer:
+    def __init__(
+        self,
+        backend: InputBackend,
+        path: Path,
+        speed: float = 1.0,
+        max_lag_ms: float = 50.0,
+        clock: Clock | None = None,
+    ):
+        self.backend = backend
+        self.path = Path(path)
+        self.speed = max(0.01, float(speed))
+        self.max_lag_ms = max(0.0, float(max_lag_ms))
+        self.clock = clock or MONOTONIC_CLOCK
+
+    def play(
+        self,
+        stop_event: threading.Event | None = None,
+        on_event: Callable[[InputEvent], None] | None = None,
+    ) -> PlaybackStats:
+        stop_event = stop_event or threading.Event()
+        clock = self.clock
+        backend = self.backend
+        speed = self.speed
+        max_lag = self.max_lag_ms
+        stats = PlaybackStats()
+        started = clock.monotonic()
+
+        for ev in iter_recording(self.path):
+            # Deadlines are absolute from the start, so per-command latency does not accumulate as drift.
+            delay = started + ev.t / speed - clock.monotonic()
+            if delay > 0 and clock.wait(stop_event, delay):
+                stats.stopped = True
+                break
+            if stop_event.is_set():
+                stats.stopped = True
+                break
+
+            stats.events += 1
+            late_ms = -delay * 1000.0 if delay < 0 else 0.0
+            if ev.op == "move" and late_ms > max_lag:
+                # A later move supersedes this one; dropping it lets playback catch up.
+                stats.skipped_moves += 1
+                continue
+            stats.total_late_ms += late_ms
+            if late_ms > stats.max_late_ms:
+                stats.max_late_ms = late_ms
+
+            if ev.op == "move":
+                backend.mouse_move(ev.x, ev.y, 0)
+            elif ev.op == "click":
+                backend.mouse_click(ev.x, ev.y, ev.value or "left")
+            elif ev.op == "key":
+                backend.send_key(key_name_to_autoit_send(ev.value))
+            if on_event is not None:
+                on_event(ev)
+
+        stats.duration_s = clock.monotonic() - started
+        return stats
+
+
+class ButtonProvider(Protocol):
+    def pressed(self) -> tuple[bool, bool, bool]: ...
+
+
+class Win32ButtonProvider:
+    _VKS = (0x01, 0x02, 0x04)  # VK_LBUTTON, VK_RBUTTON, VK_MBUTTON
+
+    def __init__(self):
+        try:
+            fn = ctypes.windll.user32.GetAsyncKeyState  # type: ignore[attr-defined]
+        except Exception as e:
+            raise RuntimeError("Win32 button provider requires Windows (user32.GetAsyncKeyState)") from e
+        fn.argtypes = [ctypes.c_int]
+        fn.restype = ctypes.c_short
+        self._fn = fn
+
+    def pressed(self) -> tuple[bool, bool, bool]:
+        fn = self._fn
+        return bool(fn(0x01) & 0x8000), bool(fn(0x02) & 0x8000), bool(fn(0x04) & 0x8000)
+
+
+class InputRecorder:
+    def __init__(
+        self,
+        writer: RecordingWriter,
+        cursor: CursorProvider,
+        buttons: ButtonProvider | None = None,
+        rate_hz: float = 120.0,
+        record_keys: bool = True,
+        ignore_keys: tuple[str, ...] = (),
+    ):
+        self.writer = writer
+        self._cursor = cursor
+        self._buttons = buttons
+        self._interval = 1.0 / max(1.0, float(rate_hz))
+        self._record_keys = record_keys
+        self._ignore = {k.strip().lower() for k in ignore_keys}
+
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._keys: deque[tuple[float, str]] = deque()
+        self._hook: object | None = None
+        self._keyboard = None
+        self._t0 = 0.0
+
+        self.samples = 0
+        self.late_samples = 0
+
+    @property
+    def running(self) -> bool:
+        t = self._thread
+        return t is not None and t.is_alive()
+
+    def _on_key(self, event: object) -> None:
+        # keyboard hook thread: queue only; the sampler thread owns the writer.
+        name = str(getattr(event, "name", "") or "")
+        if name and name.lower() not in self._ignore:
+            self._keys.append((time.perf_counter(), name))
+
+    def start(self) -> None:
+        with self._lock:
+            if self.running:
+                return
+            self._stop_event = threading.Event()
+            self._t0 = time.perf_counter()
+            if self._record_keys:
+                try:
+                    import keyboard
+
+                    self._keyboard = keyboard
+                    self._hook = keyboard.on_press(self._on_key)
+                except Exception:
+                    self._keyboard = None
+                    self._hook = None
+            self._thread = threading.Thread(target=self._run, name="input-recorder", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        with self._lock:
+            self._stop_event.set()
+            t = self._thread
+            if self._keyboard is not None and self._hook is not None:
+                try:
+                    self._keyboard.unhook(self._hook)
+                except Exception:
+                    pass
+            self._hook = None
+        if t is not None:
+            t.join(timeout=1.0)
+        self.writer.flush()
+
+    def _drain_keys(self) -> None:
+        keys = self._keys
+        while keys:
+            t, name = keys.popleft()
+            self.writer.key(t - self._t0, name)
+
+    def _run(self) -> None:
+        stop_event = self._stop_event
+        writer = self.writer
+        last_pos: tuple[int, int] | None = None
+        last_buttons = (False, False, False)
+        next_tick = time.perf_counter()
+        while not stop_event.is_set():
+            try:
+                self._drain_keys()
+                pos = self._cursor.read()
+                t = time.perf_counter() - self._t0
+                if pos != last_pos:
+                    writer.move(t, pos[0], pos[1])
+                    last_pos = pos
+                if self._buttons is not None:
+                    state = self._buttons.pressed()
+                    for i, down in enumerate(state):
+                        if down and not last_buttons[i]:
+                            writer.click(t, pos[0], pos[1], BUTTONS[i])
+                    last_buttons = state
+                self.samples += 1
+            except Exception:
+                pass
+            next_tick += self._interval
+            delay = next_tick - time.perf_counter()
+            if delay < 0:
+                self.late_samples += 1
+                next_tick = time.perf_counter()
+                delay = 0.0
+            stop_event.wait(delay)
+        try:
+            self._drain_keys()
+        except Exception:
+            pass
+
+
+class _NullBackend:
+    def mouse_move(self, x: int, y: int, speed: int) -> None:
+        pass
+
+    def mouse_click(self, x: int, y: int, button: str = "left", clicks: int = 1, speed: int = 0) -> None:
+        pass
+
+    def send_key(self, send_text: str) -> None:
+        pass
+
+
+def write_synthetic(path: Path, seconds: float, rate_hz: float = 120.0) -> RecordingWriter:
+    # A circle traced at rate_hz with a click every second and a key every ten seconds.
+    with RecordingWriter(path) as writer:
+        step = 1.0 / rate_hz
+        n = int(seconds * rate_hz)
+        for i in range(n):
+            t = i * step
+            angle = t * 2.0 * math.pi
+            x = 960 + int(round(40 * math.cos(angle)))
+            y = 540 + int(round(40 * math.sin(angle)))
+            writer.move(t, x, y)
+            if i % int(rate_hz) == 0:
+                writer.click(t, x, y)
+            if i % int(rate_hz * 10) == 0:
+                writer.key(t, "space")
+    return writer
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.recording",
+        description="Measure recording size, streaming decode speed and replay scheduling on synthetic input.",
+    )
+    parser.add_argument("--hours", type=float, default=1.0)
+    parser.add_argument("--rate", type=float, default=120.0, help="Mouse samples per second")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "synthetic.mrec"
+        t0 = time.perf_counter()
+        writer = write_synthetic(path, args.hours * 3600.0, args.rate)
+        write_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        decoded = sum(1 for _ in iter_recording(path))
+        decode_s = time.perf_counter() - t0
+
+        tracemalloc.start()
+        for _ in iter_recording(path):
+            pass
+        _cur, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        # Replay on a virtual clock: exercises the scheduler without real waits.
+        stats = RecordingPlayer(_NullBackend(), path, clock=VirtualClock()).play()
+
+    size = writer.bytes_written
+    print(
+        f"events={writer.events} size={size / 1024:.0f}KiB ({size / max(1, writer.events):.2f} B/event) "
+        f"write={writer.events / max(write_s, 1e-9) / 1e6:.2f}M ev/s "
+        f"decode={decoded / max(decode_s, 1e-9) / 1e6:.2f}M ev/s peak_decode_mem={peak / 1024:.0f}KiB "
+        f"replay_events={stats.events} replay_duration={stats.duration_s:.0f}s max_late={stats.max_late_ms:.3f}ms"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
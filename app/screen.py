@@ -0,0 +1,416 @@
+from __future__ import annotations
+
+import argparse
+import ctypes
+import threading
+import time
+from collections.abc import Callable
+from ctypes import wintypes
+from typing import Protocol
+
+try:
+    import numpy as np
+except Exception:  # pragma: no cover - optional dependency
+    np = None  # type: ignore[assignment]
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise RuntimeError("The 'numpy' package is required. Install it with: pip install numpy")
+
+
+class ScreenSource(Protocol):
+    # grab() returns an (height, width, 3) uint8 RGB array. It may be a view into a buffer
+    # that the next grab() overwrites; copy it if it has to outlive the call.
+    def grab(self, x: int, y: int, width: int, height: int) -> np.ndarray: ...
+
+    def bounds(self) -> tuple[int, int, int, int]: ...
+
+
+class SyntheticScreenSource:
+    def __init__(self, width: int = 1920, height: int = 1080, color: tuple[int, int, int] = (0, 0, 0)):
+        _require_numpy()
+        self._lock = threading.Lock()
+        self._frame = np.empty((int(height), int(width), 3), dtype=np.uint8)
+        self._frame[:] = color
+        self.grabs = 0
+
+    @property
+    def frame(self) -> np.ndarray:
+        return self._frame
+
+    def set_frame(self, frame: np.ndarray) -> None:
+        arr = np.ascontiguousarray(frame, dtype=np.uint8)
+        if arr.ndim != 3 or arr.shape[2] != 3:
+            raise ValueError(f"Expected an (h, w, 3) frame, got {arr.shape}")
+        with self._lock:
+            self._frame = arr
+
+    def fill_rect(self, x: int, y: int, width: int, height: int, color: tuple[int, int, int]) -> None:
+        with self._lock:
+            self._frame[max(0, y) : max(0, y + height), max(0, x) : max(0, x + width)] = color
+
+    def bounds(self) -> tuple[int, int, int, int]:
+        fh, fw = self._frame.shape[:2]
+        return 0, 0, fw, fh
+
+    def grab(self, x: int, y: int, width: int, height: int) -> np.ndarray:
+        self.grabs += 1
+        frame = self._frame
+        fh, fw = frame.shape[:2]
+        if 0 <= x and 0 <= y and x + width <= fw and y + height <= fh:
+            return frame[y : y + height, x : x + width]
+
+        out = np.zeros((height, width, 3), dtype=np.uint8)
+        x0, y0 = max(0, x), max(0, y)
+        x1, y1 = min(fw, x + width), min(fh, y + height)
+        if x0 < x1 and y0 < y1:
+            out[y0 - y : y1 - y, x0 - x : x1 - x] = frame[y0:y1, x0:x1]
+        return out
+
+
+class GeneratedScreenSource(SyntheticScreenSource):
+    # Renders a new frame before every grab; the default pattern is a scrolling gradient.
+    def __init__(
+        self,
+        width: int = 1920,
+        height: int = 1080,
+        generator: Callable[[int, np.ndarray], None] | None = None,
+    ):
+        super().__init__(width, height)
+        self._generator = generator or _scrolling_gradient
+        self.frame_index = 0
+
+    def grab(self, x: int, y: int, width: int, height: int) -> np.ndarray:
+        with self._lock:
+            self._generator(self.frame_index, self._frame)
+            self.frame_index += 1
+        return super().grab(x, y, width, height)
+
+
+def _scrolling_gradient(index: int, frame: np.ndarray) -> None:
+    h, w = frame.shape[:2]
+    cols = (np.arange(w, dtype=np.uint16) + index * 4) & 0xFF
+    rows = (np.arange(h, dtype=np.uint16) + index) & 0xFF
+    frame[:, :, 0] = cols[None, :]
+    frame[:, :, 1] = rows[:, None]
+    frame[:, :, 2] = index & 0xFF
+
+
+class _BITMAPINFOHEADER(ctypes.Structure):
+    _fields_ = [
+        ("biSize", wintypes.DWORD),
+        ("biWidth", wintypes.LONG),
+        ("biHeight", wintypes.LONG),
+        ("biPlanes", wintypes.WORD),
+        ("biBitCount", wintypes.WORD),
+        ("biCompression", wintypes.DWORD),
+        ("biSizeImage", wintypes.DWORD),
+        ("biXPelsPerMeter", wintypes.LONG),
+        ("biYPelsPerMeter", wintypes.LONG),
+        ("biClrUsed", wintypes.DWORD),
+        ("biClrImportant", wintypes.DWORD),
+    ]
+
+
+class _BITMAPINFO(ctypes.Structure):
+    _fields_ = [("bmiHeader", _BITMAPINFOHEADER), ("bmiColors", wintypes.DWORD * 3)]
+
+
+_SRCCOPY = 0x00CC0020
+_DIB_RGB_COLORS = 0
+_SM_XVIRTUALSCREEN = 76
+_SM_YVIRTUALSCREEN = 77
+_SM_CXVIRTUALSCREEN = 78
+_SM_CYVIRTUALSCREEN = 79
+
+
+class _GdiSurface:
+    __slots__ = ("width", "height", "dc", "bitmap", "old", "info", "buffer", "pixels")
+
+    def __init__(self, gdi32, screen_dc, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.dc = gdi32.CreateCompatibleDC(screen_dc)
+        self.bitmap = gdi32.CreateCompatibleBitmap(screen_dc, width, height)
+        self.old = gdi32.SelectObject(self.dc, self.bitmap)
+
+        self.info = _BITMAPINFO()
+        hdr = self.info.bmiHeader
+        hdr.biSize = ctypes.sizeof(_BITMAPINFOHEADER)
+        hdr.biWidth = width
+        hdr.biHeight = -height  # top-down rows
+        hdr.biPlanes = 1
+        hdr.biBitCount = 32
+
+        self.buffer = (ctypes.c_ubyte * (width * height * 4))()
+        # BGRA in memory; the reversed channel slice is an RGB view without a copy.
+        self.pixels = np.frombuffer(self.buffer, dtype=np.uint8).reshape(height, width, 4)[:, :, 2::-1]
+
+    def close(self, gdi32) -> None:
+        try:
+            gdi32.SelectObject(self.dc, self.old)
+            gdi32.DeleteObject(self.bitmap)
+            gdi32.DeleteDC(self.dc)
+        except Exception:
+            pass
+
+
+class Win32ScreenSource:
+    def __init__(self, max_surfaces: int = 4):
+        _require_numpy()
+        try:
+            user32 = ctypes.windll.user32  # type: ignore[attr-defined]
+            gdi32 = ctypes.windll.gdi32  # type: ignore[attr-defined]
+        except Exception as e:
+            raise RuntimeError("Win32 screen source requires Windows (user32/gdi32)") from e
+
+        user32.GetDC.argtypes = [wintypes.HWND]
+        user32.GetDC.restype = wintypes.HDC
+        user32.ReleaseDC.argtypes = [wintypes.HWND, wintypes.HDC]
+        user32.GetSystemMetrics.argtypes = [ctypes.c_int]
+        user32.GetSystemMetrics.restype = ctypes.c_int
+        gdi32.CreateCompatibleDC.argtypes = [wintypes.HDC]
+        gdi32.CreateCompatibleDC.restype = wintypes.HDC
+        gdi32.CreateCompatibleBitmap.argtypes = [wintypes.HDC, ctypes.c_int, ctypes.c_int]
+        gdi32.CreateCompatibleBitmap.restype = wintypes.HBITMAP
+        gdi32.SelectObject.argtypes = [wintypes.HDC, wintypes.HGDIOBJ]
+        gdi32.SelectObject.restype = wintypes.HGDIOBJ
+        gdi32.DeleteObject.argtypes = [wintypes.HGDIOBJ]
+        gdi32.DeleteDC.argtypes = [wintypes.HDC]
+        gdi32.BitBlt.argtypes = [
+            wintypes.HDC,
+            ctypes.c_int,
+            ctypes.c_int,
+            ctypes.c_int,
+            ctypes.c_int,
+            wintypes.HDC,
+            ctypes.c_int,
+            ctypes.c_int,
+            wintypes.DWORD,
+        ]
+        gdi32.BitBlt.restype = wintypes.BOOL
+        gdi32.GetDIBits.argtypes = [
+            wintypes.HDC,
+            wintypes.HBITMAP,
+            wintypes.UINT,
+            wintypes.UINT,
+            ctypes.c_void_p,
+            ctypes.POINTER(_BITMAPINFO),
+            wintypes.UINT,
+        ]
+        gdi32.GetDIBits.restype = ctypes.c_int
+
+        self._user32 = user32
+        self._gdi32 = gdi32
+        self._lock = threading.Lock()
+        self._screen_dc = user32.GetDC(None)
+        self._surfaces: dict[tuple[int, int], _GdiSurface] = {}
+        self._max_surfaces = max(1, int(max_surfaces))
+
+    def _surface(self, width: int, height: int) -> _GdiSurface:
+        key = (width, height)
+        surface = self._surfaces.get(key)
+        if surface is None:
+            if len(self._surfaces) >= self._max_surfaces:
+                _key, old = next(iter(self._surfaces.items()))
+                del self._surfaces[_key]
+                old.close(self._gdi32)
+            surface = self._surfaces[key] = _GdiSurface(self._gdi32, self._screen_dc, width, height)
+        return surface
+
+    def bounds(self) -> tuple[int, int, int, int]:
+        metric = self._user32.GetSystemMetrics
+        return (
+            int(metric(_SM_XVIRTUALSCREEN)),
+            int(metric(_SM_YVIRTUALSCREEN)),
+            int(metric(_SM_CXVIRTUALSCREEN)),
+            int(metric(_SM_CYVIRTUALSCREEN)),
+        )
+
+    def grab(self, x: int, y: int, width: int, height: int) -> np.ndarray:
+        with self._lock:
+            s = self._surface(int(width), int(height))
+            if not self._gdi32.BitBlt(s.dc, 0, 0, s.width, s.height, self._screen_dc, int(x), int(y), _SRCCOPY):
+                raise OSError(f"BitBlt failed at ({x}, {y}) {width}x{height}")
+            rows = self._gdi32.GetDIBits(
+                s.dc, s.bitmap, 0, s.height, s.buffer, ctypes.byref(s.info), _DIB_RGB_COLORS
+            )
+            if rows != s.height:
+                raise OSError(f"GetDIBits returned {rows} of {s.height} rows")
+            # Surfaces are shared per size: the pixel guard, watcher and locator threads can grab the same
+            # size at once, so the caller gets its own copy rather than a view the next BitBlt overwrites.
+            return s.pixels.copy()
+
+    def close(self) -> None:
+        with self._lock:
+            for surface in self._surfaces.values():
+                surface.close(self._gdi32)
+            self._surfaces.clear()
+            if self._screen_dc:
+                self._user32.ReleaseDC(None, self._screen_dc)
+                self._screen_dc = None
+
+
+_default_source: ScreenSource | None = None
+
+
+def default_screen_source() -> ScreenSource:
+    global _default_source
+    if _default_source is None:
+        _default_source = Win32ScreenSource()
+    return _default_source
+
+
+class PixelGuard:
+    def __init__(
+        self,
+        source: ScreenSource,
+        radius: int = 3,
+        tolerance: float = 30.0,
+        min_match: float = 0.9,
+        budget_ms: float = 1.0,
+    ):
+        _require_numpy()
+        self._source = source
+        self._radius = max(0, int(radius))
+        self._size = self._radius * 2 + 1
+        self._tolerance_sq = int(round(float(tolerance) ** 2))
+        self._min_match = min(1.0, max(0.0, float(min_match)))
+        self._budget_ms = float(budget_ms)
+        self._lock = threading.Lock()
+
+        shape = (self._size, self._size, 3)
+        self._reference: np.ndarray | None = None
+        self._ref32 = np.zeros(shape, dtype=np.int32)
+        self._diff = np.zeros(shape, dtype=np.int32)
+        self._dist = np.zeros(shape[:2], dtype=np.int32)
+        self._mask = np.zeros(shape[:2], dtype=bool)
+
+        self.checks = 0
+        self.slow_checks = 0
+        self.last_score = 1.0
+        self.last_sample_ms = 0.0
+        self.max_sample_ms = 0.0
+
+    @property
+    def source(self) -> ScreenSource:
+        return self._source
+
+    @property
+    def radius(self) -> int:
+        return self._radius
+
+    @property
+    def has_reference(self) -> bool:
+        return self._reference is not None
+
+    @property
+    def reference(self) -> np.ndarray | None:
+        ref = self._reference
+        return None if ref is None else ref.copy()
+
+    def _region(self, x: int, y: int) -> np.ndarray:
+        r = self._radius
+        return self._source.grab(int(x) - r, int(y) - r, self._size, self._size)
+
+    def set_reference(self, pixels: np.ndarray | None) -> None:
+        with self._lock:
+            if pixels is None:
+                self._reference = None
+                return
+            arr = np.array(pixels, dtype=np.uint8)
+            if arr.shape != self._ref32.shape:
+                raise ValueError(f"Reference must be {self._ref32.shape}, got {arr.shape}")
+            self._reference = arr
+            self._ref32[:] = arr
+
+    def capture_reference(self, x: int, y: int) -> np.ndarray:
+        pixels = np.array(self._region(x, y), dtype=np.uint8)
+        self.set_reference(pixels)
+        return pixels
+
+    def reference_hex(self) -> str:
+        ref = self._reference
+        return "" if ref is None else ref.tobytes().hex()
+
+    def load_reference_hex(self, text: str) -> bool:
+        text = (text or "").strip()
+        if not text:
+            self.set_reference(None)
+            return False
+        try:
+            raw = bytes.fromhex(text)
+        except ValueError:
+            return False
+        if len(raw) != self._ref32.size:
+            # Captured with a different radius.
+            return False
+        self.set_reference(np.frombuffer(raw, dtype=np.uint8).reshape(self._ref32.shape))
+        return True
+
+    def score(self, x: int, y: int) -> float:
+        with self._lock:
+            if self._reference is None:
+                return 1.0
+            t0 = time.perf_counter()
+            frame = self._region(x, y)
+            np.subtract(frame, self._ref32, out=self._diff)
+            np.multiply(self._diff, self._diff, out=self._diff)
+            np.sum(self._diff, axis=2, out=self._dist)
+            np.less_equal(self._dist, self._tolerance_sq, out=self._mask)
+            score = np.count_nonzero(self._mask) / self._mask.size
+            elapsed = (time.perf_counter() - t0) * 1000.0
+
+            self.checks += 1
+            self.last_score = score
+            self.last_sample_ms = elapsed
+            if elapsed > self.max_sample_ms:
+                self.max_sample_ms = elapsed
+            if elapsed > self._budget_ms:
+                self.slow_checks += 1
+            return score
+
+    def matches(self, x: int, y: int) -> bool:
+        return self.score(x, y) >= self._min_match
+
+    def reset_stats(self) -> None:
+        self.checks = 0
+        self.slow_checks = 0
+        self.max_sample_ms = 0.0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.screen",
+        description="Measure PixelGuard sampling time against the 1 ms budget.",
+    )
+    parser.add_argument("--checks", type=int, default=5000)
+    parser.add_argument("--radius", type=int, default=3)
+    parser.add_argument("--win32", action="store_true", help="Sample the real screen instead of a synthetic frame")
+    args = parser.parse_args(argv)
+
+    if args.win32:
+        source: ScreenSource = Win32ScreenSource()
+    else:
+        source = SyntheticScreenSource(1920, 1080, (40, 80, 120))
+    guard = PixelGuard(source, radius=args.radius)
+    x, y = 960, 540
+    guard.capture_reference(x, y)
+
+    samples: list[float] = []
+    for _ in range(max(1, args.checks)):
+        guard.score(x, y)
+        samples.append(guard.last_sample_ms)
+    samples.sort()
+    n = len(samples)
+    print(
+        f"checks={n} region={guard.radius * 2 + 1}px mean={sum(samples) / n:.4f}ms "
+        f"p50={samples[n // 2]:.4f}ms p99={samples[min(n - 1, int(n * 0.99))]:.4f}ms "
+        f"max={samples[-1]:.4f}ms over_budget={guard.slow_checks}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import json
+import logging
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .bootstrap import CONFIG_PATH
+from .clock import VirtualClock
+from .config_manager import ConfigManager
+from .engine import MacroEngine, MacroSettings
+from .error_handler import ErrorManager
+
+_SIM_LOGGER = logging.getLogger("app.simulation.engine")
+_SIM_LOGGER.propagate = False
+_SIM_LOGGER.addHandler(logging.NullHandler())
+_SIM_LOGGER.setLevel(logging.CRITICAL)
+
+
+@dataclass(frozen=True)
+class LatencyModel:
+    round_trip_ms: float = 1.0
+    glide_step_ms: float = 10.0  # runner.au3 GLIDE_STEP_MS
+    click_ms: float = 20.0  # AutoIt MouseClickDelay + MouseClickDownDelay defaults
+    key_ms: float = 10.0  # AutoIt SendKeyDelay + SendKeyDownDelay defaults
+    activate_ms: float = 30.0  # WinActivate + WinWaitActive on a responsive window
+
+
+def _glide_axis(cur: int, target: int, speed: int) -> int:
+    delta = int((target - cur) / speed)
+    if delta == 0:
+        if target > cur:
+            delta = 1
+        elif target < cur:
+            delta = -1
+    return cur + delta
+
+
+def glide_steps(start: tuple[int, int], target: tuple[int, int], speed: int) -> int:
+    if speed <= 0:
+        return 1 if start != target else 0
+    if speed > 100:
+        speed = 10
+    # runner.au3's minimum step is 32/65535 of the screen, 1 px on 1080p and 1440p screens.
+    x, y = start
+    tx, ty = target
+    steps = 0
+    while x != tx or y != ty:
+        x = _glide_axis(x, tx, speed)
+        y = _glide_axis(y, ty, speed)
+        steps += 1
+    return steps
+
+
+class SimulatedBridge:
+    def __init__(
+        self,
+        clock: VirtualClock,
+        model: LatencyModel | None = None,
+        start: tuple[int, int] = (0, 0),
+        record_timeline: bool = True,
+    ):
+        self.clock = clock
+        self.model = model or LatencyModel()
+        self.position = start
+        self.commands: Counter[str] = Counter()
+        self.timeline: list[tuple[float, str, tuple]] | None = [] if record_timeline else None
+
+    def _record(self, command: str, args: tuple) -> None:
+        self.commands[command] += 1
+        if self.timeline is not None:
+            self.timeline.append((self.clock.monotonic(), command, args))
+
+    def _glide_ms(self, x: int, y: int, speed: int) -> float:
+        steps = glide_steps(self.position, (x, y), int(speed))
+        self.position = (x, y)
+        return max(0, steps - 1) * self.model.glide_step_ms
+
+    def reset_abort(self) -> None:
+        pass
+
+    def abort(self) -> None:
+        pass
+
+    def send_priority(self, command: str) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    def mouse_move(self, x: int, y: int, speed: int) -> None:
+        self._record("MOVE", (int(x), int(y), int(speed)))
+        self.clock.advance((self.model.round_trip_ms + self._glide_ms(int(x), int(y), speed)) / 1000.0)
+
+    def mouse_click(self, x: int, y: int, button: str = "left", clicks: int = 1, speed: int = 0) -> None:
+        self._record("CLICK", (int(x), int(y), button, int(clicks)))
+        glide = self._glide_ms(int(x), int(y), speed)
+        self.clock.advance(
+            (self.model.round_trip_ms + glide + self.model.click_ms * max(1, int(clicks))) / 1000.0
+        )
+
+    def send_key(self, send_text: str) -> None:
+        self._record("KEY", (send_text,))
+        self.clock.advance((self.model.round_trip_ms + self.model.key_ms) / 1000.0)
+
+    def activate_window(self, title: str, timeout_s: float = 1.0) -> None:
+        self._record("ACTIVATE", (title,))
+        self.clock.advance((self.model.round_trip_ms + self.model.activate_ms) / 1000.0)
+
+
+@dataclass
+class SimulationResult:
+    loops: int
+    rotations: int
+    duration_s: float
+    wall_ms: float
+    commands: dict[str, int]
+    timeline: list[tuple[float, str, tuple]] = field(default_factory=list)
+
+    @property
+    def per_rotation_s(self) -> float:
+        return self.duration_s / self.rotations if self.rotations else 0.0
+
+    def as_dict(self) -> dict[str, object]:
+        return {
+            "loops": self.loops,
+            "rotations": self.rotations,
+            "duration_s": round(self.duration_s, 4),
+            "per_rotation_s": round(self.per_rotation_s, 4),
+            "wall_ms": round(self.wall_ms, 2),
+            "commands": dict(self.commands),
+        }
+
+
+def simulate(
+    settings: MacroSettings,
+    loops: int | None = None,
+    model: LatencyModel | None = None,
+    record_timeline: bool = True,
+) -> SimulationResult:
+    target_loops = int(loops if loops is not None else settings.loop_count)
+    if target_loops <= 0:
+        target_loops = 1
+
+    # Window, focus and screen checks need a live desktop; the simulation covers input timing only.
+    sim_settings = dataclasses.replace(
+        settings,
+        loop_count=target_loops,
+        target_window="",
+        click_x=settings.window_x if settings.target_window else settings.click_x,
+        click_y=settings.window_y if settings.target_window else settings.click_y,
+        pause_when_unfocused=False,
+        pixel_guard_enabled=False,
+        watchers_enabled=False,
+    )
+
+    clock = VirtualClock()
+    bridge = SimulatedBridge(
+        clock,
+        model=model,
+        start=(sim_settings.click_x, sim_settings.click_y),
+        record_timeline=record_timeline,
+    )
+    engine = MacroEngine(
+        autoit=bridge,  # type: ignore[arg-type]
+        logger=_SIM_LOGGER,
+        error_manager=ErrorManager(_SIM_LOGGER),
+        settings_provider=lambda: sim_settings,
+        clock=clock,
+    )
+
+    t0 = time.perf_counter()
+    engine.start()
+    engine.join()
+    engine.shutdown()
+    wall_ms = (time.perf_counter() - t0) * 1000.0
+
+    return SimulationResult(
+        loops=target_loops,
+        rotations=engine.rotation_counter,
+        duration_s=clock.monotonic(),
+        wall_ms=wall_ms,
+        commands=dict(bridge.commands),
+        timeline=bridge.timeline or [],
+    )
+
+
+def format_duration(seconds: float) -> str:
+    seconds = max(0.0, float(seconds))
+    if seconds < 60:
+        return f"{seconds:.1f}s"
+    total = int(round(seconds))
+    hours, rem = divmod(total, 3600)
+    minutes, secs = divmod(rem, 60)
+    if hours:
+        return f"{hours}h {minutes:02d}m"
+    return f"{minutes}m {secs:02d}s"
+
+
+def estimate_duration_s(settings: MacroSettings, loops: int, sample_loops: int = 20) -> float:
+    # Rotations are deterministic, so a short run scales linearly to the full loop count.
+    loops = max(1, int(loops))
+    sample = min(loops, max(1, int(sample_loops)), max(1, int(settings.center_click_every)) * 4)
+    result = simulate(settings, loops=sample, record_timeline=False)
+    return result.duration_s * loops / max(1, result.rotations)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.simulation",
+        description="Dry-run the macro on a virtual clock with modelled AutoIt latency.",
+    )
+    parser.add_argument("--config", default=str(CONFIG_PATH))
+    parser.add_argument("--loops", type=int, default=None, help="Override [Loops] LoopCount")
+    parser.add_argument("--timeline", type=int, default=20, help="Print the first N commands (0 = none)")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    settings = MacroSettings.from_config(ConfigManager(Path(args.config)))
+    result = simulate(settings, loops=args.loops, record_timeline=args.timeline > 0)
+
+    if args.json:
+        print(json.dumps(result.as_dict(), separators=(",", ":")))
+        return 0
+
+    for t, command, cmd_args in result.timeline[: max(0, args.timeline)]:
+        print(f"{t:10.3f}s  {command:<5} {' '.join(str(a) for a in cmd_args)}")
+    commands = " ".join(f"{k}={v}" for k, v in sorted(result.commands.items()))
+    print(
+        f"loops={result.loops} simulated={result.duration_s:.2f}s ({result.per_rotation_s * 1000:.1f} ms/loop) "
+        f"commands: {commands}  wall={result.wall_ms:.1f}ms"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
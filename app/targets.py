@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+
+VISIT_ORDERS = ("round_robin", "weighted", "shuffled")
+
+
+@dataclass(frozen=True)
+class ClickTarget:
+    x: int
+    y: int
+    clicks: int = 1
+    delay_ms: int = 0
+    weight: float = 1.0
+
+    def as_text(self) -> str:
+        parts = [str(self.x), str(self.y)]
+        if self.clicks != 1 or self.delay_ms or self.weight != 1.0:
+            parts += [str(self.clicks), str(self.delay_ms)]
+        if self.weight != 1.0:
+            parts.append(f"{self.weight:g}")
+        return ",".join(parts)
+
+
+def parse_targets(text: str) -> list[ClickTarget]:
+    # "x,y[,clicks[,delay_ms[,weight]]]; ..."
+    targets: list[ClickTarget] = []
+    for raw in (text or "").replace("\n", ";").split(";"):
+        raw = raw.strip()
+        if not raw:
+            continue
+        parts = [p.strip() for p in raw.split(",")]
+        if len(parts) < 2 or len(parts) > 5:
+            raise ValueError(f"Expected 'x,y[,clicks[,delay_ms[,weight]]]': {raw!r}")
+        try:
+            x, y = int(float(parts[0])), int(float(parts[1]))
+            clicks = max(1, int(float(parts[2]))) if len(parts) > 2 else 1
+            delay_ms = max(0, int(float(parts[3]))) if len(parts) > 3 else 0
+            weight = max(0.0, float(parts[4])) if len(parts) > 4 else 1.0
+        except ValueError:
+            raise ValueError(f"Invalid number in target {raw!r}") from None
+        targets.append(ClickTarget(x, y, clicks, delay_ms, weight))
+    return targets
+
+
+def format_targets(targets: list[ClickTarget]) -> str:
+    return "; ".join(t.as_text() for t in targets)
+
+
+class VisitOrder:
+    def __init__(self, targets: list[ClickTarget], mode: str = "round_robin", seed: int = 0, cycle_length: int = 0):
+        if not targets:
+            raise ValueError("VisitOrder needs at least one target")
+        mode = (mode or "round_robin").strip().lower().replace("-", "_")
+        if mode not in VISIT_ORDERS:
+            raise ValueError(f"Unknown visit order {mode!r}; expected one of {', '.join(VISIT_ORDERS)}")
+        self.mode = mode
+        self.seed = int(seed)
+        self._n = len(targets)
+        self._weights = [t.weight for t in targets]
+        if mode == "weighted" and sum(self._weights) <= 0:
+            raise ValueError("Weighted visit order needs at least one target with weight > 0")
+        if mode == "weighted":
+            self.cycle_length = max(1, int(cycle_length)) if cycle_length else max(64, self._n)
+        else:
+            self.cycle_length = self._n
+        self._cycle_index = -1
+        self._cycle: list[int] = []
+
+    def cycle(self, index: int) -> list[int]:
+        # Each cycle has its own RNG derived from (seed, index): any cycle can be regenerated on resume.
+        if self.mode == "round_robin":
+            return list(range(self._n))
+        rng = random.Random(self.seed * 1_000_003 + index)
+        if self.mode == "shuffled":
+            order = list(range(self._n))
+            rng.shuffle(order)
+            return order
+        return rng.choices(range(self._n), weights=self._weights, k=self.cycle_length)
+
+    def visit(self, pass_index: int) -> int:
+        cycle_index, pos = divmod(max(0, int(pass_index)), self.cycle_length)
+        if cycle_index != self._cycle_index:
+            self._cycle = self.cycle(cycle_index)
+            self._cycle_index = cycle_index
+        return self._cycle[pos]
+
+
+def validate_targets(text: str, mode: str = "round_robin", cycle_length: int = 0) -> list[ClickTarget]:
+    targets = parse_targets(text)
+    if targets:
+        VisitOrder(targets, mode, 1, cycle_length)
+    return targets
+
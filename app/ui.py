@@ -3,12 +3,10 @@ from __future__ import annotations
 import logging
 import ctypes
 import os
-import threading
-import time
 from collections.abc import Callable
 import tkinter as tk
 import tkinter.font as tkfont
-from tkinter import ttk
+from tkinter import messagebox, ttk
 
 try:
     import customtkinter as ctk
@@ -18,14 +16,25 @@ except Exception:
     ctk = None  # type: ignore[assignment]
     _HAS_CTK = False
 
-from .actions import key_name_to_autoit_send
-from .autoit_bridge import AutoItBridge, AutoItBridgeError
+from .autoit_bridge import AutoItBridge
+from .capture import CaptureStream, parse_region
+from .checkpoint import CHECKPOINT_NAME, Checkpoint, CheckpointWriter, settings_hash
 from .config_manager import ConfigManager
+from .cursor import CursorSampler, default_cursor_provider
+from .engine import MacroEngine, MacroSettings
 from .error_handler import ErrorManager
+from .events import EventLog
 from .hotkeys import HOTKEY_CHOICES, HotkeyManager
+from .isolated import IsolatedEngine
+from .locator import TemplateLocator, load_template, parse_scales, save_template
 from .logger import set_logging_level
-from .movement import iter_circle_points
-from .picker import LocationPicker, get_cursor_pos
+from .picker import LocationPicker
+from .program import compile_program
+from .screen import PixelGuard, ScreenSource, default_screen_source
+from .simulation import estimate_duration_s, format_duration
+from .targets import ClickTarget, format_targets, validate_targets
+from .watchers import StateWatcher, signatures_from_config
+from .window import FocusGuard, WindowInfoProvider, WindowRectTracker, default_window_provider
 
 
 THEME_BG = "#070D1A"
@@ -235,6 +244,7 @@ class AppUI:
         hotkeys: HotkeyManager,
         error_manager: ErrorManager,
         logger: logging.Logger,
+        events: EventLog | None = None,
     ):
         self.root = root
         self.config = config
@@ -242,10 +252,99 @@ class AppUI:
         self.hotkeys = hotkeys
         self.error_manager = error_manager
         self.logger = logger
+        self.events = events or EventLog()
 
-        self._macro_thread: threading.Thread | None = None
-        self._stop_event = threading.Event()
-        self._rotation_counter = 0
+        self.window_provider: WindowInfoProvider | None = None
+        self.window_tracker: WindowRectTracker | None = None
+        self.focus_guard: FocusGuard | None = None
+        try:
+            self.window_provider = default_window_provider()
+            self.window_tracker = WindowRectTracker(
+                self.window_provider,
+                refresh_hz=self.config.getfloat("Location", "WindowRefreshHz", fallback=2.0),
+            )
+            self.focus_guard = FocusGuard(
+                self.window_provider,
+                poll_hz=self.config.getfloat("Focus", "PollHz", fallback=10.0),
+            )
+        except Exception as e:
+            self.logger.warning("Window tracking unavailable: %s", e)
+
+        self.screen_source: ScreenSource | None = None
+        self.capture_stream: CaptureStream | None = None
+        self.pixel_guard: PixelGuard | None = None
+        try:
+            self.screen_source = default_screen_source()
+            if self.config.getboolean("Capture", "Enabled", fallback=False):
+                self.capture_stream = CaptureStream(
+                    self.screen_source,
+                    region=parse_region(self.config.get("Capture", "Region", fallback="")),
+                    fps=self.config.getfloat("Capture", "Fps", fallback=20.0),
+                    slots=self.config.getint("Capture", "Slots", fallback=4),
+                )
+                self.screen_source = self.capture_stream
+            self.pixel_guard = PixelGuard(
+                self.screen_source,
+                radius=self.config.getint("PixelGuard", "Radius", fallback=3),
+                tolerance=self.config.getfloat("PixelGuard", "Tolerance", fallback=30.0),
+                min_match=self.config.getfloat("PixelGuard", "MinMatch", fallback=0.9),
+            )
+            reference = self.config.get("PixelGuard", "Reference", fallback="")
+            if reference and not self.pixel_guard.load_reference_hex(reference):
+                self.logger.warning("Pixel guard reference does not match the current radius; pick the location again")
+        except Exception as e:
+            self.logger.warning("Pixel guard unavailable: %s", e)
+
+        self.state_watcher: StateWatcher | None = None
+        if self.screen_source is not None:
+            try:
+                self.state_watcher = StateWatcher(
+                    self.screen_source,
+                    signatures_from_config(self.config),
+                    rate_hz=self.config.getfloat("Watchers", "RateHz", fallback=2.0),
+                )
+            except Exception as e:
+                self.logger.warning("State watchers unavailable: %s", e)
+
+        self.locate_template_path = self.config.path.parent / "locate_template.npy"
+        self._locator: TemplateLocator | None = None
+        self._locator_key: tuple | None = None
+
+        self.checkpoint: CheckpointWriter | None = None
+        if self.config.getboolean("Checkpoint", "Enabled", fallback=True):
+            self.checkpoint = CheckpointWriter(
+                self.config.path.parent / CHECKPOINT_NAME,
+                interval_s=self.config.getfloat("Checkpoint", "IntervalS", fallback=5.0),
+            )
+        self._resume_checkpoint: Checkpoint | None = None
+
+        self.engine: MacroEngine | IsolatedEngine
+        if self.config.getboolean("Engine", "Isolated", fallback=False):
+            # The child process builds its own bridge, window tracking, screen checks and checkpoint writer.
+            self.engine = IsolatedEngine(
+                config_path=self.config.path,
+                logger=self.logger,
+                error_manager=self.error_manager,
+                settings_provider=self._read_settings,
+                on_finished=lambda: self.root.after(0, self._macro_finished),
+                level_name=self.config.get("Debug", "Level", fallback="INFO"),
+                events_enabled=self.config.getboolean("Debug", "EventLog", fallback=True),
+            )
+        else:
+            self.engine = MacroEngine(
+                autoit=self.autoit,
+                logger=self.logger,
+                error_manager=self.error_manager,
+                settings_provider=self._read_settings,
+                events=self.events,
+                on_finished=lambda: self.root.after(0, self._macro_finished),
+                window_tracker=self.window_tracker,
+                focus_guard=self.focus_guard,
+                pixel_guard=self.pixel_guard,
+                capture_stream=self.capture_stream,
+                state_watcher=self.state_watcher,
+                checkpoint=self.checkpoint,
+            )
 
         self.status_var = tk.StringVar(value="Idle")
         self.coord_var = tk.StringVar(value="(0, 0)")
@@ -256,6 +355,7 @@ class AppUI:
         self.move_speed_var = tk.IntVar()
         self.step_delay_var = tk.IntVar()
         self.clockwise_var = tk.BooleanVar()
+        self.window_relative_var = tk.BooleanVar()
 
         self.radius_text_var = tk.StringVar()
         self.spin_speed_text_var = tk.StringVar()
@@ -281,6 +381,8 @@ class AppUI:
         self.start_hotkey_var = tk.StringVar()
         self.stop_hotkey_var = tk.StringVar()
         self.confirm_hotkey_var = tk.StringVar()
+        self.pause_hotkey_var = tk.StringVar()
+        self.resume_hotkey_var = tk.StringVar()
 
         self.debug_level_var = tk.StringVar()
 
@@ -314,6 +416,7 @@ class AppUI:
         self._closing = False
         self._after_chrome_id: str | None = None
         self._after_error_id: str | None = None
+        self._after_estimate_id: str | None = None
         self._after_pick_id: str | None = None
 
         self._loop_progressbar: ttk.Progressbar | None = None
@@ -321,11 +424,24 @@ class AppUI:
         self._btn_start: object | None = None
         self._btn_stop: object | None = None
         self._btn_pick: object | None = None
+        self._btn_pick_targets: object | None = None
+        self._btn_locate: object | None = None
+
+        self.cursor_sampler: CursorSampler | None = None
+        try:
+            self.cursor_sampler = CursorSampler(
+                default_cursor_provider(),
+                rate_hz=self.config.getint("UI", "CursorSampleHz", fallback=120),
+            )
+        except Exception as e:
+            self.logger.warning("Cursor sampler unavailable: %s", e)
 
         self.picker = LocationPicker(
             logger=self.logger,
             on_confirm=self._on_location_confirmed,
             on_cancel=self._on_location_cancelled,
+            sampler=self.cursor_sampler,
+            on_finish=self._on_targets_confirmed,
         )
 
         self._load_from_config()
@@ -343,19 +459,80 @@ class AppUI:
 
         self._build_ui()
         self._register_hotkeys()
+        self._schedule_estimate()
 
         self.error_manager.clear()
         self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+        self.root.after(300, self._offer_resume)
+
+    def _offer_resume(self) -> None:
+        if self._closing or self.checkpoint is None or self.macro_running:
+            return
+        checkpoint = self.checkpoint.load()
+        if checkpoint is None:
+            return
+        if checkpoint.finished or checkpoint.rotations <= 0:
+            self.checkpoint.clear()
+            return
+
+        target = f" of {checkpoint.target_loops}" if checkpoint.target_loops > 0 else ""
+        text = f"The last session stopped at loop {checkpoint.rotations}{target} after {format_duration(checkpoint.elapsed_s)}."
+        if checkpoint.settings_hash != settings_hash(self._read_settings()):
+            text += "\n\nMovement or click settings have changed since then."
+        text += "\n\nResume from there on the next Start?"
+        if messagebox.askyesno("Resume session", text, parent=self.root):
+            self._resume_checkpoint = checkpoint
+            self.error_var.set(f"Next Start resumes at loop {checkpoint.rotations}")
+            self.logger.info("Resume armed at loop %s", checkpoint.rotations)
+        else:
+            self.checkpoint.clear()
 
     @property
     def macro_running(self) -> bool:
-        t = self._macro_thread
-        return t is not None and t.is_alive()
+        return self.engine.running
+
+    def _read_settings(self) -> MacroSettings:
+        return MacroSettings(
+            click_x=self.config.getint("Location", "ClickX", fallback=0),
+            click_y=self.config.getint("Location", "ClickY", fallback=0),
+            target_window=(
+                self.config.get("Location", "Window", fallback="")
+                if bool(self.window_relative_var.get())
+                else ""
+            ),
+            window_x=self.config.getint("Location", "WindowX", fallback=0),
+            window_y=self.config.getint("Location", "WindowY", fallback=0),
+            ref_width=self.config.getint("Location", "RefWidth", fallback=0),
+            ref_height=self.config.getint("Location", "RefHeight", fallback=0),
+            radius=int(self.radius_var.get()),
+            spin_speed=int(self.spin_speed_var.get()),
+            move_speed=int(self.move_speed_var.get()),
+            step_delay_ms=int(self.step_delay_var.get()),
+            clockwise=bool(self.clockwise_var.get()),
+            center_click_every=int(self.center_click_every_var.get()),
+            before_click_delay_ms=int(self.before_click_delay_var.get()),
+            after_click_delay_ms=int(self.after_click_delay_var.get()),
+            loop_count=int(self.loop_count_var.get()),
+            per_loop_delay_ms=int(self.per_loop_delay_var.get()),
+            post_loop_key_enabled=bool(self.post_loop_key_enabled_var.get()),
+            post_loop_key=self.post_loop_key_var.get(),
+            pause_when_unfocused=self.config.getboolean("Focus", "PauseWhenUnfocused", fallback=False),
+            pixel_guard_enabled=self.config.getboolean("PixelGuard", "Enabled", fallback=False),
+            watchers_enabled=self.config.getboolean("Watchers", "Enabled", fallback=False),
+            program=self.config.get("Program", "Steps", fallback=""),
+            targets=self.config.get(
+                "Targets", "WindowPoints" if bool(self.window_relative_var.get()) else "Points", fallback=""
+            ),
+            target_order=self.config.get("Targets", "Order", fallback="round_robin"),
+            target_seed=self.config.getint("Targets", "Seed", fallback=0),
+            target_cycle_length=self.config.getint("Targets", "CycleLength", fallback=0),
+        )
 
     def _load_from_config(self) -> None:
-        x = self.config.getint("Location", "ClickX", fallback=0)
-        y = self.config.getint("Location", "ClickY", fallback=0)
-        self.coord_var.set(f"({x}, {y})")
+        self.window_relative_var.set(
+            self.config.getboolean("Location", "RelativeToWindow", fallback=False)
+        )
+        self._update_coord_var()
 
         self.radius_var.set(self.config.getint("Movement", "Radius", fallback=25))
         self.spin_speed_var.set(self.config.getint("Movement", "SpinSpeed", fallback=10))
@@ -379,9 +556,22 @@ class AppUI:
         self.start_hotkey_var.set(self.config.get("Hotkeys", "Start", fallback="F6"))
         self.stop_hotkey_var.set(self.config.get("Hotkeys", "Stop", fallback="F7"))
         self.confirm_hotkey_var.set(self.config.get("Hotkeys", "ConfirmLocation", fallback="F8"))
+        self.pause_hotkey_var.set(self.config.get("Hotkeys", "Pause", fallback="F9"))
+        self.resume_hotkey_var.set(self.config.get("Hotkeys", "Resume", fallback="F10"))
 
         self.debug_level_var.set(self.config.get("Debug", "Level", fallback="INFO"))
 
+    def _update_coord_var(self) -> None:
+        x = self.config.getint("Location", "ClickX", fallback=0)
+        y = self.config.getint("Location", "ClickY", fallback=0)
+        title = self.config.get("Location", "Window", fallback="")
+        if bool(self.window_relative_var.get()) and title:
+            wx = self.config.getint("Location", "WindowX", fallback=0)
+            wy = self.config.getint("Location", "WindowY", fallback=0)
+            self.coord_var.set(f"({wx}, {wy}) in {title}")
+        else:
+            self.coord_var.set(f"({x}, {y})")
+
     def _sync_text_vars_from_ints(self) -> None:
         self.radius_text_var.set(str(self.radius_var.get()))
         self.spin_speed_text_var.set(str(self.spin_speed_var.get()))
@@ -444,6 +634,8 @@ class AppUI:
         save_int(self.move_speed_var, "Movement", "MoveSpeed")
         save_int(self.step_delay_var, "Movement", "StepDelayMs")
         save_bool(self.clockwise_var, "Movement", "Clockwise")
+        save_bool(self.window_relative_var, "Location", "RelativeToWindow")
+        self.window_relative_var.trace_add("write", lambda *_: self._update_coord_var())
 
         save_int(self.center_click_every_var, "Clicking", "CenterClickEveryRotations")
         save_int(self.before_click_delay_var, "Clicking", "BeforeClickDelayMs")
@@ -454,6 +646,62 @@ class AppUI:
         save_bool(self.post_loop_key_enabled_var, "Loops", "PostLoopKeyEnabled")
         save_str(self.post_loop_key_var, "Loops", "PostLoopKey")
 
+        for var in (
+            self.radius_var,
+            self.spin_speed_var,
+            self.move_speed_var,
+            self.step_delay_var,
+            self.clockwise_var,
+            self.center_click_every_var,
+            self.before_click_delay_var,
+            self.after_click_delay_var,
+            self.loop_count_var,
+            self.per_loop_delay_var,
+            self.post_loop_key_enabled_var,
+        ):
+            var.trace_add("write", lambda *_: self._schedule_estimate())
+
+    def _schedule_estimate(self) -> None:
+        if self._closing:
+            return
+        if self._after_estimate_id is not None:
+            try:
+                self.root.after_cancel(self._after_estimate_id)
+            except Exception:
+                pass
+        self._after_estimate_id = self.root.after(300, self._update_estimate)
+
+    def _update_estimate(self) -> None:
+        self._after_estimate_id = None
+        if self.macro_running:
+            return
+        try:
+            settings = self._read_settings()
+            loops = int(settings.loop_count)
+            if loops > 0:
+                total = estimate_duration_s(settings, loops)
+                self.estimate_var.set(f"~{format_duration(total)} for {loops} loops")
+            else:
+                per_loop = estimate_duration_s(settings, 1)
+                self.estimate_var.set(f"~{format_duration(per_loop)} per loop")
+        except Exception as e:
+            self.logger.debug("Loop estimate failed: %s", e)
+            self.estimate_var.set("-")
+
+    def _update_live_estimate(self) -> None:
+        throughput = self.engine.throughput
+        rpm = throughput.rotations_per_min
+        parts = [f"{rpm:.1f} loops/min", f"{throughput.clicks_per_hour:.0f} clicks/h"]
+        try:
+            target = int(self.loop_count_var.get())
+        except Exception:
+            target = 0
+        if target > 0:
+            eta = throughput.eta_s(max(0, target - self.engine.rotation_counter))
+            if eta is not None:
+                parts.insert(0, f"ETA {format_duration(eta)}")
+        self.estimate_var.set(" · ".join(parts) if throughput.samples or target > 0 else "-")
+
     def _apply_theme(self) -> None:
         try:
             self.root.configure(bg=THEME_BG)
@@ -680,11 +928,13 @@ class AppUI:
             return THEME_WARNING, "#111827"
         if "pick" in s:
             return THEME_PURPLE, "#FFFFFF"
+        if "pause" in s or "recover" in s:
+            return THEME_WARNING, "#111827"
         if "error" in s:
             return THEME_DANGER, "#FFFFFF"
         return THEME_BORDER, THEME_TEXT
 
-    def _show_pick_overlay(self) -> None:
+    def _show_pick_overlay(self, multi: bool = False) -> None:
         overlay = tk.Toplevel(self.root)
         self._pick_overlay = overlay
         self._set_rounded_corners(overlay)
@@ -724,7 +974,7 @@ class AppUI:
 
         tk.Label(
             header,
-            text="Pick Location",
+            text="Pick Targets" if multi else "Pick Location",
             bg=THEME_CARD,
             fg=THEME_TEXT,
             font=self._font_section,
@@ -736,7 +986,11 @@ class AppUI:
         hk = self.confirm_hotkey_var.get().strip() or "F8"
         tk.Label(
             body,
-            text=f"Move your cursor to the target spot and press {hk} to confirm.",
+            text=(
+                f"Move your cursor to each target and press {hk} to add it."
+                if multi
+                else f"Move your cursor to the target spot and press {hk} to confirm."
+            ),
             bg=THEME_CARD,
             fg=THEME_TEXT,
             font=self._font_subtitle,
@@ -744,7 +998,7 @@ class AppUI:
 
         tk.Label(
             body,
-            text="Press ESC to cancel.",
+            text="Press ESC when done (the first target is the click location)." if multi else "Press ESC to cancel.",
             bg=THEME_CARD,
             fg=THEME_MUTED,
             font=self._font_subtitle,
@@ -761,11 +1015,13 @@ class AppUI:
         def _poll_cursor() -> None:
             if not self.picker.active:
                 return
-            try:
-                x2, y2 = get_cursor_pos()
-                self._pick_cursor_var.set(f"Cursor: {x2}, {y2}")
-            except Exception:
-                pass
+            sampler = self.cursor_sampler
+            pos = sampler.latest() if sampler is not None else None
+            if pos is not None:
+                text = f"Cursor: {pos[0]}, {pos[1]}"
+                if multi:
+                    text += f"   Targets: {len(self.picker.points)}"
+                self._pick_cursor_var.set(text)
             try:
                 self._after_pick_id = overlay.after(50, _poll_cursor)
             except Exception:
@@ -982,6 +1238,14 @@ class AppUI:
                 return
 
     def _refresh_chrome(self) -> None:
+        if self.macro_running and self.status_var.get() in ("Running", "Paused", "Paused (focus)", "Recovering"):
+            if self.engine.paused:
+                self.status_var.set("Paused")
+            elif self.engine.recovering:
+                self.status_var.set("Recovering")
+            else:
+                self.status_var.set("Paused (focus)" if self.engine.focus_paused else "Running")
+
         status = self.status_var.get()
         status_bg, status_fg = self._status_badge_colors(status)
         if self._header_status_badge is not None:
@@ -999,18 +1263,36 @@ class AppUI:
             except Exception:
                 pass
 
+        self.loop_progress_var.set(str(self.engine.rotation_counter))
+
         if self._header_progress_badge is not None:
             try:
-                self._header_progress_badge.configure(text=f"Loops: {self.loop_progress_var.get()}")
+                try:
+                    target = int(self.loop_count_var.get())
+                except Exception:
+                    target = 0
+                text = f"Loops: {self.loop_progress_var.get()}"
+                self._header_progress_badge.configure(text=f"{text}/{target}" if target > 0 else text)
+            except Exception:
+                pass
+
+        if self.macro_running:
+            try:
+                self._update_live_estimate()
             except Exception:
                 pass
 
         if self._footer_hotkeys_label is not None:
             start_hk = self.start_hotkey_var.get().strip()
             stop_hk = self.stop_hotkey_var.get().strip()
+            pause_hk = self.pause_hotkey_var.get().strip()
+            resume_hk = self.resume_hotkey_var.get().strip()
             confirm_hk = self.confirm_hotkey_var.get().strip() or "F8"
             self._footer_hotkeys_label.configure(
-                text=f"Start: {start_hk}   Stop: {stop_hk}   Confirm: {confirm_hk}   Cancel: ESC"
+                text=(
+                    f"Start: {start_hk}   Stop: {stop_hk}   Pause: {pause_hk}   Resume: {resume_hk}   "
+                    f"Confirm: {confirm_hk}   Cancel: ESC"
+                )
             )
 
         running = bool(self.macro_running)
@@ -1032,12 +1314,14 @@ class AppUI:
                     self._btn_stop.configure(state=("normal" if running else "disabled"))
                 except Exception:
                     pass
-        if self._btn_pick is not None:
+        for btn in (self._btn_pick, self._btn_pick_targets, self._btn_locate):
+            if btn is None:
+                continue
             try:
-                self._btn_pick.set_enabled(not (running or picking))
+                btn.set_enabled(not (running or picking))
             except Exception:
                 try:
-                    self._btn_pick.configure(state=("disabled" if (running or picking) else "normal"))
+                    btn.configure(state=("disabled" if (running or picking) else "normal"))
                 except Exception:
                     pass
 
@@ -1124,6 +1408,28 @@ class AppUI:
             )
             self._btn_pick.pack(side="left", padx=(10, 0))
 
+            self._btn_pick_targets = ctk.CTkButton(
+                top,
+                text="Pick Targets",
+                command=self.request_pick_targets,
+                corner_radius=14,
+                fg_color=THEME_BG,
+                hover_color=THEME_BORDER,
+                text_color=THEME_TEXT,
+            )
+            self._btn_pick_targets.pack(side="left", padx=(10, 0))
+
+            self._btn_locate = ctk.CTkButton(
+                top,
+                text="Auto-locate",
+                command=self.request_auto_locate,
+                corner_radius=14,
+                fg_color=THEME_BG,
+                hover_color=THEME_BORDER,
+                text_color=THEME_TEXT,
+            )
+            self._btn_locate.pack(side="left", padx=(10, 0))
+
             ctk.CTkButton(
                 top,
                 text="Reset to Defaults",
@@ -1150,6 +1456,26 @@ class AppUI:
                 text_color=THEME_TEXT,
                 font=self._ctk_font_subtitle,
             ).pack(side="left", padx=(8, 0))
+
+            ctk.CTkLabel(
+                info,
+                text="Estimate:",
+                text_color=THEME_MUTED,
+                font=self._ctk_font_subtitle,
+            ).pack(side="left", padx=(18, 0))
+
+            ctk.CTkLabel(
+                info,
+                textvariable=self.estimate_var,
+                text_color=THEME_TEXT,
+                font=self._ctk_font_subtitle,
+            ).pack(side="left", padx=(8, 0))
+
+            ctk.CTkSwitch(
+                body,
+                text="Relative to game window",
+                variable=self.window_relative_var,
+            ).pack(anchor="w", pady=(10, 0))
             return
 
         tab.columnconfigure(0, weight=1)
@@ -1199,6 +1525,32 @@ class AppUI:
         )
         self._btn_pick.pack(side="left", padx=(10, 0))
 
+        self._btn_pick_targets = RoundedButton(
+            top,
+            text="Pick Targets",
+            command=self.request_pick_targets,
+            bg=THEME_CARD,
+            bg_hover=THEME_BG,
+            fg=THEME_TEXT,
+            bg_disabled=THEME_BORDER,
+            fg_disabled=THEME_MUTED,
+            font=self._font_subtitle,
+        )
+        self._btn_pick_targets.pack(side="left", padx=(10, 0))
+
+        self._btn_locate = RoundedButton(
+            top,
+            text="Auto-locate",
+            command=self.request_auto_locate,
+            bg=THEME_CARD,
+            bg_hover=THEME_BG,
+            fg=THEME_TEXT,
+            bg_disabled=THEME_BORDER,
+            fg_disabled=THEME_MUTED,
+            font=self._font_subtitle,
+        )
+        self._btn_locate.pack(side="left", padx=(10, 0))
+
         reset_btn = RoundedButton(
             top,
             text="Reset to Defaults",
@@ -1231,6 +1583,33 @@ class AppUI:
             font=self._font_subtitle,
         ).pack(side="left", padx=(8, 0))
 
+        tk.Label(
+            info,
+            text="Estimate:",
+            bg=THEME_CARD,
+            fg=THEME_MUTED,
+            font=self._font_subtitle,
+        ).pack(side="left", padx=(18, 0))
+
+        tk.Label(
+            info,
+            textvariable=self.estimate_var,
+            bg=THEME_CARD,
+            fg=THEME_TEXT,
+            font=self._font_subtitle,
+        ).pack(side="left", padx=(8, 0))
+
+        relative_row = tk.Frame(body, bg=THEME_CARD)
+        relative_row.pack(fill="x", pady=(10, 0))
+        ToggleSwitch(relative_row, variable=self.window_relative_var).pack(side="left")
+        tk.Label(
+            relative_row,
+            text="Relative to game window",
+            bg=THEME_CARD,
+            fg=THEME_TEXT,
+            font=self._font_subtitle,
+        ).pack(side="left", padx=(8, 0))
+
     def _build_movement_tab(self, tab: ttk.Frame) -> None:
         if _HAS_CTK and ctk is not None and isinstance(tab, ctk.CTkFrame):
             tab.grid_columnconfigure(0, weight=1)
@@ -1501,15 +1880,55 @@ class AppUI:
             )
             confirm_menu.grid(row=2, column=1, sticky="w", padx=12, pady=6)
 
+            ctk.CTkLabel(tab, text="Pause hotkey", text_color=THEME_TEXT).grid(
+                row=3, column=0, sticky="w", padx=12, pady=6
+            )
+            pause_menu = ctk.CTkOptionMenu(
+                tab,
+                variable=self.pause_hotkey_var,
+                values=HOTKEY_CHOICES,
+                corner_radius=10,
+                fg_color=THEME_BG,
+                button_color=THEME_BORDER,
+                button_hover_color=THEME_ACCENT,
+                dropdown_fg_color=THEME_CARD,
+                dropdown_hover_color=THEME_BORDER,
+                text_color=THEME_TEXT,
+                dropdown_text_color=THEME_TEXT,
+            )
+            pause_menu.grid(row=3, column=1, sticky="w", padx=12, pady=6)
+
+            ctk.CTkLabel(tab, text="Resume hotkey", text_color=THEME_TEXT).grid(
+                row=4, column=0, sticky="w", padx=12, pady=6
+            )
+            resume_menu = ctk.CTkOptionMenu(
+                tab,
+                variable=self.resume_hotkey_var,
+                values=HOTKEY_CHOICES,
+                corner_radius=10,
+                fg_color=THEME_BG,
+                button_color=THEME_BORDER,
+                button_hover_color=THEME_ACCENT,
+                dropdown_fg_color=THEME_CARD,
+                dropdown_hover_color=THEME_BORDER,
+                text_color=THEME_TEXT,
+                dropdown_text_color=THEME_TEXT,
+            )
+            resume_menu.grid(row=4, column=1, sticky="w", padx=12, pady=6)
+
             def _save_hotkeys() -> None:
                 self.config.set("Hotkeys", "Start", self.start_hotkey_var.get())
                 self.config.set("Hotkeys", "Stop", self.stop_hotkey_var.get())
                 self.config.set("Hotkeys", "ConfirmLocation", self.confirm_hotkey_var.get())
+                self.config.set("Hotkeys", "Pause", self.pause_hotkey_var.get())
+                self.config.set("Hotkeys", "Resume", self.resume_hotkey_var.get())
                 self._register_hotkeys()
 
             start_menu.configure(command=lambda _v=None: _save_hotkeys())
             stop_menu.configure(command=lambda _v=None: _save_hotkeys())
             confirm_menu.configure(command=lambda _v=None: _save_hotkeys())
+            pause_menu.configure(command=lambda _v=None: _save_hotkeys())
+            resume_menu.configure(command=lambda _v=None: _save_hotkeys())
 
             ctk.CTkButton(
                 tab,
@@ -1519,7 +1938,7 @@ class AppUI:
                 fg_color=THEME_BG,
                 hover_color=THEME_BORDER,
                 text_color=THEME_TEXT,
-            ).grid(row=3, column=0, columnspan=2, sticky="w", padx=12, pady=(14, 6))
+            ).grid(row=5, column=0, columnspan=2, sticky="w", padx=12, pady=(14, 6))
             return
 
         tab.columnconfigure(1, weight=1)
@@ -1554,15 +1973,39 @@ class AppUI:
         )
         confirm_box.grid(row=2, column=1, sticky="w", padx=12, pady=6)
 
+        ttk.Label(tab, text="Pause hotkey").grid(row=3, column=0, sticky="w", padx=12, pady=6)
+        pause_box = ttk.Combobox(
+            tab,
+            textvariable=self.pause_hotkey_var,
+            values=HOTKEY_CHOICES,
+            state="readonly",
+            width=12,
+        )
+        pause_box.grid(row=3, column=1, sticky="w", padx=12, pady=6)
+
+        ttk.Label(tab, text="Resume hotkey").grid(row=4, column=0, sticky="w", padx=12, pady=6)
+        resume_box = ttk.Combobox(
+            tab,
+            textvariable=self.resume_hotkey_var,
+            values=HOTKEY_CHOICES,
+            state="readonly",
+            width=12,
+        )
+        resume_box.grid(row=4, column=1, sticky="w", padx=12, pady=6)
+
         def _on_changed(_event: object) -> None:
             self.config.set("Hotkeys", "Start", self.start_hotkey_var.get())
             self.config.set("Hotkeys", "Stop", self.stop_hotkey_var.get())
             self.config.set("Hotkeys", "ConfirmLocation", self.confirm_hotkey_var.get())
+            self.config.set("Hotkeys", "Pause", self.pause_hotkey_var.get())
+            self.config.set("Hotkeys", "Resume", self.resume_hotkey_var.get())
             self._register_hotkeys()
 
         start_box.bind("<<ComboboxSelected>>", _on_changed)
         stop_box.bind("<<ComboboxSelected>>", _on_changed)
         confirm_box.bind("<<ComboboxSelected>>", _on_changed)
+        pause_box.bind("<<ComboboxSelected>>", _on_changed)
+        resume_box.bind("<<ComboboxSelected>>", _on_changed)
 
         reset_btn = RoundedButton(
             tab,
@@ -1575,7 +2018,7 @@ class AppUI:
             fg_disabled=THEME_MUTED,
             font=self._font_subtitle,
         )
-        reset_btn.grid(row=3, column=0, columnspan=2, sticky="w", padx=12, pady=(14, 6))
+        reset_btn.grid(row=5, column=0, columnspan=2, sticky="w", padx=12, pady=(14, 6))
 
     def _build_debug_tab(self, tab: ttk.Frame) -> None:
         if _HAS_CTK and ctk is not None and isinstance(tab, ctk.CTkFrame):
@@ -1709,6 +2152,8 @@ class AppUI:
             self.hotkeys.register("start", self.start_hotkey_var.get(), self._hotkey_start)
             self.hotkeys.register("stop", self.stop_hotkey_var.get(), self._hotkey_stop)
             self.hotkeys.register("confirm", self.confirm_hotkey_var.get(), self._hotkey_confirm)
+            self.hotkeys.register("pause", self.pause_hotkey_var.get(), self._hotkey_pause)
+            self.hotkeys.register("resume", self.resume_hotkey_var.get(), self._hotkey_resume)
             self.hotkeys.register("cancel", "ESC", self._hotkey_cancel)
         except Exception as e:
             self.error_manager.report("Hotkey registration failed", e, critical=True)
@@ -1717,8 +2162,17 @@ class AppUI:
         self.root.after(0, self.request_start)
 
     def _hotkey_stop(self) -> None:
+        # Stop the engine from the hotkey-dispatch thread; the Tk side only catches up on status.
+        self.engine.emergency_stop()
         self.root.after(0, self.request_stop)
 
+    def _hotkey_pause(self) -> None:
+        # The worker parks on its own condition; no Tk round-trip is needed.
+        self.engine.pause()
+
+    def _hotkey_resume(self) -> None:
+        self.engine.resume()
+
     def _hotkey_confirm(self) -> None:
         self.root.after(0, self._confirm_location_hotkey)
 
@@ -1751,10 +2205,50 @@ class AppUI:
             pass
         self.picker.enter()
 
+    def request_pick_targets(self) -> None:
+        if self.macro_running:
+            self.error_manager.report("Stop the macro before picking targets")
+            return
+        if self.picker.active:
+            return
+
+        self.status_var.set("Picking Targets")
+        try:
+            self.root.withdraw()
+        except Exception:
+            pass
+        try:
+            self._show_pick_overlay(multi=True)
+        except Exception:
+            pass
+        self.picker.enter(multi=True)
+
+    def _on_targets_confirmed(self, points: list[tuple[int, int]]) -> None:
+        # The first point doubles as the click location so the pixel guard, template and window target follow it.
+        self._on_location_confirmed(*points[0])
+        targets = [ClickTarget(x, y) for x, y in points]
+        self.config.set("Targets", "Points", format_targets(targets))
+        self.config.set("Targets", "WindowPoints", "")
+        provider = self.window_provider
+        if provider is not None:
+            try:
+                handle = provider.window_at(*points[0])
+                rect = provider.client_rect(handle) if handle is not None else None
+            except Exception as e:
+                self.logger.warning("Failed to read target window for targets: %s", e)
+                rect = None
+            if rect is not None:
+                relative = [ClickTarget(t.x - rect.x, t.y - rect.y) for t in targets]
+                self.config.set("Targets", "WindowPoints", format_targets(relative))
+        self.logger.info("Saved %s click targets", len(targets))
+
     def _on_location_confirmed(self, x: int, y: int) -> None:
         self.config.set("Location", "ClickX", x)
         self.config.set("Location", "ClickY", y)
-        self.coord_var.set(f"({x}, {y})")
+        self._capture_window_target(x, y)
+        self._capture_pixel_reference(x, y)
+        self._capture_locate_template(x, y)
+        self._update_coord_var()
         self.status_var.set("Idle")
         self._hide_pick_overlay()
         try:
@@ -1763,6 +2257,133 @@ class AppUI:
         except Exception:
             pass
 
+    def _capture_window_target(self, x: int, y: int) -> None:
+        provider = self.window_provider
+        if provider is None:
+            return
+        try:
+            handle = provider.window_at(x, y)
+            rect = provider.client_rect(handle) if handle is not None else None
+            title = provider.window_title(handle) if handle is not None else ""
+        except Exception as e:
+            self.error_manager.report("Failed to read target window", e)
+            return
+        if rect is None or not title:
+            self.logger.warning("No titled window under (%s, %s); window-relative target not updated", x, y)
+            return
+
+        self.config.set("Location", "Window", title)
+        self.config.set("Location", "WindowX", x - rect.x)
+        self.config.set("Location", "WindowY", y - rect.y)
+        self.config.set("Location", "RefWidth", rect.width)
+        self.config.set("Location", "RefHeight", rect.height)
+        self.logger.info(
+            "Window target: %s at (%s, %s) of %sx%s", title, x - rect.x, y - rect.y, rect.width, rect.height
+        )
+
+    def _capture_pixel_reference(self, x: int, y: int) -> None:
+        guard = self.pixel_guard
+        if guard is None:
+            return
+        try:
+            guard.capture_reference(x, y)
+        except Exception as e:
+            self.error_manager.report("Failed to capture pixel reference", e)
+            return
+        self.config.set("PixelGuard", "Reference", guard.reference_hex())
+
+    def _capture_locate_template(self, x: int, y: int) -> None:
+        source = self.screen_source
+        if source is None:
+            return
+        size = max(8, self.config.getint("Locator", "TemplateSize", fallback=48))
+        try:
+            pixels = source.grab(x - size // 2, y - size // 2, size, size)
+            save_template(self.locate_template_path, pixels)
+        except Exception as e:
+            self.error_manager.report("Failed to save locate template", e)
+            return
+        self._locator_key = None
+
+    def _get_locator(self) -> TemplateLocator | None:
+        try:
+            mtime = self.locate_template_path.stat().st_mtime
+        except OSError:
+            return None
+        key = (
+            mtime,
+            self.config.getint("Locator", "Levels", fallback=3),
+            self.config.get("Locator", "Scales", fallback="1.0"),
+            self.config.getfloat("Locator", "MinScore", fallback=0.8),
+            self.config.getint("Locator", "Workers", fallback=0),
+        )
+        if self._locator is not None and key == self._locator_key:
+            return self._locator
+
+        template = load_template(self.locate_template_path)
+        if template is None:
+            return None
+        if self._locator is not None:
+            self._locator.close()
+        self._locator = TemplateLocator(
+            template,
+            levels=key[1],
+            scales=parse_scales(key[2]),
+            min_score=key[3],
+            workers=key[4],
+        )
+        self._locator_key = key
+        return self._locator
+
+    def _auto_locate(self) -> bool:
+        if self.screen_source is None:
+            self.error_manager.report("Auto-locate needs screen capture (numpy, Windows)")
+            return False
+        try:
+            locator = self._get_locator()
+            if locator is None:
+                self.error_manager.report("No locate template yet. Use Pick Location first.")
+                return False
+
+            margin = self.config.getint("Locator", "SearchMargin", fallback=300)
+            cx = self.config.getint("Location", "ClickX", fallback=0)
+            cy = self.config.getint("Location", "ClickY", fallback=0)
+            roi = (cx - margin, cy - margin, margin * 2, margin * 2) if margin > 0 and (cx or cy) else None
+            result = locator.locate_on_screen(self.screen_source, roi)
+            if result is None and roi is not None:
+                result = locator.locate_on_screen(self.screen_source, None)
+        except Exception as e:
+            self.error_manager.report("Auto-locate failed", e)
+            return False
+
+        if result is None:
+            self.logger.warning(
+                "Auto-locate: template not found (best score %.2f, %.1f ms)",
+                locator.last_score,
+                locator.last_elapsed_ms,
+            )
+            self.error_var.set("Auto-locate: template not found")
+            return False
+
+        self.logger.info(
+            "Auto-locate: (%s, %s) score=%.3f scale=%s in %.1f ms",
+            result.x,
+            result.y,
+            result.score,
+            result.scale,
+            result.elapsed_ms,
+        )
+        self.config.set("Location", "ClickX", result.x)
+        self.config.set("Location", "ClickY", result.y)
+        self._capture_window_target(result.x, result.y)
+        self._update_coord_var()
+        return True
+
+    def request_auto_locate(self) -> None:
+        if self.picker.active or self.macro_running:
+            return
+        self._auto_locate()
+
     def _on_location_cancelled(self) -> None:
         self.status_var.set("Idle")
         self._hide_pick_overlay()
@@ -1784,11 +2405,41 @@ class AppUI:
             self.error_manager.report("No location selected. Use Pick Location first.")
             return
 
+        if self.config.getboolean("Locator", "LocateOnStart", fallback=False):
+            self._auto_locate()
+
+        if self.state_watcher is not None:
+            try:
+                self.state_watcher.set_signatures(signatures_from_config(self.config))
+            except Exception as e:
+                self.error_manager.report("Invalid watcher config", e)
+
+        settings = self._read_settings()
+        try:
+            validate_targets(settings.targets, settings.target_order, settings.target_cycle_length)
+        except ValueError as e:
+            self.error_manager.report("Invalid [Targets]", e)
+            return
+        try:
+            plan = compile_program(settings)
+        except ValueError as e:
+            self.error_manager.report("Invalid [Program] Steps", e)
+            return
+        known = {sig.name for sig in self.state_watcher.signatures} if self.state_watcher is not None else set()
+        missing = [name for name in plan.watchers if name not in known]
+        if missing:
+            self.logger.warning("Program branches on unknown watchers (always false): %s", ", ".join(missing))
+
+        try:
+            self.engine.throughput.reset(estimate_duration_s(settings, 1))
+        except Exception as e:
+            self.logger.debug("Loop estimate failed: %s", e)
+            self.engine.throughput.reset()
+
+        resume, self._resume_checkpoint = self._resume_checkpoint, None
         self.error_manager.clear()
-        self._stop_event = threading.Event()
-        self._rotation_counter = 0
-        self._macro_thread = threading.Thread(target=self._run_macro, daemon=True)
-        self._macro_thread.start()
+        if not self.engine.start(resume_from=resume):
+            return
         self.status_var.set("Running")
         self.logger.info("Macro start")
 
@@ -1796,7 +2447,7 @@ class AppUI:
         if self.picker.active:
             self._hide_pick_overlay()
             self.picker.cancel()
-        self._stop_event.set()
+        self.engine.request_stop()
         if self.macro_running:
             self.status_var.set("Stopping")
         else:
@@ -1822,71 +2473,14 @@ class AppUI:
         except Exception:
             pass
 
-    def _sleep(self, seconds: float) -> None:
-        end = time.monotonic() + max(0.0, seconds)
-        while time.monotonic() < end:
-            if self._stop_event.is_set():
-                return
-            time.sleep(0.01)
-
-    def _run_macro(self) -> None:
-        try:
-            target_loops = int(self.loop_count_var.get())
-            while not self._stop_event.is_set():
-                if target_loops > 0 and self._rotation_counter >= target_loops:
-                    break
-
-                cx = self.config.getint("Location", "ClickX", fallback=0)
-                cy = self.config.getint("Location", "ClickY", fallback=0)
-
-                radius = int(self.radius_var.get())
-                spin_speed = int(self.spin_speed_var.get())
-                move_speed = int(self.move_speed_var.get())
-                step_delay = int(self.step_delay_var.get())
-                clockwise = bool(self.clockwise_var.get())
-
-                for angle, x, y in iter_circle_points(cx, cy, radius, spin_speed, clockwise):
-                    if self._stop_event.is_set():
-                        break
-                    self.logger.trace(
-                        "Circle step angle=%s radius=%s x=%s y=%s", angle, radius, x, y
-                    )
-                    self.autoit.mouse_move(x, y, move_speed)
-                    self._sleep(step_delay / 1000.0)
-
-                if self._stop_event.is_set():
-                    break
-
-                self._rotation_counter += 1
-
-                click_every = max(1, int(self.center_click_every_var.get()))
-                if self._rotation_counter % click_every == 0:
-                    self._sleep(int(self.before_click_delay_var.get()) / 1000.0)
-                    self.logger.action("Click center at (%s, %s)", cx, cy)
-                    self.autoit.mouse_click(cx, cy)
-                    self._sleep(int(self.after_click_delay_var.get()) / 1000.0)
-
-                if self._stop_event.is_set():
-                    break
-
-                if bool(self.post_loop_key_enabled_var.get()):
-                    key_send = key_name_to_autoit_send(self.post_loop_key_var.get())
-                    self.logger.action("Post-loop key: %s", self.post_loop_key_var.get())
-                    self.autoit.send_key(key_send)
-
-                self._sleep(int(self.per_loop_delay_var.get()) / 1000.0)
-
-        except AutoItBridgeError as e:
-            self.error_manager.report("AutoIt error", e, critical=True)
-        except Exception as e:
-            self.error_manager.report("Macro error", e, critical=True)
-        finally:
-            self.root.after(0, self._macro_finished)
-
     def _macro_finished(self) -> None:
-        self._stop_event.set()
+        if self.macro_running:
+            return
+        self.loop_progress_var.set(str(self.engine.rotation_counter))
         self.status_var.set("Idle")
+        self.error_manager.flush_suppressed()
         self.logger.info("Macro stopped")
+        self._schedule_estimate()
 
     def _on_close(self) -> None:
         self._closing = True
@@ -1901,8 +2495,11 @@ class AppUI:
             after_ids.append(self._after_chrome_id)
         if self._after_error_id is not None:
             after_ids.append(self._after_error_id)
+        if self._after_estimate_id is not None:
+            after_ids.append(self._after_estimate_id)
         self._after_chrome_id = None
         self._after_error_id = None
+        self._after_estimate_id = None
         for aid in after_ids:
             try:
                 self.root.after_cancel(aid)
@@ -1940,6 +2537,22 @@ class AppUI:
         except Exception:
             pass
 
+        try:
+            self.engine.shutdown(timeout=1.0)
+        except Exception:
+            pass
+
+        if self.cursor_sampler is not None:
+            self.cursor_sampler.stop()
+        if self.window_tracker is not None:
+            self.window_tracker.stop()
+        if self.focus_guard is not None:
+            self.focus_guard.stop()
+        if self._locator is not None:
+            self._locator.close()
+        if self.checkpoint is not None:
+            self.checkpoint.stop()
+
         try:
             self.autoit.stop()
         except Exception:
@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import argparse
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from .config_manager import ConfigManager
+from .screen import ScreenSource, SyntheticScreenSource
+
+try:
+    import numpy as np
+except Exception:  # pragma: no cover - optional dependency
+    np = None  # type: ignore[assignment]
+
+
+RECOVERY_OPS = ("click", "move", "key", "wait")
+
+
+def parse_recovery(text: str) -> list[tuple[str, tuple]]:
+    steps: list[tuple[str, tuple]] = []
+    for raw in (text or "").split(";"):
+        raw = raw.strip()
+        if not raw:
+            continue
+        op, _, arg = raw.partition(" ")
+        op = op.strip().lower()
+        arg = arg.strip()
+        if op not in RECOVERY_OPS:
+            raise ValueError(f"Unknown recovery step: {raw!r}")
+        if op in ("click", "move"):
+            parts = [p.strip() for p in arg.split(",")]
+            if len(parts) != 2:
+                raise ValueError(f"Expected '{op} x,y': {raw!r}")
+            steps.append((op, (int(parts[0]), int(parts[1]))))
+        elif op == "key":
+            if not arg:
+                raise ValueError(f"Expected 'key NAME': {raw!r}")
+            steps.append((op, (arg,)))
+        else:
+            steps.append((op, (max(0, int(float(arg or 0))),)))
+    return steps
+
+
+def _ints(text: str, count: int) -> tuple[int, ...] | None:
+    parts = [p.strip() for p in (text or "").split(",") if p.strip()]
+    if len(parts) != count:
+        return None
+    try:
+        return tuple(int(float(p)) for p in parts)
+    except ValueError:
+        return None
+
+
+@dataclass(frozen=True)
+class WatchSignature:
+    name: str
+    x: int
+    y: int
+    width: int
+    height: int
+    color: tuple[int, int, int]
+    tolerance: float = 30.0
+    min_match: float = 0.9
+    cooldown_s: float = 30.0
+    recovery: tuple[tuple[str, tuple], ...] = ()
+
+    @classmethod
+    def from_config(cls, config: ConfigManager, name: str) -> WatchSignature | None:
+        section = f"Watcher.{name}"
+        region = _ints(config.get(section, "Region", fallback=""), 4)
+        color = _ints(config.get(section, "Color", fallback=""), 3)
+        if region is None or color is None or region[2] <= 0 or region[3] <= 0:
+            return None
+        return cls(
+            name=name,
+            x=region[0],
+            y=region[1],
+            width=region[2],
+            height=region[3],
+            color=(color[0], color[1], color[2]),
+            tolerance=config.getfloat(section, "Tolerance", fallback=30.0),
+            min_match=config.getfloat(section, "MinMatch", fallback=0.9),
+            cooldown_s=config.getfloat(section, "Cooldown", fallback=30.0),
+            recovery=tuple(parse_recovery(config.get(section, "Recovery", fallback=""))),
+        )
+
+    def score(self, pixels: np.ndarray) -> float:
+        diff = pixels.astype(np.int32) - np.asarray(self.color, dtype=np.int32)
+        dist = np.einsum("ijk,ijk->ij", diff, diff)
+        return np.count_nonzero(dist <= self.tolerance * self.tolerance) / dist.size
+
+
+def signatures_from_config(config: ConfigManager) -> list[WatchSignature]:
+    names = [n.strip() for n in config.get("Watchers", "Names", fallback="").split(",") if n.strip()]
+    out: list[WatchSignature] = []
+    for name in names:
+        sig = WatchSignature.from_config(config, name)
+        if sig is not None:
+            out.append(sig)
+    return out
+
+
+class StateWatcher:
+    def __init__(
+        self,
+        source: ScreenSource,
+        signatures: list[WatchSignature],
+        rate_hz: float = 2.0,
+        on_trigger: Callable[[WatchSignature], None] | None = None,
+    ):
+        if np is None:
+            raise RuntimeError("The 'numpy' package is required. Install it with: pip install numpy")
+        self._source = source
+        self._signatures = list(signatures)
+        self._interval = 1.0 / max(0.05, float(rate_hz))
+        self._on_trigger = on_trigger
+
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._users = 0
+
+        self._pending: WatchSignature | None = None
+        self._cooldown_until: dict[str, float] = {}
+
+        self.checks = 0
+        self.total_check_ms = 0.0
+        self.last_check_ms = 0.0
+        self.max_check_ms = 0.0
+        self.last_scores: dict[str, float] = {}
+
+    @property
+    def signatures(self) -> list[WatchSignature]:
+        return list(self._signatures)
+
+    @property
+    def running(self) -> bool:
+        t = self._thread
+        return t is not None and t.is_alive()
+
+    @property
+    def pending(self) -> WatchSignature | None:
+        return self._pending
+
+    @property
+    def mean_check_ms(self) -> float:
+        return self.total_check_ms / self.checks if self.checks else 0.0
+
+    def matched(self, name: str) -> bool:
+        for sig in self._signatures:
+            if sig.name == name:
+                return self.last_scores.get(name, 0.0) >= sig.min_match
+        return False
+
+    def set_signatures(self, signatures: list[WatchSignature]) -> None:
+        with self._lock:
+            self._signatures = list(signatures)
+            self._pending = None
+
+    def take_pending(self) -> WatchSignature | None:
+        with self._lock:
+            sig = self._pending
+            self._pending = None
+            return sig
+
+    def acknowledge(self, sig: WatchSignature) -> None:
+        with self._lock:
+            self._cooldown_until[sig.name] = time.monotonic() + max(0.0, sig.cooldown_s)
+
+    def reset_stats(self) -> None:
+        self.checks = 0
+        self.total_check_ms = 0.0
+        self.max_check_ms = 0.0
+
+    def check_once(self) -> WatchSignature | None:
+        now = time.monotonic()
+        hit: WatchSignature | None = None
+        t0 = time.perf_counter()
+        for sig in self._signatures:
+            if self._cooldown_until.get(sig.name, 0.0) > now:
+                continue
+            pixels = self._source.grab(sig.x, sig.y, sig.width, sig.height)
+            score = sig.score(pixels)
+            self.last_scores[sig.name] = score
+            # Signatures without recovery steps are conditions for program branches only.
+            if hit is None and sig.recovery and score >= sig.min_match:
+                hit = sig
+        elapsed = (time.perf_counter() - t0) * 1000.0
+
+        self.checks += 1
+        self.total_check_ms += elapsed
+        self.last_check_ms = elapsed
+        if elapsed > self.max_check_ms:
+            self.max_check_ms = elapsed
+
+        if hit is not None:
+            with self._lock:
+                if self._pending is None:
+                    self._pending = hit
+                else:
+                    hit = None
+        if hit is not None and self._on_trigger is not None:
+            try:
+                self._on_trigger(hit)
+            except Exception:
+                pass
+        return hit
+
+    def acquire(self) -> None:
+        with self._lock:
+            self._users += 1
+            if self.running and not self._stop_event.is_set():
+                return
+            self._stop_event = threading.Event()
+            self._thread = threading.Thread(target=self._run, name="state-watcher", daemon=True)
+            self._thread.start()
+
+    def release(self) -> None:
+        with self._lock:
+            self._users = max(0, self._users - 1)
+            if self._users == 0:
+                self._stop_event.set()
+                self._pending = None
+
+    def stop(self) -> None:
+        with self._lock:
+            self._users = 0
+            self._stop_event.set()
+            t = self._thread
+        if t is not None:
+            t.join(timeout=1.0)
+
+    def _run(self) -> None:
+        stop_event = self._stop_event
+        while not stop_event.is_set():
+            if self._signatures and self._pending is None:
+                try:
+                    self.check_once()
+                except Exception:
+                    pass
+            stop_event.wait(self._interval)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.watchers",
+        description="Measure state-watcher check time against a synthetic screen.",
+    )
+    parser.add_argument("--signatures", type=int, default=4)
+    parser.add_argument("--size", type=int, default=24, help="Region edge length in pixels")
+    parser.add_argument("--checks", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    source = SyntheticScreenSource(1920, 1080, (30, 30, 30))
+    source.fill_rect(900, 500, args.size, args.size, (200, 40, 40))
+    sigs = [
+        WatchSignature(f"sig{i}", 100 + i * 50, 100, args.size, args.size, (200, 40, 40))
+        for i in range(max(1, args.signatures))
+    ]
+    watcher = StateWatcher(source, sigs)
+    for _ in range(max(1, args.checks)):
+        watcher.check_once()
+    hit_sig = WatchSignature("dialog", 900, 500, args.size, args.size, (200, 40, 40))
+    watcher.set_signatures(sigs + [hit_sig])
+    hit = watcher.check_once()
+    print(
+        f"signatures={len(sigs)} region={args.size}px checks={watcher.checks} "
+        f"mean={watcher.mean_check_ms:.4f}ms max={watcher.max_check_ms:.4f}ms "
+        f"trigger={'ok' if hit is hit_sig else 'missed'}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,517 @@
+from __future__ import annotations
+
+import ctypes
+import threading
+from collections.abc import Callable
+from ctypes import wintypes
+from dataclasses import dataclass
+from typing import Protocol
+
+
+@dataclass(frozen=True)
+class WindowRect:
+    x: int
+    y: int
+    width: int
+    height: int
+    dpi: int = 96
+
+
+@dataclass(frozen=True)
+class AffineTransform:
+    sx: float = 1.0
+    sy: float = 1.0
+    tx: float = 0.0
+    ty: float = 0.0
+
+    @property
+    def scale(self) -> float:
+        return (self.sx + self.sy) / 2.0
+
+    def apply(self, x: float, y: float) -> tuple[int, int]:
+        return int(round(self.tx + x * self.sx)), int(round(self.ty + y * self.sy))
+
+    @classmethod
+    def for_window(cls, rect: WindowRect, ref_width: int, ref_height: int) -> AffineTransform:
+        sx = rect.width / ref_width if ref_width > 0 else 1.0
+        sy = rect.height / ref_height if ref_height > 0 else 1.0
+        return cls(sx=sx, sy=sy, tx=float(rect.x), ty=float(rect.y))
+
+
+IDENTITY_TRANSFORM = AffineTransform()
+
+
+class WindowInfoProvider(Protocol):
+    def find_window(self, title: str) -> int | None: ...
+
+    def window_at(self, x: int, y: int) -> int | None: ...
+
+    def window_title(self, handle: int) -> str: ...
+
+    def client_rect(self, handle: int) -> WindowRect | None: ...
+
+    def foreground_window(self) -> int | None: ...
+
+    # Change notifications; returning None means the caller has to rely on polling.
+    def watch(self, handle: int, on_change: Callable[[], None]) -> Callable[[], None] | None: ...
+
+
+class FakeWindowProvider:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._windows: dict[int, tuple[str, WindowRect]] = {}
+        self._foreground: int | None = None
+        self._watchers: dict[int, list[Callable[[], None]]] = {}
+        self.queries = 0
+
+    def add_window(self, handle: int, title: str, rect: WindowRect) -> None:
+        with self._lock:
+            self._windows[handle] = (title, rect)
+        self._notify(handle)
+
+    def move_window(self, handle: int, rect: WindowRect) -> None:
+        with self._lock:
+            title, _old = self._windows[handle]
+            self._windows[handle] = (title, rect)
+        self._notify(handle)
+
+    def remove_window(self, handle: int) -> None:
+        with self._lock:
+            self._windows.pop(handle, None)
+        self._notify(handle)
+
+    def set_foreground(self, handle: int | None) -> None:
+        with self._lock:
+            self._foreground = handle
+
+    def _notify(self, handle: int) -> None:
+        with self._lock:
+            callbacks = list(self._watchers.get(handle, []))
+        for cb in callbacks:
+            cb()
+
+    def find_window(self, title: str) -> int | None:
+        with self._lock:
+            self.queries += 1
+            for handle, (t, _rect) in self._windows.items():
+                if t == title:
+                    return handle
+        return None
+
+    def window_at(self, x: int, y: int) -> int | None:
+        with self._lock:
+            self.queries += 1
+            for handle, (_t, r) in self._windows.items():
+                if r.x <= x < r.x + r.width and r.y <= y < r.y + r.height:
+                    return handle
+        return None
+
+    def window_title(self, handle: int) -> str:
+        with self._lock:
+            entry = self._windows.get(handle)
+            return entry[0] if entry else ""
+
+    def client_rect(self, handle: int) -> WindowRect | None:
+        with self._lock:
+            self.queries += 1
+            entry = self._windows.get(handle)
+            return entry[1] if entry else None
+
+    def foreground_window(self) -> int | None:
+        with self._lock:
+            self.queries += 1
+            return self._foreground
+
+    def watch(self, handle: int, on_change: Callable[[], None]) -> Callable[[], None] | None:
+        with self._lock:
+            self._watchers.setdefault(handle, []).append(on_change)
+
+        def _unwatch() -> None:
+            with self._lock:
+                callbacks = self._watchers.get(handle, [])
+                if on_change in callbacks:
+                    callbacks.remove(on_change)
+
+        return _unwatch
+
+
+class _RECT(ctypes.Structure):
+    _fields_ = [
+        ("left", wintypes.LONG),
+        ("top", wintypes.LONG),
+        ("right", wintypes.LONG),
+        ("bottom", wintypes.LONG),
+    ]
+
+
+class _POINT(ctypes.Structure):
+    _fields_ = [("x", wintypes.LONG), ("y", wintypes.LONG)]
+
+
+_GA_ROOT = 2
+_EVENT_OBJECT_LOCATIONCHANGE = 0x800B
+_EVENT_OBJECT_DESTROY = 0x8001
+_WINEVENT_OUTOFCONTEXT = 0x0000
+_WM_QUIT = 0x0012
+
+
+class Win32WindowProvider:
+    def __init__(self):
+        try:
+            user32 = ctypes.windll.user32  # type: ignore[attr-defined]
+        except Exception as e:
+            raise RuntimeError("Win32 window provider requires Windows (user32)") from e
+
+        self._user32 = user32
+        self._kernel32 = ctypes.windll.kernel32  # type: ignore[attr-defined]
+
+        user32.WindowFromPoint.argtypes = [_POINT]
+        user32.WindowFromPoint.restype = wintypes.HWND
+        user32.GetAncestor.argtypes = [wintypes.HWND, wintypes.UINT]
+        user32.GetAncestor.restype = wintypes.HWND
+        user32.FindWindowW.argtypes = [wintypes.LPCWSTR, wintypes.LPCWSTR]
+        user32.FindWindowW.restype = wintypes.HWND
+        user32.GetWindowTextLengthW.argtypes = [wintypes.HWND]
+        user32.GetWindowTextW.argtypes = [wintypes.HWND, wintypes.LPWSTR, ctypes.c_int]
+        user32.GetClientRect.argtypes = [wintypes.HWND, ctypes.POINTER(_RECT)]
+        user32.ClientToScreen.argtypes = [wintypes.HWND, ctypes.POINTER(_POINT)]
+        user32.IsWindow.argtypes = [wintypes.HWND]
+        user32.IsIconic.argtypes = [wintypes.HWND]
+        user32.GetForegroundWindow.restype = wintypes.HWND
+        user32.GetWindowThreadProcessId.argtypes = [wintypes.HWND, ctypes.POINTER(wintypes.DWORD)]
+
+        self._get_dpi = getattr(user32, "GetDpiForWindow", None)
+        if self._get_dpi is not None:
+            self._get_dpi.argtypes = [wintypes.HWND]
+            self._get_dpi.restype = wintypes.UINT
+
+        self._lock = threading.Lock()
+        self._rect = _RECT()
+        self._origin = _POINT()
+
+    def find_window(self, title: str) -> int | None:
+        hwnd = self._user32.FindWindowW(None, title)
+        return int(hwnd) if hwnd else None
+
+    def window_at(self, x: int, y: int) -> int | None:
+        hwnd = self._user32.WindowFromPoint(_POINT(int(x), int(y)))
+        if not hwnd:
+            return None
+        root = self._user32.GetAncestor(hwnd, _GA_ROOT)
+        return int(root or hwnd)
+
+    def window_title(self, handle: int) -> str:
+        length = int(self._user32.GetWindowTextLengthW(handle))
+        buf = ctypes.create_unicode_buffer(length + 1)
+        self._user32.GetWindowTextW(handle, buf, length + 1)
+        return buf.value
+
+    def client_rect(self, handle: int) -> WindowRect | None:
+        if not self._user32.IsWindow(handle) or self._user32.IsIconic(handle):
+            return None
+        with self._lock:
+            if not self._user32.GetClientRect(handle, ctypes.byref(self._rect)):
+                return None
+            self._origin.x = 0
+            self._origin.y = 0
+            if not self._user32.ClientToScreen(handle, ctypes.byref(self._origin)):
+                return None
+            dpi = int(self._get_dpi(handle)) if self._get_dpi is not None else 96
+            return WindowRect(
+                x=int(self._origin.x),
+                y=int(self._origin.y),
+                width=int(self._rect.right - self._rect.left),
+                height=int(self._rect.bottom - self._rect.top),
+                dpi=dpi or 96,
+            )
+
+    def foreground_window(self) -> int | None:
+        hwnd = self._user32.GetForegroundWindow()
+        return int(hwnd) if hwnd else None
+
+    def watch(self, handle: int, on_change: Callable[[], None]) -> Callable[[], None] | None:
+        pid = wintypes.DWORD(0)
+        self._user32.GetWindowThreadProcessId(handle, ctypes.byref(pid))
+
+        hook_proc_type = ctypes.WINFUNCTYPE(
+            None,
+            wintypes.HANDLE,
+            wintypes.DWORD,
+            wintypes.HWND,
+            wintypes.LONG,
+            wintypes.LONG,
+            wintypes.DWORD,
+            wintypes.DWORD,
+        )
+
+        def _on_event(_hook, _event, hwnd, _obj, _child, _thread, _time) -> None:
+            if hwnd and int(hwnd) == handle:
+                try:
+                    on_change()
+                except Exception:
+                    pass
+
+        callback = hook_proc_type(_on_event)
+        thread_id: dict[str, int] = {}
+        ready = threading.Event()
+
+        def _pump() -> None:
+            thread_id["id"] = int(self._kernel32.GetCurrentThreadId())
+            hook = self._user32.SetWinEventHook(
+                _EVENT_OBJECT_DESTROY,
+                _EVENT_OBJECT_LOCATIONCHANGE,
+                None,
+                callback,
+                pid.value,
+                0,
+                _WINEVENT_OUTOFCONTEXT,
+            )
+            ready.set()
+            if not hook:
+                return
+            msg = wintypes.MSG()
+            while self._user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+                self._user32.TranslateMessage(ctypes.byref(msg))
+                self._user32.DispatchMessageW(ctypes.byref(msg))
+            self._user32.UnhookWinEvent(hook)
+
+        t = threading.Thread(target=_pump, name="window-events", daemon=True)
+        t.start()
+        ready.wait(1.0)
+
+        def _unwatch() -> None:
+            tid = thread_id.get("id")
+            if tid:
+                self._user32.PostThreadMessageW(tid, _WM_QUIT, 0, 0)
+            t.join(timeout=1.0)
+
+        return _unwatch
+
+
+_default_provider: WindowInfoProvider | None = None
+
+
+def default_window_provider() -> WindowInfoProvider:
+    global _default_provider
+    if _default_provider is None:
+        _default_provider = Win32WindowProvider()
+    return _default_provider
+
+
+class WindowRectTracker:
+    def __init__(self, provider: WindowInfoProvider, refresh_hz: float = 2.0):
+        self._provider = provider
+        self._interval = 1.0 / max(0.1, float(refresh_hz))
+        self._lock = threading.Lock()
+        self._title = ""
+        self._handle: int | None = None
+        self._rect: WindowRect | None = None
+        self._version = 0
+        self._unwatch: Callable[[], None] | None = None
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._users = 0
+
+    @property
+    def provider(self) -> WindowInfoProvider:
+        return self._provider
+
+    @property
+    def title(self) -> str:
+        return self._title
+
+    @property
+    def handle(self) -> int | None:
+        return self._handle
+
+    @property
+    def rect(self) -> WindowRect | None:
+        return self._rect
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def running(self) -> bool:
+        t = self._thread
+        return t is not None and t.is_alive()
+
+    def set_target(self, title: str) -> None:
+        with self._lock:
+            if title == self._title:
+                return
+            self._title = title
+            self._set_handle_locked(None)
+        self.refresh()
+
+    def notify_changed(self) -> None:
+        self._wake.set()
+
+    def transform(self, ref_width: int, ref_height: int) -> AffineTransform | None:
+        rect = self._rect
+        if rect is None:
+            return None
+        return AffineTransform.for_window(rect, ref_width, ref_height)
+
+    def _set_handle_locked(self, handle: int | None) -> None:
+        if handle == self._handle:
+            return
+        if self._unwatch is not None:
+            unwatch = self._unwatch
+            self._unwatch = None
+            try:
+                unwatch()
+            except Exception:
+                pass
+        self._handle = handle
+        if handle is not None:
+            try:
+                self._unwatch = self._provider.watch(handle, self.notify_changed)
+            except Exception:
+                self._unwatch = None
+
+    def refresh(self) -> WindowRect | None:
+        with self._lock:
+            title = self._title
+            handle = self._handle
+            if not title:
+                rect = None
+            else:
+                rect = self._provider.client_rect(handle) if handle is not None else None
+                if rect is None:
+                    handle = self._provider.find_window(title)
+                    rect = self._provider.client_rect(handle) if handle is not None else None
+                self._set_handle_locked(handle if rect is not None else None)
+
+            if rect != self._rect:
+                self._rect = rect
+                self._version += 1
+            return rect
+
+    def acquire(self) -> None:
+        with self._lock:
+            self._users += 1
+            if self.running and not self._stop_event.is_set():
+                return
+            self._stop_event = threading.Event()
+            self._thread = threading.Thread(target=self._run, name="window-tracker", daemon=True)
+            self._thread.start()
+
+    def release(self) -> None:
+        with self._lock:
+            self._users = max(0, self._users - 1)
+            if self._users == 0:
+                self._stop_event.set()
+                self._wake.set()
+
+    def stop(self) -> None:
+        with self._lock:
+            self._users = 0
+            self._stop_event.set()
+            self._wake.set()
+            t = self._thread
+            self._set_handle_locked(None)
+        if t is not None:
+            t.join(timeout=1.0)
+
+    def _run(self) -> None:
+        stop_event = self._stop_event
+        while not stop_event.is_set():
+            try:
+                self.refresh()
+            except Exception:
+                pass
+            self._wake.wait(self._interval)
+            self._wake.clear()
+
+
+class FocusGuard:
+    def __init__(self, provider: WindowInfoProvider, poll_hz: float = 10.0):
+        self._provider = provider
+        self._interval = 1.0 / max(1.0, float(poll_hz))
+        self._cond = threading.Condition()
+        self._target: int | None = None
+        self._focused = True
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._users = 0
+
+    @property
+    def provider(self) -> WindowInfoProvider:
+        return self._provider
+
+    @property
+    def focused(self) -> bool:
+        return self._focused
+
+    @property
+    def target(self) -> int | None:
+        return self._target
+
+    @property
+    def running(self) -> bool:
+        t = self._thread
+        return t is not None and t.is_alive()
+
+    def set_target(self, handle: int | None) -> None:
+        with self._cond:
+            self._target = handle
+        self.poll()
+
+    def poll(self) -> bool:
+        target = self._target
+        if target is None:
+            focused = True
+        else:
+            try:
+                focused = self._provider.foreground_window() == target
+            except Exception:
+                focused = True
+        with self._cond:
+            if focused != self._focused:
+                self._focused = focused
+                self._cond.notify_all()
+        return focused
+
+    def wake(self) -> None:
+        with self._cond:
+            self._cond.notify_all()
+
+    def wait_focused(self, should_stop: Callable[[], bool]) -> None:
+        with self._cond:
+            while not self._focused and not should_stop():
+                self._cond.wait(timeout=1.0)
+
+    def acquire(self) -> None:
+        with self._cond:
+            self._users += 1
+            if self.running and not self._stop_event.is_set():
+                return
+            self._stop_event = threading.Event()
+            self._thread = threading.Thread(target=self._run, name="focus-guard", daemon=True)
+            self._thread.start()
+
+    def release(self) -> None:
+        with self._cond:
+            self._users = max(0, self._users - 1)
+            if self._users == 0:
+                self._stop_event.set()
+                self._focused = True
+                self._cond.notify_all()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._users = 0
+            self._stop_event.set()
+            self._cond.notify_all()
+            t = self._thread
+        if t is not None:
+            t.join(timeout=1.0)
+
+    def _run(self) -> None:
+        stop_event = self._stop_event
+        while not stop_event.is_set():
+            self.poll()
+            stop_event.wait(self._interval)
@@ -4,14 +4,14 @@ pushd "%~dp0"
 
 where py >nul 2>nul
 if %errorlevel%==0 (
-    py -c "import customtkinter" >nul 2>nul
+    py -c "import customtkinter, numpy" >nul 2>nul
     if not %errorlevel%==0 (
         echo Installing dependencies...
         py -m pip install -r requirements.txt
     )
     py -m app.main
 ) else (
-    python -c "import customtkinter" >nul 2>nul
+    python -c "import customtkinter, numpy" >nul 2>nul
     if not %errorlevel%==0 (
         echo Installing dependencies...
         python -m pip install -r requirements.txt